@@ -7,6 +7,18 @@ def create_app():
     app = Flask(__name__, static_folder='static', template_folder='templates')
     load_dotenv()
 
+    from app.infra.json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app)
+
+    from app.infra.compression import Compression
+    Compression(app)
+
+    from app.infra.assets import Assets
+    Assets(app)
+
+    from app.infra.metrics import Metrics
+    Metrics(app)
+
     app.secret_key = os.getenv("SECRET_KEY")
 
     login_manager = LoginManager()
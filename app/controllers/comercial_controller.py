@@ -1,9 +1,13 @@
 from flask import Blueprint, render_template, jsonify, request
 from flask_login import login_required
+from app.infra.http_cache import conditional
 from app.services.comercial_service import ComercialService
 
 comercial_bp = Blueprint('comercial_bp', __name__, url_prefix='/comercial')
 
+def client_data_version(max_age):
+    return ComercialService.get_data_version(max_age)
+
 @comercial_bp.route('/client-analysis', methods=['GET'])
 @login_required
 def render_client_analysis():
@@ -11,6 +15,7 @@ def render_client_analysis():
 
 @comercial_bp.route('/client-data', methods=['GET'])
 @login_required
+@conditional(client_data_version)
 def fetch_client_data():
     try:
         page = int(request.args.get('page', 1))
@@ -18,13 +23,15 @@ def fetch_client_data():
         sort_column = request.args.get('sort_column', 'HistoricalVolume')
         sort_direction = request.args.get('sort_direction', 'DESC').upper()
         risk_filter = request.args.get('risk_filter', '')
+        cursor = request.args.get('cursor')
 
         result = ComercialService.get_client_data(
             page=page,
             items_per_page=items_per_page,
             sort_column=sort_column,
             sort_direction=sort_direction,
-            risk_filter=risk_filter
+            risk_filter=risk_filter,
+            cursor=cursor
         )
         return jsonify(result), 200
     except Exception as e:
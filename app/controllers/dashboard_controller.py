@@ -1,8 +1,23 @@
-from flask import Blueprint, render_template
+import os
+from flask import Blueprint, Response, current_app, jsonify, render_template, request
 from flask_login import login_required
+from app.infra.async_database import AsyncDatabase
+from app.infra.http_cache import conditional
+from app.infra.live_updates import LiveUpdates
+from app.services.default_rate_service import DefaultRateService
+from app.services.live_kpi_service import LiveKpiService
+from app.services.operations_service import OperationsService
+from app.utils.series_format import SeriesFormat
 
 dashboard_bp = Blueprint('dashboard_bp', __name__, url_prefix='/dashboard')
 
+operations_service = OperationsService()
+default_rate_service = DefaultRateService()
+live_kpi_service = LiveKpiService(operations_service, default_rate_service)
+
+BUNDLE_SECTIONS = ("volume", "current_default_rate", "default_rate_series")
+PERIOD_TYPES = ("daily", "monthly")
+
 @dashboard_bp.route('/', methods=['GET'])
 @login_required
 def index():
@@ -22,3 +37,93 @@ def volume_operations():
 @login_required
 def default_rate():
     return render_template('default-rate.html')
+
+def bundle_version(max_age):
+    return f"{operations_service.get_data_version(max_age)}|{default_rate_service.get_data_version(max_age)}"
+
+@dashboard_bp.route('/bundle', methods=['GET'])
+@login_required
+@conditional(bundle_version)
+def bundle():
+    """
+    KPIs das telas do dashboard em uma única requisição. As seções pedidas em `sections`
+    (padrão: todas) são calculadas em paralelo, cada uma com uma conexão do pool.
+    As séries seguem o parâmetro `format` (ver SeriesFormat).
+    """
+    try:
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        volume_type = request.args.get('volume_type', 'daily')
+        rate_type = request.args.get('rate_type', 'daily')
+        engine = request.args.get('engine')
+        sections = [s.strip() for s in request.args.get('sections', ','.join(BUNDLE_SECTIONS)).split(',') if s.strip()]
+
+        invalid = [s for s in sections if s not in BUNDLE_SECTIONS]
+        if invalid or not sections:
+            return jsonify({"error": f"Invalid sections parameter. Use any of: {', '.join(BUNDLE_SECTIONS)}."}), 400
+        if volume_type not in PERIOD_TYPES or rate_type not in PERIOD_TYPES:
+            return jsonify({"error": "Invalid type parameter. Use 'daily' or 'monthly'."}), 400
+        try:
+            series_format = SeriesFormat.parse(request.args.get('format'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        needs_range = any(s != "current_default_rate" for s in sections)
+        if needs_range and (not start_date or not end_date):
+            return jsonify({"error": "start_date and end_date are required"}), 400
+
+        calls = {}
+        if "volume" in sections:
+            if volume_type == "daily":
+                calls["volume"] = operations_service.get_daily_volume_data_async(start_date, end_date)
+            else:
+                calls["volume"] = operations_service.get_monthly_volume_data_async(start_date, end_date)
+        if "current_default_rate" in sections:
+            calls["current_default_rate"] = default_rate_service.get_current_default_rate_async()
+        if "default_rate_series" in sections:
+            if rate_type == "daily":
+                calls["default_rate_series"] = default_rate_service.get_daily_rate_series_async(start_date, end_date, engine)
+            else:
+                calls["default_rate_series"] = default_rate_service.get_monthly_rate_series_async(start_date, end_date)
+
+        results = AsyncDatabase.run_all(calls)
+
+        response = {}
+        if "volume" in results:
+            response["volume"] = {"type": volume_type, "data": SeriesFormat.apply(results["volume"]["data"], series_format)}
+        if "current_default_rate" in results:
+            response["current_default_rate"] = results["current_default_rate"]
+        if "default_rate_series" in results:
+            response["default_rate_series"] = {"type": rate_type, "data": SeriesFormat.apply(results["default_rate_series"]["data"], series_format)}
+        return jsonify(response), 200
+    except Exception as e:
+        return jsonify({"error": f"Error fetching dashboard bundle: {str(e)}"}), 500
+
+def get_live_updates():
+    live_updates = current_app.extensions.get("live_updates")
+    if live_updates is None:
+        live_updates = current_app.extensions.setdefault("live_updates", LiveUpdates(live_kpi_service.get_snapshot, current_app.json.dumps))
+    return live_updates
+
+@dashboard_bp.route('/live', methods=['GET'])
+@login_required
+def live():
+    """
+    Stream SSE (evento 'kpis') com a taxa de inadimplência atual, o volume do dia e a
+    contagem de clientes por faixa de risco, enviado quando algum desses valores muda.
+    """
+    if os.getenv("LIVE_UPDATES_ENABLED", "true").lower() != "true":
+        # 204 faz o EventSource parar de reconectar
+        return Response(status=204)
+
+    live_updates = get_live_updates()
+    subscriber = live_updates.subscribe()
+    if subscriber is None:
+        # Limite de conexões: stream vazio com um retry longo, o EventSource reconecta mais tarde
+        body = live_updates.busy_stream()
+    else:
+        body = live_updates.stream(subscriber, request.headers.get('Last-Event-ID'))
+
+    response = Response(body, mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,34 +1,46 @@
 from flask import Blueprint, jsonify, request
 from flask_login import login_required
+from app.infra.http_cache import conditional
 from app.services.default_rate_service import DefaultRateService
+from app.utils.series_format import SeriesFormat
 
 default_rate_bp = Blueprint('default_rate_bp', __name__, url_prefix='/default-rate')
 service = DefaultRateService()
 
+def default_rate_version(max_age):
+    return service.get_data_version(max_age)
+
 @default_rate_bp.route('/data', methods=['GET'])
 @login_required
+@conditional(default_rate_version)
 def get_default_rate_data():
     try:
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         period_type = request.args.get('type', 'monthly')
+        engine = request.args.get('engine')
 
         if not start_date or not end_date:
             return jsonify({"error": "start_date and end_date are required"}), 400
+        try:
+            series_format = SeriesFormat.parse(request.args.get('format'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         if period_type == 'daily':
-            result = service.get_daily_rate_series(start_date=start_date, end_date=end_date)
+            result = service.get_daily_rate_series(start_date=start_date, end_date=end_date, engine=engine)
         elif period_type == 'monthly':
             result = service.get_monthly_rate_series(start_date=start_date, end_date=end_date)
         else:
             return jsonify({"error": "Invalid type parameter. Use 'daily' or 'monthly'."}), 400
 
-        return jsonify(result), 200
+        return jsonify({"data": SeriesFormat.apply(result["data"], series_format)}), 200
     except Exception as e:
         return jsonify({"error": f"Error fetching default rate data: {str(e)}"}), 500
 
 @default_rate_bp.route('/', methods=['GET'])
 @login_required
+@conditional(default_rate_version)
 def get_current_default_rate():
     try:
         result = service.get_current_default_rate()
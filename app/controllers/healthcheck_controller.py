@@ -1,7 +1,59 @@
-from flask import Blueprint, jsonify
+import functools
+import hmac
+import os
+from flask import Blueprint, Response, current_app, jsonify, request
+from flask_login import login_required
+from app.infra.cache import ResultCache
+from app.infra.db_connection import Database
+from app.infra.metrics import Metrics, prometheus_client
 
 healthcheck_bp = Blueprint("healthcheck", __name__)
 
+def metrics_auth_required(view):
+    """
+    Acesso ao /metrics pelo Prometheus com `Authorization: Bearer <METRICS_TOKEN>`, que não
+    passa pelo login; sem o token (ou com METRICS_TOKEN vazio) exige o usuário logado.
+    """
+    protected = login_required(view)
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        token = os.getenv("METRICS_TOKEN")
+        if token and hmac.compare_digest(request.headers.get("Authorization", "").encode("utf-8"), f"Bearer {token}".encode("utf-8")):
+            return view(*args, **kwargs)
+        return protected(*args, **kwargs)
+
+    return wrapper
+
 @healthcheck_bp.route("/health", methods=["GET"])
 def healthcheck():
     return jsonify({"status": "ok"}), 200
+
+@healthcheck_bp.route("/health/db-pool", methods=["GET"])
+@login_required
+def db_pool_stats():
+    return jsonify(Database.get_pool_stats()), 200
+
+@healthcheck_bp.route("/health/cache", methods=["GET"])
+@login_required
+def cache_stats():
+    return jsonify(ResultCache.get_instance().get_stats()), 200
+
+@healthcheck_bp.route("/health/queries", methods=["GET"])
+@login_required
+def query_stats():
+    return jsonify(Database.get_query_stats()), 200
+
+@healthcheck_bp.route("/health/live-updates", methods=["GET"])
+@login_required
+def live_updates_stats():
+    live_updates = current_app.extensions.get("live_updates")
+    return jsonify(live_updates.get_stats() if live_updates else {"streams": 0}), 200
+
+@healthcheck_bp.route("/metrics", methods=["GET"])
+@metrics_auth_required
+def metrics():
+    if prometheus_client is None:
+        return jsonify({"error": "prometheus_client is not installed"}), 503
+    body, content_type = Metrics.render()
+    return Response(body, content_type=content_type)
@@ -1,13 +1,19 @@
 from app.services.operations_service import OperationsService
 from flask import Blueprint, jsonify, request
 from flask_login import login_required
+from app.infra.http_cache import conditional
+from app.utils.series_format import SeriesFormat
 
 operations_bp = Blueprint('operations_bp', __name__, url_prefix='/operations')
 
 operations_service = OperationsService()
 
+def volume_version(max_age):
+    return operations_service.get_data_version(max_age)
+
 @operations_bp.route('/volume-data', methods=['GET'])
 @login_required
+@conditional(volume_version)
 def get_volume_data():
     try:
         start_date = request.args.get('start_date')
@@ -16,6 +22,10 @@ def get_volume_data():
 
         if not start_date or not end_date:
             return jsonify({"error": "start_date and end_date are required"}), 400
+        try:
+            series_format = SeriesFormat.parse(request.args.get('format'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         if data_type == "daily":
             result = operations_service.get_daily_volume_data(start_date=start_date, end_date=end_date)
@@ -24,6 +34,6 @@ def get_volume_data():
         else:
             return jsonify({"error": "Invalid type parameter. Use 'daily' or 'monthly'."}), 400
 
-        return jsonify(result), 200
+        return jsonify({"data": SeriesFormat.apply(result["data"], series_format)}), 200
     except Exception as e:
         return jsonify({"error": f"Error fetching volume data: {str(e)}"}), 500
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+from markupsafe import Markup, escape
+from flask import request, url_for
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+class Assets:
+    """
+    Bundles de CSS/JS por página com nomes versionados pelo conteúdo.
+
+    scripts/build_assets.py concatena e minifica cada bundle de BUNDLES e copia os
+    arquivos de FINGERPRINTED para static/dist/ com o hash do conteúdo no nome,
+    gravando o mapeamento em static/dist/manifest.json. Nos templates:
+
+        {{ asset_tags('dashboard.css') }}
+        <img src="{{ asset_url('images/logo-horizontal.png') }}">
+
+    Com o manifest, cada bundle vira uma única tag e os arquivos de dist/ são servidos
+    com cache imutável de um ano (o nome muda quando o conteúdo muda). Sem o manifest
+    (desenvolvimento) as tags apontam para os arquivos originais.
+    """
+
+    BUNDLES = {
+        "base.css": ["css/messaging.css", "css/navbar.css", "css/buttons.css"],
+        "base.js": ["js/utils/dateUtils.js", "js/utils/liveUpdates.js", "js/buttons.js", "js/messaging.js"],
+        "login.css": ["css/messaging.css", "css/login.css", "css/buttons.css"],
+        "login.js": ["js/messaging.js", "js/login.js", "js/buttons.js"],
+        "comercial.css": ["css/comercial.css"],
+        "comercial.js": ["js/comercial.js"],
+        "dashboard.css": ["css/date_filter.css", "css/dashboard.css"],
+        "dashboard.js": ["js/dashboard.js"],
+        "default-rate.css": ["css/default-rate.css", "css/volume-operations.css"],
+        "default-rate.js": ["js/default-rate.js"],
+        "volume-operations.css": ["css/filters.css", "css/volume-operations.css"],
+        "volume-operations.js": ["js/volume-operations.js"],
+    }
+    FINGERPRINTED = ["favicon/logo.png", "images/logo-horizontal.png"]
+
+    DIST_DIR = "dist"
+    MANIFEST_NAME = "manifest.json"
+    IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+    _IMPORT_PATTERN = re.compile(r"""@import\s+url\(\s*['"]?([^'")]+)['"]?\s*\)\s*;""")
+
+    def __init__(self, app=None):
+        self.manifest = {}
+        self.immutable = set()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if os.getenv("ASSETS_MANIFEST_ENABLED", "true").lower() == "true":
+            self.manifest = self.load_manifest(app.static_folder)
+        self.immutable = set(self.manifest.values())
+        app.add_template_global(self.asset_url)
+        app.add_template_global(self.asset_tags)
+        app.after_request(self.cache_headers)
+
+    @staticmethod
+    def load_manifest(static_dir):
+        path = os.path.join(static_dir, Assets.DIST_DIR, Assets.MANIFEST_NAME)
+        if not os.path.isfile(path):
+            return {}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def asset_url(self, name):
+        """URL do bundle ou arquivo estático, versionada quando há manifest."""
+        return url_for("static", filename=self.manifest.get(name, name))
+
+    def asset_tags(self, bundle, **attributes):
+        """Tags <link>/<script> de um bundle de BUNDLES."""
+        if bundle not in self.BUNDLES:
+            raise ValueError(f"Unknown asset bundle: {bundle}")
+        files = [self.manifest[bundle]] if bundle in self.manifest else self.BUNDLES[bundle]
+        extra = "".join(f' {key}="{escape(value)}"' if value is not True else f" {key}" for key, value in attributes.items())
+
+        if bundle.endswith(".css"):
+            tags = [f'<link rel="stylesheet" href="{url_for("static", filename=f)}"{extra}>' for f in files]
+        else:
+            tags = [f'<script src="{url_for("static", filename=f)}"{extra}></script>' for f in files]
+        return Markup("\n".join(tags))
+
+    def cache_headers(self, response):
+        if request.endpoint != "static" or response.status_code not in (200, 304):
+            return response
+        if (request.view_args or {}).get("filename") in self.immutable:
+            response.cache_control.public = True
+            response.cache_control.max_age = self.IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+        return response
+
+    @staticmethod
+    def build(static_dir):
+        """
+        Gera os bundles e os arquivos versionados em static/dist/ e grava o manifest.
+        O diretório é recriado a cada build, para não acumular versões antigas.
+        Retorna o manifest ({nome lógico: caminho relativo a static/}).
+        """
+        dist_dir = os.path.join(static_dir, Assets.DIST_DIR)
+        shutil.rmtree(dist_dir, ignore_errors=True)
+        os.makedirs(dist_dir)
+
+        manifest = {}
+        for bundle, files in Assets.BUNDLES.items():
+            if bundle.endswith(".css"):
+                content = Assets.minify_css(Assets.bundle_css(static_dir, files)).encode("utf-8")
+            else:
+                content = Assets.bundle_js(static_dir, files).encode("utf-8")
+            manifest[bundle] = Assets._write_fingerprinted(dist_dir, bundle, content)
+
+        for name in Assets.FINGERPRINTED:
+            with open(os.path.join(static_dir, name), "rb") as f:
+                manifest[name] = Assets._write_fingerprinted(dist_dir, name, f.read())
+
+        with open(os.path.join(dist_dir, Assets.MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        return manifest
+
+    @staticmethod
+    def bundle_css(static_dir, files):
+        """
+        Concatena os arquivos resolvendo os @import locais no lugar (cada arquivo entra uma
+        vez por bundle, como no postcss-import). @import externos vão para o topo, único
+        lugar em que são válidos.
+        """
+        seen = set()
+        external = []
+
+        def inline(name):
+            path = os.path.normpath(os.path.join(static_dir, name))
+            if path in seen:
+                return ""
+            seen.add(path)
+            with open(path, encoding="utf-8") as f:
+                css = f.read()
+
+            def replace(match):
+                url = match.group(1).strip()
+                if url.startswith(("http://", "https://", "//")):
+                    if match.group(0) not in external:
+                        external.append(match.group(0))
+                    return ""
+                if url.startswith("/static/"):
+                    target = url[len("/static/"):]
+                else:
+                    target = os.path.relpath(os.path.join(os.path.dirname(path), url), static_dir)
+                return inline(target)
+
+            return Assets._IMPORT_PATTERN.sub(replace, css)
+
+        body = "\n".join(inline(name) for name in files)
+        return "\n".join(external + [body])
+
+    @staticmethod
+    def minify_css(css):
+        """Minifica o CSS com rcssmin, se instalado."""
+        return rcssmin.cssmin(css) if rcssmin is not None else css
+
+    @staticmethod
+    def bundle_js(static_dir, files):
+        """Concatena os scripts (minificados com rjsmin, se instalado)."""
+        parts = []
+        for name in files:
+            with open(os.path.join(static_dir, name), encoding="utf-8") as f:
+                js = f.read()
+            parts.append(rjsmin.jsmin(js) if rjsmin is not None else js)
+        # ';' separa arquivos que terminam sem ponto e vírgula
+        return ";\n".join(parts)
+
+    @staticmethod
+    def _write_fingerprinted(dist_dir, name, content):
+        digest = hashlib.sha256(content).hexdigest()[:12]
+        stem, ext = os.path.splitext(name)
+        relative = f"{stem}.{digest}{ext}"
+        path = os.path.join(dist_dir, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+        return f"{Assets.DIST_DIR}/{relative}"
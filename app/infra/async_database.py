@@ -0,0 +1,65 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Dict
+from app.infra.db_connection import Database
+
+class AsyncDatabase:
+    """
+    Acesso assíncrono ao banco sobre o pyodbc, que é bloqueante: cada chamada roda em um
+    pool de threads do processo e usa a sua própria conexão do ConnectionPool. O driver
+    ODBC libera o GIL durante a espera pelo SQL Server, então queries disparadas juntas
+    executam de fato em paralelo.
+
+    O pool de threads tem DB_ASYNC_WORKERS threads (padrão: DB_POOL_MAX_SIZE) e é recriado
+    após um fork, como o pool de conexões.
+    """
+
+    _executor = None
+    _executor_pid = None
+    _executor_lock = threading.Lock()
+
+    @classmethod
+    def get_executor(cls):
+        pid = os.getpid()
+        if cls._executor is None or cls._executor_pid != pid:
+            with cls._executor_lock:
+                if cls._executor is None or cls._executor_pid != pid:
+                    max_workers = int(os.getenv("DB_ASYNC_WORKERS") or os.getenv("DB_POOL_MAX_SIZE", "10"))
+                    cls._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-async")
+                    cls._executor_pid = pid
+        return cls._executor
+
+    @classmethod
+    async def run(cls, fn, *args, **kwargs):
+        """Executa uma função bloqueante (query, método de service) no pool de threads."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(cls.get_executor(), functools.partial(fn, *args, **kwargs))
+
+    @staticmethod
+    def run_all(coroutines: Dict[str, Awaitable]) -> Dict[str, Any]:
+        """
+        Ponto de entrada para código síncrono (views Flask): aguarda as corotinas em
+        paralelo e retorna os resultados pelo mesmo nome. A primeira exceção é propagada.
+        """
+        async def gather():
+            results = await asyncio.gather(*coroutines.values())
+            return dict(zip(coroutines.keys(), results))
+
+        return asyncio.run(gather())
+
+    async def execute_query(self, query, params=None):
+        return await self.run(self._call, "execute_query", query, params)
+
+    async def fetch_columns(self, query, params=None, dtypes=None):
+        return await self.run(self._call, "fetch_columns", query, params, dtypes)
+
+    @staticmethod
+    def _call(method, *args):
+        db = Database()
+        try:
+            return getattr(db, method)(*args)
+        finally:
+            db.close_connection()
@@ -0,0 +1,272 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from app.infra.metrics import Metrics
+from app.infra.single_flight import SingleFlight
+from app.infra.snapshot_store import SnapshotStore
+
+class MemoryCacheBackend:
+    """
+    Cache LRU em memória do processo, com expiração por entrada. Os valores são guardados
+    serializados (pickle), como no Redis: quem recebe um resultado do cache pode alterá-lo
+    sem afetar a entrada nem as próximas leituras.
+
+    As entradas não são compartilhadas entre processos, mas as gerações precisam ser: as
+    invalidações vêm sobretudo dos scripts de refresh (scripts/refresh_*), que rodam em
+    outro processo. Com `generation_store` (um SnapshotStore) as gerações ficam no mesmo
+    arquivo SQLite dos snapshots e cada processo as relê a cada `generation_poll` segundos;
+    sem ele, `invalidate` só vale para o próprio processo.
+    """
+
+    def __init__(self, max_entries=512, generation_store=None, generation_poll=1.0):
+        self.max_entries = max_entries
+        self.generation_store = generation_store
+        self.generation_poll = generation_poll
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._generations_read_at = None
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+        return True, pickle.loads(value)
+
+    def set(self, key, value, ttl):
+        value = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_generation(self, namespace):
+        with self._lock:
+            if self.generation_store is not None:
+                now = time.monotonic()
+                if self._generations_read_at is None or now - self._generations_read_at >= self.generation_poll:
+                    self._generations = self.generation_store.get_cache_generations()
+                    self._generations_read_at = now
+            return self._generations.get(namespace, 0)
+
+    def bump_generation(self, namespace):
+        with self._lock:
+            if self.generation_store is not None:
+                self._generations[namespace] = self.generation_store.bump_cache_generation(namespace)
+            else:
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            return self._generations[namespace]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def size(self):
+        with self._lock:
+            return len(self._entries)
+
+class RedisCacheBackend:
+    """
+    Cache compartilhado entre os workers do gunicorn em qualquer servidor compatível
+    com o protocolo Redis. A evicção LRU fica a cargo do servidor (maxmemory-policy).
+    """
+
+    PREFIX = "dashboard-cache:"
+
+    def __init__(self, url):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self.evictions = 0
+
+    def get(self, key):
+        raw = self._client.get(self.PREFIX + key)
+        if raw is None:
+            return False, None
+        return True, pickle.loads(raw)
+
+    def set(self, key, value, ttl):
+        self._client.set(self.PREFIX + key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), px=int(ttl * 1000))
+
+    def get_generation(self, namespace):
+        raw = self._client.get(f"{self.PREFIX}generation:{namespace}")
+        return int(raw) if raw is not None else 0
+
+    def bump_generation(self, namespace):
+        return int(self._client.incr(f"{self.PREFIX}generation:{namespace}"))
+
+    def clear(self):
+        for key in self._client.scan_iter(match=self.PREFIX + "*"):
+            self._client.delete(key)
+
+    def size(self):
+        return sum(1 for _ in self._client.scan_iter(match=self.PREFIX + "*"))
+
+class ResultCache:
+    """
+    Cache de resultados dos services. As chaves combinam o namespace do método, a geração
+    atual do namespace (incrementada por `invalidate`) e os parâmetros normalizados.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, backend, enabled=True, single_flight=None):
+        self.backend = backend
+        self.enabled = enabled
+        self.single_flight = single_flight or SingleFlight()
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls.from_env()
+        return cls._instance
+
+    @classmethod
+    def from_env(cls):
+        backend_name = os.getenv("CACHE_BACKEND", "memory").lower()
+        if backend_name == "redis":
+            backend = RedisCacheBackend(os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0"))
+        elif backend_name == "memory":
+            # Entradas por processo; gerações no arquivo de snapshots (SNAPSHOT_DB_PATH), para
+            # que as invalidações dos scripts de refresh cheguem aos workers. Isso vale para um
+            # servidor: com várias máquinas atrás de um balanceador, use CACHE_BACKEND=redis.
+            backend = MemoryCacheBackend(
+                max_entries=int(os.getenv("CACHE_MAX_ENTRIES", "512")),
+                generation_store=SnapshotStore(),
+                generation_poll=float(os.getenv("CACHE_GENERATION_POLL", "1")),
+            )
+        else:
+            raise ValueError(f"Backend de cache inválido: {backend_name}")
+        return cls(
+            backend,
+            enabled=os.getenv("CACHE_ENABLED", "true").lower() == "true",
+            single_flight=SingleFlight.from_env(),
+        )
+
+    def build_key(self, namespace, params):
+        payload = json.dumps(params, sort_keys=True, default=str, separators=(",", ":"))
+        digest = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+        return f"{namespace}:{self.get_generation(namespace)}:{digest}"
+
+    def get_or_compute(self, namespace, params, ttl, compute):
+        if not self.enabled:
+            return compute()
+
+        key = self.build_key(namespace, params)
+        found, value = self.backend.get(key)
+        if found:
+            self._count(namespace, "hits")
+            return value
+
+        self._count(namespace, "misses")
+
+        # Requisições simultâneas com a mesma chave aguardam uma única execução
+        def compute_and_store():
+            value = compute()
+            self.backend.set(key, value, ttl)
+            return value
+
+        return self.single_flight.do(key, compute_and_store, recheck=lambda: self.backend.get(key))
+
+    def invalidate(self, namespace):
+        """Descarta logicamente todas as entradas do namespace (e dos sub-namespaces `namespace.*`)."""
+        return self.backend.bump_generation(namespace)
+
+    def get_generation(self, namespace):
+        """
+        Versão dos dados do namespace. Inclui a geração do namespace raiz, de modo que
+        invalidate('default_rate') também invalida 'default_rate.daily'.
+        """
+        root = namespace.split(".", 1)[0]
+        if root == namespace:
+            return str(self.backend.get_generation(namespace))
+        return f"{self.backend.get_generation(root)}.{self.backend.get_generation(namespace)}"
+
+    def get_stats(self):
+        with self._stats_lock:
+            namespaces = {name: dict(counters) for name, counters in self._stats.items()}
+        hits = sum(c["hits"] for c in namespaces.values())
+        misses = sum(c["misses"] for c in namespaces.values())
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "entries": self.backend.size(),
+            "evictions": self.backend.evictions,
+            "hits": hits,
+            "misses": misses,
+            "namespaces": namespaces,
+            "single_flight": self.single_flight.get_stats(),
+        }
+
+    def _count(self, namespace, counter):
+        with self._stats_lock:
+            counters = self._stats.setdefault(namespace, {"hits": 0, "misses": 0})
+            counters[counter] += 1
+        Metrics.count_cache(namespace, counter)
+
+def _normalize(value):
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+def cached(namespace, ttl):
+    """
+    Decorator de cache para métodos de service. O TTL pode ser sobrescrito por variável de
+    ambiente: namespace 'default_rate.daily' -> CACHE_TTL_DEFAULT_RATE_DAILY (segundos).
+    Os parâmetros são normalizados com os valores padrão da assinatura, então
+    f('2025-01-01', '2025-01-31') e f(start_date='2025-01-01', end_date='2025-01-31')
+    compartilham a mesma entrada. `self` não faz parte da chave. As queries do método
+    aparecem nas métricas com o rótulo 'modulo.metodo' (ex.: 'operations_service.get_daily_volume_data').
+    """
+    env_name = "CACHE_TTL_" + namespace.upper().replace(".", "_").replace("-", "_")
+
+    def decorator(func):
+        caller = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        def compute(args, kwargs):
+            # As queries de uma execução (só em faltas do cache) ficam rotuladas com o método
+            with Metrics.query_caller(caller):
+                return func(*args, **kwargs)
+
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = {
+                name: _normalize(value)
+                for name, value in bound.arguments.items()
+                if name not in ("self", "cls")
+            }
+            effective_ttl = float(os.getenv(env_name, ttl))
+            return ResultCache.get_instance().get_or_compute(namespace, params, effective_ttl, lambda: compute(args, kwargs))
+
+        wrapper.cache_namespace = namespace
+        wrapper.cache_ttl = ttl
+        return wrapper
+
+    return decorator
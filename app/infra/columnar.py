@@ -0,0 +1,76 @@
+import datetime
+import decimal
+from typing import Dict, Iterable, Optional, Sequence
+import numpy as np
+
+class Columnar:
+    """
+    Conversão em lote de linhas de resultado para colunas NumPy tipadas.
+    Decimal/money viram float64, date vira datetime64[D] e datetime vira datetime64[us];
+    NULL vira NaN/NaT (ou None nas colunas object). Inteiros com NULL viram float64.
+    """
+
+    DTYPES = ("float64", "int64", "bool", "datetime64[D]", "datetime64[us]", "object")
+
+    @staticmethod
+    def infer_dtype(type_code) -> str:
+        """dtype padrão para o `type_code` de cursor.description."""
+        if type_code in (decimal.Decimal, float):
+            return "float64"
+        if type_code is bool:
+            return "bool"
+        if type_code is int:
+            return "int64"
+        if type_code is datetime.datetime:
+            return "datetime64[us]"
+        if type_code is datetime.date:
+            return "datetime64[D]"
+        return "object"
+
+    @staticmethod
+    def to_array(values: Sequence, dtype: str) -> np.ndarray:
+        if dtype not in Columnar.DTYPES:
+            raise ValueError(f"Invalid column dtype: {dtype}")
+        if dtype.startswith("datetime64"):
+            return np.array(values, dtype=dtype)
+        if dtype == "bool":
+            return np.array([bool(v) for v in values], dtype=bool)
+
+        array = np.empty(len(values), dtype=object)
+        array[:] = values
+        if dtype == "object":
+            return array
+        nulls = np.equal(array, None)
+        if nulls.any():
+            array[nulls] = np.nan
+            return array.astype(np.float64)
+        return array.astype(np.float64 if dtype == "float64" else np.int64)
+
+    @staticmethod
+    def from_batches(batches: Iterable[Sequence[Sequence]], names: Sequence[str], dtypes: Sequence[str]) -> Dict[str, np.ndarray]:
+        """
+        Monta as colunas a partir de lotes de linhas. Cada lote é transposto e convertido
+        separadamente, então só um lote de objetos Python existe em memória por vez.
+        """
+        chunks = [[] for _ in names]
+        for batch in batches:
+            if not batch:
+                continue
+            for i, values in enumerate(zip(*batch)):
+                chunks[i].append(Columnar.to_array(values, dtypes[i]))
+
+        columns = {}
+        for name, dtype, parts in zip(names, dtypes, chunks):
+            if not parts:
+                columns[name] = Columnar.to_array((), dtype)
+            elif len(parts) == 1:
+                columns[name] = parts[0]
+            else:
+                columns[name] = np.concatenate(parts)
+        return columns
+
+    @staticmethod
+    def from_rows(rows: Sequence[Sequence], names: Sequence[str], dtypes: Optional[Dict[str, str]] = None) -> Dict[str, np.ndarray]:
+        """Atalho para um único lote, com dtypes por nome (padrão object)."""
+        dtypes = dtypes or {}
+        return Columnar.from_batches([rows], names, [dtypes.get(name, "object") for name in names])
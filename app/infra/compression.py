@@ -0,0 +1,117 @@
+import gzip
+import mimetypes
+import os
+from flask import request, send_from_directory
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+class Compression:
+    """
+    Compressão das respostas da aplicação (br quando o pacote brotli está instalado,
+    senão gzip), conforme o Accept-Encoding do cliente.
+
+    - Respostas dinâmicas: comprimidas no after_request quando o content-type está na
+      allowlist e o corpo tem ao menos COMPRESSION_MIN_SIZE bytes.
+    - Arquivos estáticos: servidos a partir das variantes .br/.gz pré-comprimidas
+      (scripts/precompress_static.py), sem compressão por requisição.
+
+    O ETag das respostas comprimidas recebe o sufixo '-br'/'-gzip', já que o corpo muda.
+    """
+
+    CONTENT_TYPES = (
+        "application/json",
+        "application/javascript",
+        "text/javascript",
+        "text/css",
+        "text/html",
+        "text/plain",
+        "image/svg+xml",
+    )
+    STATIC_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.min_size = 1024
+        self.level = 6
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+        self.min_size = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+        self.level = int(os.getenv("COMPRESSION_LEVEL", "6"))
+        if not self.enabled:
+            return
+        app.after_request(self.compress_response)
+        if app.has_static_folder:
+            app.view_functions["static"] = self._static_view(app)
+
+    @staticmethod
+    def available_encodings():
+        return ("br", "gzip") if brotli is not None else ("gzip",)
+
+    def choose_encoding(self, encodings=None):
+        """Melhor codificação aceita pelo cliente entre `encodings`, ou None."""
+        accepted = request.accept_encodings
+        for encoding in encodings or self.available_encodings():
+            if accepted[encoding] > 0:
+                return encoding
+        return None
+
+    def compress(self, data, encoding):
+        if encoding == "br":
+            # Qualidade 11 (padrão do brotli) é lenta demais para respostas dinâmicas
+            return brotli.compress(data, quality=min(self.level, 11))
+        return gzip.compress(data, compresslevel=self.level)
+
+    def compress_response(self, response):
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in self.CONTENT_TYPES
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+        encoding = self.choose_encoding()
+        if encoding is None:
+            return response
+
+        response.set_data(self.compress(data, encoding))
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f"{etag}-{encoding}", weak=weak)
+        return response
+
+    def _static_view(self, app):
+        original = app.view_functions["static"]
+
+        def static(filename):
+            encoding = self.choose_encoding(encoding for encoding, _ in self.STATIC_ENCODINGS)
+            suffix = dict(self.STATIC_ENCODINGS).get(encoding)
+            if suffix is None or not os.path.isfile(os.path.join(app.static_folder, filename + suffix)):
+                response = original(filename=filename)
+                response.vary.add("Accept-Encoding")
+                return response
+
+            mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            response = send_from_directory(
+                app.static_folder,
+                filename + suffix,
+                mimetype=mimetype,
+                max_age=app.get_send_file_max_age(filename),
+            )
+            response.headers["Content-Encoding"] = encoding
+            response.vary.add("Accept-Encoding")
+            return response
+
+        return static
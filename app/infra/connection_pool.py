@@ -0,0 +1,320 @@
+import os
+import threading
+import time
+from app.infra.statements import StatementCache
+
+
+class PoolTimeoutError(ConnectionError):
+    pass
+
+
+class PooledConnection:
+    __slots__ = ("raw", "created_at", "last_used_at", "statements")
+
+    def __init__(self, raw, statement_cache_size=0):
+        now = time.monotonic()
+        self.raw = raw
+        self.created_at = now
+        self.last_used_at = now
+        self.statements = StatementCache(statement_cache_size)
+
+
+class ConnectionPool:
+    """
+    Pool de conexões limitado e thread-safe, compartilhado por todo o processo.
+
+    As conexões são criadas sob demanda pela `factory` até `max_size`, devolvidas
+    ao pool após o uso e descartadas quando ficam ociosas por mais de
+    `idle_timeout` segundos ou ultrapassam `max_lifetime` segundos de vida.
+    O pool é mantido aquecido com `min_size` conexões: elas são abertas logo após o
+    primeiro checkout (não na importação, para não conectar no master do gunicorn),
+    não expiram por ociosidade e são repostas quando vencem por `max_lifetime`.
+    Antes de ser entregue, toda conexão reaproveitada passa por um health check.
+    Cada conexão carrega seu próprio cache de statements preparados, descartado junto com ela.
+    """
+
+    PRUNE_INTERVAL = 30.0
+
+    _instance = None
+    _instance_pid = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, factory, min_size=1, max_size=10, idle_timeout=300.0,
+                 max_lifetime=3600.0, checkout_timeout=30.0, health_check_query="SELECT 1",
+                 statement_cache_size=32):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Tamanho de pool inválido: min={min_size}, max={max_size}")
+
+        self.factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.checkout_timeout = checkout_timeout
+        self.health_check_query = health_check_query
+        self.statement_cache_size = statement_cache_size
+
+        self._idle = []
+        self._in_use = {}
+        self._size = 0
+        self._closed = False
+        self._warmed = False
+        self._last_prune = time.monotonic()
+        self._condition = threading.Condition(threading.Lock())
+        self._stats = {
+            "connections_created": 0,
+            "connections_closed": 0,
+            "checkouts": 0,
+            "checkout_waits": 0,
+            "checkout_timeouts": 0,
+            "health_check_failures": 0,
+            "expired_idle": 0,
+            "expired_lifetime": 0,
+        }
+
+    @classmethod
+    def get_instance(cls, factory):
+        """
+        Retorna o pool do processo atual, criando-o na primeira chamada.
+        Após um fork (workers do gunicorn) um novo pool é criado, já que
+        conexões ODBC não podem ser compartilhadas entre processos.
+        """
+        pid = os.getpid()
+        if cls._instance is None or cls._instance_pid != pid:
+            with cls._instance_lock:
+                if cls._instance is None or cls._instance_pid != pid:
+                    cls._instance = cls(
+                        factory,
+                        min_size=int(os.getenv("DB_POOL_MIN_SIZE", "1")),
+                        max_size=int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+                        idle_timeout=float(os.getenv("DB_POOL_IDLE_TIMEOUT", "300")),
+                        max_lifetime=float(os.getenv("DB_POOL_MAX_LIFETIME", "3600")),
+                        checkout_timeout=float(os.getenv("DB_POOL_CHECKOUT_TIMEOUT", "30")),
+                        statement_cache_size=int(os.getenv("DB_STATEMENT_CACHE_SIZE", "32")),
+                    )
+                    cls._instance_pid = pid
+        return cls._instance
+
+    @classmethod
+    def reset_instance(cls):
+        with cls._instance_lock:
+            if cls._instance is not None and cls._instance_pid == os.getpid():
+                cls._instance.close()
+            cls._instance = None
+            cls._instance_pid = None
+
+    def acquire(self):
+        deadline = time.monotonic() + self.checkout_timeout
+        waited = False
+        while True:
+            with self._condition:
+                if self._closed:
+                    raise ConnectionError("Pool de conexões encerrado")
+
+                # Conexões expiradas já saíram da contagem; são fechadas fora do lock. Se
+                # houve alguma, há vaga para criar outra, então esse bloco nunca espera
+                expired = self._remove_expired_idle_locked(time.monotonic())
+                # LIFO: a conexão usada mais recentemente tem mais chance de estar viva
+                pooled = self._idle.pop() if self._idle else None
+                if pooled is None and self._size < self.max_size:
+                    self._size += 1
+                    create_new = True
+                elif pooled is None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["checkout_timeouts"] += 1
+                        raise PoolTimeoutError(
+                            f"Tempo esgotado aguardando conexão livre no pool (max_size={self.max_size})"
+                        )
+                    if not waited:
+                        self._stats["checkout_waits"] += 1
+                        waited = True
+                    self._condition.wait(remaining)
+                    continue
+                else:
+                    create_new = False
+
+            for stale in expired:
+                self._close_connection(stale)
+            if create_new:
+                pooled = self._create()
+            elif not self._is_healthy(pooled):
+                with self._condition:
+                    self._stats["health_check_failures"] += 1
+                self._discard(pooled)
+                continue
+
+            with self._condition:
+                pooled.last_used_at = time.monotonic()
+                self._in_use[id(pooled.raw)] = pooled
+                self._stats["checkouts"] += 1
+                warm_up, self._warmed = not self._warmed, True
+            if warm_up:
+                self.ensure_min_size()
+            return pooled.raw
+
+    def release(self, raw, discard=False):
+        with self._condition:
+            pooled = self._in_use.pop(id(raw), None)
+        if pooled is None:
+            return
+
+        if not discard and not self._closed and self._is_expired(pooled, time.monotonic()):
+            with self._condition:
+                self._stats["expired_lifetime"] += 1
+            discard = True
+
+        if discard or self._closed:
+            self._discard(pooled)
+            return
+
+        try:
+            raw.rollback()
+        except Exception:
+            self._discard(pooled)
+            return
+
+        with self._condition:
+            pooled.last_used_at = time.monotonic()
+            self._idle.append(pooled)
+            self._condition.notify()
+            prune_due = pooled.last_used_at - self._last_prune > self.PRUNE_INTERVAL
+            if prune_due:
+                self._last_prune = pooled.last_used_at
+
+        if prune_due:
+            self.prune()
+
+    def get_statement_cache(self, raw):
+        """Cache de statements da conexão em uso `raw`, ou None se ela não pertence ao pool."""
+        with self._condition:
+            pooled = self._in_use.get(id(raw))
+        return pooled.statements if pooled is not None else None
+
+    def prune(self):
+        """Fecha conexões ociosas expiradas, preservando `min_size` conexões abertas."""
+        with self._condition:
+            expired = self._remove_expired_idle_locked(time.monotonic())
+        for pooled in expired:
+            self._close_connection(pooled)
+        if self._warmed:
+            self.ensure_min_size()
+
+    def ensure_min_size(self):
+        """
+        Abre conexões ociosas até o pool ter `min_size` conexões. Melhor esforço: se a
+        `factory` falhar, a conexão fica para ser criada sob demanda no próximo checkout.
+        """
+        while True:
+            with self._condition:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                pooled = self._create()
+            except Exception:
+                return
+            with self._condition:
+                if not self._closed:
+                    # No fundo da pilha LIFO: as conexões em uso recente continuam no topo
+                    self._idle.insert(0, pooled)
+                    self._condition.notify()
+                    continue
+            self._discard(pooled)
+            return
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        for pooled in idle:
+            self._discard(pooled)
+
+    def get_stats(self):
+        with self._condition:
+            stats = dict(self._stats)
+            stats.update({
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+            })
+        return stats
+
+    def _remove_expired_idle_locked(self, now):
+        """
+        Retira de `_idle` as conexões expiradas (tempo de vida, ou ociosidade acima de
+        `min_size`) e as desconta do pool. Chamado com o lock; o chamador fecha as
+        conexões devolvidas depois de liberá-lo.
+        """
+        expired = []
+        keep = []
+        # Das mais antigas para as mais recentes: o mínimo preservado é o usado por último
+        for pooled in self._idle:
+            too_old = self._is_expired(pooled, now)
+            too_idle = self.idle_timeout and now - pooled.last_used_at > self.idle_timeout
+            if too_old or (too_idle and self._size > self.min_size):
+                expired.append(pooled)
+                self._size -= 1
+                self._stats["expired_lifetime" if too_old else "expired_idle"] += 1
+                self._stats["connections_closed"] += 1
+            else:
+                keep.append(pooled)
+        if expired:
+            self._idle = keep
+            self._condition.notify(len(expired))
+        return expired
+
+    def _is_expired(self, pooled, now):
+        return bool(self.max_lifetime) and now - pooled.created_at > self.max_lifetime
+
+    def _create(self):
+        try:
+            raw = self.factory()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._stats["connections_created"] += 1
+        return PooledConnection(raw, self.statement_cache_size)
+
+    def _is_healthy(self, pooled):
+        if not self.health_check_query:
+            return True
+        cursor = None
+        try:
+            cursor = pooled.raw.cursor()
+            cursor.execute(self.health_check_query)
+            cursor.fetchall()
+            return True
+        except Exception:
+            return False
+        finally:
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+
+    def _discard(self, pooled):
+        self._close_connection(pooled)
+        with self._condition:
+            self._size -= 1
+            self._stats["connections_closed"] += 1
+            self._condition.notify()
+
+    @classmethod
+    def _close_connection(cls, pooled):
+        pooled.statements.close()
+        cls._close_raw(pooled.raw)
+
+    @staticmethod
+    def _close_raw(raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
@@ -1,8 +1,20 @@
+import itertools
 import os
+import sqlite3
+import time
 import pyodbc
+from app.infra.columnar import Columnar
+from app.infra.connection_pool import ConnectionPool
+from app.infra.local_sql import LocalSql
+from app.infra.metrics import Metrics
+from app.infra.statements import QueryStats
 
 class Database:
+    query_stats = QueryStats()
+
     def __init__(self):
+        # mssql (padrão) ou sqlite: banco local gerado por scripts/generate_local_db.py (ver LocalSql)
+        self.engine = os.getenv("DB_ENGINE", "mssql").lower()
         self.server = os.getenv("DB_SERVER")
         self.port = os.getenv("DB_PORT")
         self.database = os.getenv("DB_NAME")
@@ -10,9 +22,19 @@ class Database:
         self.password = os.getenv("DB_PASSWORD")
         self.driver = os.getenv("DB_DRIVER", "ODBC Driver 18 for SQL Server")
         self.tds_version = os.getenv("TDS_VERSION")
+        self.statistics_time = os.getenv("DB_STATISTICS_TIME", "false").lower() == "true"
+        self.fetch_batch_size = int(os.getenv("DB_FETCH_BATCH_SIZE", "1000"))
         self.connection = None
+        self.last_timing = None
+        self.last_description = None
+        self._broken = False
 
-    def connect(self):
+    def _open_connection(self):
+        if self.engine == "sqlite":
+            try:
+                return LocalSql.connect()
+            except (pyodbc.Error, sqlite3.Error) as e:
+                raise ConnectionError(f"Erro ao conectar ao banco de dados: {e}")
 
         connection_string = (
             f"DRIVER={{{self.driver}}};"
@@ -26,10 +48,20 @@ class Database:
             f"TrustServerCertificate=no;"
         )
         try:
-            self.connection = pyodbc.connect(connection_string)
+            connection = pyodbc.connect(connection_string)
+            if self.statistics_time:
+                connection.execute("SET STATISTICS TIME ON")
+            return connection
         except pyodbc.Error as e:
             raise ConnectionError(f"Erro ao conectar ao banco de dados: {e}")
 
+    def _get_pool(self):
+        return ConnectionPool.get_instance(self._open_connection)
+
+    def connect(self):
+        self.connection = self._get_pool().acquire()
+        self._broken = False
+
     def get_connection(self):
         if self.connection is None:
             self.connect()
@@ -37,22 +69,171 @@ class Database:
 
     def close_connection(self):
         if self.connection:
-            self.connection.close()
+            self._get_pool().release(self.connection, discard=self._broken)
             self.connection = None
+            self._broken = False
+
+    @staticmethod
+    def get_pool_stats():
+        pool = ConnectionPool._instance
+        if pool is None or ConnectionPool._instance_pid != os.getpid():
+            return {}
+        return pool.get_stats()
+
+    @staticmethod
+    def get_query_stats():
+        return Database.query_stats.get_stats()
 
     def execute_query(self, query, params=None):
+        """
+        Executa a query e retorna todas as linhas. Valores variáveis devem ir em `params`
+        (placeholders `?`): o texto SQL fica estável, o plano é reaproveitado pelo SQL Server
+        e o statement preparado é reaproveitado pelo cache da conexão.
+        Tempos, linhas e bytes da execução ficam em `last_timing` e são acumulados por
+        fingerprint em `Database.query_stats`, que também registra as queries lentas.
+        """
+        cursor = None
+        statements = None
+        reused = False
         try:
+            requested = time.perf_counter()
             conn = self.get_connection()
+            connected = time.perf_counter()
+            statements = self._get_pool().get_statement_cache(conn)
+            if statements is not None:
+                cursor, reused = statements.checkout(conn, query)
+            else:
+                cursor = conn.cursor()
+
+            started = time.perf_counter()
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            executed = time.perf_counter()
+            rows = cursor.fetchall()
+            fetched = time.perf_counter()
+
+            compile_ms, server_execute_ms = (None, None)
+            if self.statistics_time:
+                compile_ms, server_execute_ms = QueryStats.parse_server_times(getattr(cursor, "messages", None))
+            self.last_timing = {
+                "reused": reused,
+                "connect_ms": (connected - requested) * 1000,
+                "execute_ms": (executed - started) * 1000,
+                "fetch_ms": (fetched - executed) * 1000,
+                "compile_ms": compile_ms,
+                "server_execute_ms": server_execute_ms,
+                "rows": len(rows),
+                "bytes": QueryStats.estimate_bytes(rows),
+            }
+            self._record(query, self.last_timing, params)
+            return rows
+        except (pyodbc.OperationalError, pyodbc.InterfaceError) as e:
+            self._broken = True
+            self._record_error(query, params, e)
+            raise RuntimeError(f"Erro ao executar a query: {e}")
+        except pyodbc.Error as e:
+            if statements is not None:
+                statements.discard(query)
+                cursor = None
+            self._record_error(query, params, e)
+            raise RuntimeError(f"Erro ao executar a query: {e}")
+        finally:
+            if statements is None and cursor is not None:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+
+    @staticmethod
+    def _record(query, timing, params):
+        Database.query_stats.record(query, timing, params)
+        Metrics.observe_query((timing["connect_ms"] + timing["execute_ms"] + timing["fetch_ms"]) / 1000)
+
+    @staticmethod
+    def _record_error(query, params, error):
+        Database.query_stats.record_error(query, params, error)
+        Metrics.observe_query(0, failed=True)
+
+    def iter_query(self, query, params=None, batch_size=None):
+        """
+        Versão em streaming de `execute_query` para leituras grandes: gera as linhas lidas
+        em lotes de `batch_size` (padrão DB_FETCH_BATCH_SIZE) com fetchmany, de modo que a
+        memória fica proporcional ao lote e não ao resultado. A conexão permanece ocupada
+        até o gerador ser esgotado ou fechado; por isso o cursor não entra no cache de
+        statements. Em `last_timing`, `fetch_ms` inclui o tempo de quem consome as linhas.
+        """
+        for batch in self.iter_batches(query, params, batch_size):
+            yield from batch
+
+    def iter_batches(self, query, params=None, batch_size=None):
+        """
+        Como `iter_query`, mas gera os lotes do fetchmany inteiros. `last_description`
+        recebe o cursor.description assim que a query é executada.
+        """
+        batch_size = batch_size or self.fetch_batch_size
+        cursor = None
+        try:
+            requested = time.perf_counter()
+            conn = self.get_connection()
+            connected = time.perf_counter()
             cursor = conn.cursor()
+            cursor.arraysize = batch_size
+
+            started = time.perf_counter()
             if params:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
-            return cursor.fetchall()
+            executed = time.perf_counter()
+            self.last_description = cursor.description
+
+            row_count = 0
+            byte_count = 0
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                row_count += len(rows)
+                byte_count += QueryStats.estimate_bytes(rows)
+                yield rows
+            fetched = time.perf_counter()
+
+            self.last_timing = {
+                "reused": False,
+                "connect_ms": (connected - requested) * 1000,
+                "execute_ms": (executed - started) * 1000,
+                "fetch_ms": (fetched - executed) * 1000,
+                "compile_ms": None,
+                "server_execute_ms": None,
+                "rows": row_count,
+                "bytes": byte_count,
+            }
+            self._record(query, self.last_timing, params)
+        except (pyodbc.OperationalError, pyodbc.InterfaceError) as e:
+            self._broken = True
+            self._record_error(query, params, e)
+            raise RuntimeError(f"Erro ao executar a query: {e}")
         except pyodbc.Error as e:
+            self._record_error(query, params, e)
             raise RuntimeError(f"Erro ao executar a query: {e}")
         finally:
-            try:
-                cursor.close()
-            except Exception:
-                pass
\ No newline at end of file
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+
+    def fetch_columns(self, query, params=None, dtypes=None, batch_size=None):
+        """
+        Executa a query e retorna o resultado em colunas: {nome da coluna: np.ndarray}.
+        O dtype de cada coluna vem de `dtypes` (por nome) ou é inferido do tipo informado
+        pelo driver (ver Columnar). A conversão é feita por lote, sem criar dicts por linha.
+        """
+        dtypes = dtypes or {}
+        batches = self.iter_batches(query, params, batch_size)
+        first = next(batches, [])
+        names = [column[0] for column in self.last_description or ()]
+        column_dtypes = [dtypes.get(name) or Columnar.infer_dtype(column[1]) for name, column in zip(names, self.last_description or ())]
+        return Columnar.from_batches(itertools.chain([first], batches), names, column_dtypes)
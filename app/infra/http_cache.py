@@ -0,0 +1,57 @@
+import functools
+import hashlib
+import os
+import time
+from flask import make_response, request
+from flask_login import current_user
+
+def time_bucket(max_age):
+    """Janela de tempo atual com `max_age` segundos, para versões de dados sem watermark."""
+    return int(time.time() // max(int(max_age), 1))
+
+def get_max_age():
+    return int(os.getenv("HTTP_CACHE_MAX_AGE", "60"))
+
+def conditional(version):
+    """
+    Decorator de views JSON com ETag forte e `Cache-Control: private, max-age`.
+
+    `version(max_age)` retorna a versão dos dados da view (geração do cache de resultados,
+    watermark do snapshot, ...) sem executar a consulta do service. O ETag combina essa
+    versão com o caminho, os parâmetros e o usuário; se ele coincide com o If-None-Match
+    da requisição, a resposta é 304 e a view não é chamada. Deve ficar depois do
+    login_required. HTTP_CACHE_MAX_AGE=0 desativa o cache no navegador, mas mantém o 304.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            max_age = get_max_age()
+            try:
+                etag = build_etag(version(max_age))
+            except Exception:
+                return view(*args, **kwargs)
+
+            if matches(etag, request.if_none_match):
+                response = make_response("", 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = f"private, max-age={max_age}"
+            response.vary.add("Cookie")
+            return response
+
+        return wrapper
+
+    return decorator
+
+def matches(etag, if_none_match):
+    """Aceita também as variantes comprimidas do ETag ('<etag>-gzip', '<etag>-br')."""
+    return etag in if_none_match or any(tag.startswith(f"{etag}-") for tag in if_none_match.as_set())
+
+def build_etag(data_version):
+    user_id = current_user.get_id() if current_user else None
+    params = "&".join(f"{key}={value}" for key, value in sorted(request.args.items(multi=True)))
+    payload = "\n".join([request.path, params, str(user_id), str(data_version)])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
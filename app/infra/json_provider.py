@@ -0,0 +1,64 @@
+import dataclasses
+import datetime
+import decimal
+import json
+import os
+import uuid
+import numpy as np
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(obj):
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Provider JSON do Flask que usa o orjson quando ele está instalado (dependência opcional;
+    JSON_BACKEND=stdlib força o json da stdlib). Nos dois casos a saída é a mesma: chaves
+    ordenadas, sem espaços, datas em ISO 8601 (com offset quando houver timezone),
+    Decimal como número e arrays NumPy como listas.
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.use_orjson = orjson is not None and os.getenv("JSON_BACKEND", "orjson").lower() != "stdlib"
+
+    def dumps(self, obj, **kwargs):
+        if self.use_orjson and not kwargs:
+            option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+            return orjson.dumps(obj, default=_default, option=option).decode("utf-8")
+        kwargs.setdefault("default", _default)
+        kwargs.setdefault("ensure_ascii", False)
+        kwargs.setdefault("sort_keys", True)
+        if "indent" not in kwargs:
+            kwargs.setdefault("separators", (",", ":"))
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if self._app.debug:
+            return super().response(obj)
+        return self._app.response_class(f"{self.dumps(obj)}\n", mimetype=self.mimetype)
@@ -0,0 +1,148 @@
+import hashlib
+import logging
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class LiveUpdates:
+    """
+    Difusão de KPIs por Server-Sent Events. Uma única thread por processo chama `producer`
+    a cada LIVE_UPDATES_INTERVAL segundos e, quando o resultado muda, envia o mesmo evento
+    já serializado para todas as conexões abertas. Os services passam pelo ResultCache,
+    então N dashboards abertos custam uma computação por intervalo, e não N.
+
+    Cada conexão SSE ocupa uma thread do worker gthread enquanto está aberta, por isso o
+    número de streams por processo é limitado (LIVE_UPDATES_MAX_STREAMS; o gunicorn.conf.py
+    reserva essas threads) e cada stream é encerrado depois de LIVE_UPDATES_STREAM_TTL
+    segundos; o EventSource do navegador reconecta sozinho após `retry` ms. Acima do
+    limite, a conexão recebe só um `retry` de `busy_retry_ms` e é encerrada.
+    """
+
+    EVENT_NAME = "kpis"
+
+    def __init__(self, producer, serialize, interval=None, max_streams=None, stream_ttl=None, heartbeat=None, retry_ms=5000,
+                 busy_retry_ms=60000):
+        self.producer = producer
+        self.serialize = serialize
+        self.interval = float(interval if interval is not None else os.getenv("LIVE_UPDATES_INTERVAL", "30"))
+        self.max_streams = int(max_streams if max_streams is not None else os.getenv("LIVE_UPDATES_MAX_STREAMS", "16"))
+        self.stream_ttl = float(stream_ttl if stream_ttl is not None else os.getenv("LIVE_UPDATES_STREAM_TTL", "600"))
+        self.heartbeat = float(heartbeat if heartbeat is not None else os.getenv("LIVE_UPDATES_HEARTBEAT", "15"))
+        self.retry_ms = retry_ms
+        self.busy_retry_ms = busy_retry_ms
+
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._latest = None
+        self._publisher = None
+        self._pid = None
+        self.published = 0
+
+    def subscribe(self):
+        """Fila de eventos de uma nova conexão, ou None se o limite de streams foi atingido."""
+        with self._lock:
+            self._reset_after_fork()
+            if len(self._subscribers) >= self.max_streams:
+                return None
+            subscriber = queue.Queue(maxsize=8)
+            self._subscribers.add(subscriber)
+            if self._latest is not None:
+                subscriber.put_nowait(self._latest)
+            if self._publisher is None or not self._publisher.is_alive():
+                self._publisher = threading.Thread(target=self._run, name="live-updates", daemon=True)
+                self._publisher.start()
+            return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def stream(self, subscriber, last_event_id=None):
+        """
+        Gerador do corpo text/event-stream. Um cliente que reconecta com o Last-Event-ID do
+        evento atual não recebe de novo o mesmo payload.
+        """
+        deadline = time.monotonic() + self.stream_ttl
+        try:
+            yield f"retry: {self.retry_ms}\n\n"
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                try:
+                    event_id, frame = subscriber.get(timeout=min(self.heartbeat, remaining))
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if event_id != last_event_id:
+                    last_event_id = event_id
+                    yield frame
+        finally:
+            self.unsubscribe(subscriber)
+
+    def busy_stream(self):
+        """Corpo para quem excedeu o limite de streams: o EventSource tenta de novo só depois de `busy_retry_ms`."""
+        yield f"retry: {self.busy_retry_ms}\n: limite de streams atingido\n\n"
+
+    def publish(self, payload):
+        """Serializa o payload uma vez e o entrega a todas as conexões, se ele mudou."""
+        data = self.serialize(payload)
+        event_id = hashlib.sha1(data.encode("utf-8")).hexdigest()[:16]
+        with self._lock:
+            if self._latest is not None and self._latest[0] == event_id:
+                return False
+            latest = self._latest = (event_id, self.format_event(event_id, self.EVENT_NAME, data))
+            subscribers = list(self._subscribers)
+            self.published += 1
+
+        for subscriber in subscribers:
+            # Conexão lenta: descarta o evento mais antigo, só o último importa
+            while True:
+                try:
+                    subscriber.put_nowait(latest)
+                    break
+                except queue.Full:
+                    try:
+                        subscriber.get_nowait()
+                    except queue.Empty:
+                        pass
+        return True
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "streams": len(self._subscribers),
+                "max_streams": self.max_streams,
+                "interval": self.interval,
+                "published": self.published,
+                "last_event_id": self._latest[0] if self._latest else None,
+            }
+
+    @staticmethod
+    def format_event(event_id, event, data):
+        lines = "".join(f"data: {line}\n" for line in data.splitlines() or [""])
+        return f"id: {event_id}\nevent: {event}\n{lines}\n"
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    self._publisher = None
+                    return
+            try:
+                self.publish(self.producer())
+            except Exception:
+                logger.exception("Erro ao atualizar os KPIs ao vivo")
+            time.sleep(self.interval)
+
+    def _reset_after_fork(self):
+        # Threads não sobrevivem ao fork do gunicorn: o estado herdado do master é descartado
+        pid = os.getpid()
+        if self._pid != pid:
+            self._pid = pid
+            self._subscribers = set()
+            self._latest = None
+            self._publisher = None
@@ -0,0 +1,407 @@
+import json
+import os
+import re
+import sqlite3
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from functools import lru_cache
+import pyodbc
+from app.utils.business_calendar import BusinessCalendar
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_LOCAL_DB_PATH = os.path.join(ROOT_DIR, "var", "livework.sqlite3")
+DEFAULT_SCHEMA_PATH = os.path.join(ROOT_DIR, "schemas", "schema.json")
+
+class LocalSql:
+    """
+    Substituto local (SQLite) do banco LiveWork para rodar e medir as queries dos services
+    sem o SQL Server. Com DB_ENGINE=sqlite, Database abre conexões com `connect` no arquivo
+    DB_LOCAL_PATH (gerado por scripts/generate_local_db.py) em vez do pyodbc.
+
+    As tabelas usadas pelos services são criadas a partir de schemas/schema.json e as
+    queries são traduzidas de T-SQL por `translate`. As funções do SQL Server (DATEDIFF,
+    DATEADD, FORMAT, dbo.fn_DataVencimentoAjustada...) são registradas em Python em cada
+    conexão. A conexão imita o pyodbc no que o Database usa: datas voltam como date/datetime
+    e erros do SQLite viram pyodbc.Error.
+    """
+
+    TABLES = ("dbo.Operacao", "dbo.Documento", "dbo.Cliente", "dbo.CadastroBase", "dbo.Agente", "dbo.Feriado", "dbo.Empresa")
+    # Colunas lidas pelas queries que não constam em schemas/schema.json
+    EXTRA_COLUMNS = {
+        "dbo.Documento": [{"name": "Valor", "data_type": "money", "is_nullable": False}],
+    }
+    INDEXES = (
+        "CREATE INDEX IF NOT EXISTS ix_operacao_data ON Operacao (Data)",
+        "CREATE INDEX IF NOT EXISTS ix_operacao_cliente ON Operacao (ClienteId)",
+        "CREATE INDEX IF NOT EXISTS ix_operacao_timestamp ON Operacao (TimeStamp)",
+        "CREATE INDEX IF NOT EXISTS ix_documento_vencimento ON Documento (DataVencimento)",
+        "CREATE INDEX IF NOT EXISTS ix_documento_emissao ON Documento (DataEmissao)",
+        "CREATE INDEX IF NOT EXISTS ix_documento_timestamp ON Documento (TimeStamp)",
+    )
+
+    TYPES = {
+        "uniqueidentifier": "TEXT", "varchar": "TEXT", "nvarchar": "TEXT", "char": "TEXT", "nchar": "TEXT",
+        "text": "TEXT", "ntext": "TEXT", "time": "TEXT",
+        "date": "DATE", "datetime": "DATETIME", "smalldatetime": "DATETIME", "datetime2": "DATETIME",
+        "bit": "INTEGER", "tinyint": "INTEGER", "smallint": "INTEGER", "int": "INTEGER", "bigint": "INTEGER",
+        "money": "REAL", "smallmoney": "REAL", "decimal": "REAL", "numeric": "REAL", "float": "REAL", "real": "REAL",
+        "timestamp": "BLOB", "rowversion": "BLOB", "binary": "BLOB", "varbinary": "BLOB", "image": "BLOB",
+    }
+    # Padrão das colunas NOT NULL, para que os INSERTs listem só as colunas usadas
+    DEFAULTS = {
+        "TEXT": "''", "DATE": "'1900-01-01'", "DATETIME": "'1900-01-01 00:00:00'",
+        "INTEGER": "0", "REAL": "0", "BLOB": "X'0000000000000000'",
+    }
+    NULL_GUID = "00000000-0000-0000-0000-000000000000"
+
+    _REWRITES = (
+        (re.compile(r"\bOPTION\s*\(\s*MAXRECURSION\s+\d+\s*\)", re.IGNORECASE), ""),
+        (re.compile(r"\bdbo\.", re.IGNORECASE), ""),
+        (re.compile(r"\b(DATEADD|DATEDIFF|DATEPART)\s*\(\s*(\w+)\s*,", re.IGNORECASE), r"\1('\2',"),
+        (re.compile(r"\bCAST\s*\(((?:[^()]|\([^()]*\))*?)\s+AS\s+DATE\s*\)", re.IGNORECASE), r"tsql_date(\1)"),
+        (re.compile(r"\bISNULL\s*\(", re.IGNORECASE), "IFNULL("),
+        (re.compile(r"\bLEFT\s*\(", re.IGNORECASE), "tsql_left("),
+        (re.compile(r"\bMIN_ACTIVE_ROWVERSION\s*\(\s*\)", re.IGNORECASE), "(SELECT tsql_rowversion(value + 1) FROM rowversion_counter)"),
+        # Concatenação com literal: 'a' + x / x + 'a'
+        (re.compile(r"\+\s*(N?')"), r"|| \1"),
+    )
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def translate(query):
+        """Texto T-SQL das queries dos services reescrito para o SQLite."""
+        for pattern, replacement in LocalSql._REWRITES:
+            query = pattern.sub(replacement, query)
+        return query
+
+    @staticmethod
+    def connect(path=None, readonly=True):
+        path = path or os.getenv("DB_LOCAL_PATH", DEFAULT_LOCAL_DB_PATH)
+        if readonly:
+            if not os.path.isfile(path):
+                raise pyodbc.OperationalError(f"Banco local não encontrado: {path} (gere com scripts/generate_local_db.py)")
+            raw = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False, timeout=30)
+        else:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            raw = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        LocalSql.register_functions(raw)
+        return LocalConnection(raw)
+
+    @staticmethod
+    def register_functions(raw):
+        calendar = {}
+
+        def adjusted_due_date(value, state=None, city=None):
+            day = LocalSql._to_date(value)
+            if day is None:
+                return None
+            if "instance" not in calendar:
+                calendar["instance"] = LocalSql.load_calendar(raw)
+            return calendar["instance"].adjust_due_date(day, state, city).isoformat()
+
+        deterministic = {"deterministic": True}
+        raw.create_function("GETDATE", 0, LocalSql.getdate)
+        raw.create_function("DATEADD", 3, LocalSql.dateadd, **deterministic)
+        raw.create_function("DATEDIFF", 3, LocalSql.datediff, **deterministic)
+        raw.create_function("DATEPART", 2, LocalSql.datepart, **deterministic)
+        raw.create_function("FORMAT", 2, LocalSql.format, **deterministic)
+        raw.create_function("CHARINDEX", 2, LocalSql.charindex, **deterministic)
+        raw.create_function("tsql_date", 1, LocalSql.to_date_text, **deterministic)
+        raw.create_function("tsql_left", 2, LocalSql.left, **deterministic)
+        raw.create_function("tsql_rowversion", 1, LocalSql.rowversion, **deterministic)
+        raw.create_function("fn_DataVencimentoAjustada", 3, adjusted_due_date, **deterministic)
+
+    @staticmethod
+    def load_calendar(raw):
+        """BusinessCalendar com os feriados da tabela Feriado do banco local."""
+        rows = raw.execute(
+            "SELECT f.Data, f.ERecorrente, f.Tipo, e.Estado, e.Cidade FROM Feriado f "
+            "LEFT JOIN Empresa e ON e.Id = f.EmpresaId WHERE f.IsDeleted = 0"
+        ).fetchall()
+        return BusinessCalendar(*BusinessCalendar.group_holidays(rows))
+
+    @staticmethod
+    def create_schema(raw, schema_path=None):
+        """Cria as tabelas de TABLES (mais EXTRA_COLUMNS), índices e o contador de rowversion."""
+        with open(schema_path or DEFAULT_SCHEMA_PATH, encoding="utf-8") as f:
+            tables = json.load(f)["tables"]
+
+        statements = ["CREATE TABLE IF NOT EXISTS rowversion_counter (value INTEGER NOT NULL)"]
+        for name in LocalSql.TABLES:
+            table = tables[name]
+            columns = table["columns"] + LocalSql.EXTRA_COLUMNS.get(name, [])
+            definitions = [LocalSql._column_definition(column) for column in columns]
+            if table.get("primary_keys"):
+                definitions.append(f"PRIMARY KEY ({', '.join(LocalSql._quote(key) for key in table['primary_keys'])})")
+            local_name = table["table"]
+            statements.append(f"CREATE TABLE IF NOT EXISTS {LocalSql._quote(local_name)} (\n    " + ",\n    ".join(definitions) + "\n)")
+            if any(column["data_type"] == "timestamp" for column in columns):
+                statements.extend(LocalSql._rowversion_triggers(local_name))
+        statements.extend(LocalSql.INDEXES)
+
+        for statement in statements:
+            raw.execute(statement)
+        if raw.execute("SELECT COUNT(*) FROM rowversion_counter").fetchone()[0] == 0:
+            raw.execute("INSERT INTO rowversion_counter (value) VALUES (0)")
+        raw.commit()
+
+    @staticmethod
+    def _column_definition(column):
+        local_type = LocalSql.TYPES.get(column["data_type"], "TEXT")
+        definition = f"{LocalSql._quote(column['name'])} {local_type}"
+        if not column["is_nullable"]:
+            default = LocalSql.DEFAULTS[local_type]
+            if column["data_type"] == "uniqueidentifier":
+                default = f"'{LocalSql.NULL_GUID}'"
+            definition += f" NOT NULL DEFAULT {default}"
+        return definition
+
+    @staticmethod
+    def _rowversion_triggers(table):
+        # Como o rowversion do SQL Server: toda linha inserida ou alterada recebe o próximo
+        # valor do contador, salvo quando o TimeStamp já vem preenchido (carga do gerador)
+        quoted = LocalSql._quote(table)
+        bump = f"""
+            UPDATE rowversion_counter SET value = value + 1;
+            UPDATE {quoted} SET "TimeStamp" = (SELECT tsql_rowversion(value) FROM rowversion_counter) WHERE rowid = NEW.rowid;
+        """
+        return [
+            f"""CREATE TRIGGER IF NOT EXISTS {LocalSql._quote(table + '_rowversion_insert')} AFTER INSERT ON {quoted}
+            WHEN NEW."TimeStamp" = X'0000000000000000'
+            BEGIN {bump} END""",
+            f"""CREATE TRIGGER IF NOT EXISTS {LocalSql._quote(table + '_rowversion_update')} AFTER UPDATE ON {quoted}
+            WHEN NEW."TimeStamp" IS OLD."TimeStamp"
+            BEGIN {bump} END""",
+        ]
+
+    @staticmethod
+    def _quote(identifier):
+        return '"' + identifier.replace('"', '""') + '"'
+
+    @staticmethod
+    def getdate():
+        return datetime.now().isoformat(sep=" ", timespec="milliseconds")
+
+    @staticmethod
+    def dateadd(unit, number, value):
+        moment = LocalSql._to_datetime(value)
+        if moment is None or number is None:
+            return None
+        unit = unit.upper()
+        if unit in ("YEAR", "YY", "YYYY", "MONTH", "MM", "M", "QUARTER", "QQ", "Q"):
+            months = int(number) * {"Y": 12, "Q": 3}.get(unit[0], 1)
+            total = moment.year * 12 + moment.month - 1 + months
+            year, month = divmod(total, 12)
+            day = min(moment.day, LocalSql._days_in_month(year, month + 1))
+            moment = moment.replace(year=year, month=month + 1, day=day)
+        else:
+            moment += timedelta(**{LocalSql._timedelta_unit(unit): int(number)})
+        return LocalSql._like(value, moment)
+
+    @staticmethod
+    def datediff(unit, start, end):
+        start, end = LocalSql._to_datetime(start), LocalSql._to_datetime(end)
+        if start is None or end is None:
+            return None
+        unit = unit.upper()
+        # Como no SQL Server: conta as fronteiras da unidade cruzadas entre as datas
+        if unit in ("YEAR", "YY", "YYYY"):
+            return end.year - start.year
+        if unit in ("MONTH", "MM", "M"):
+            return (end.year - start.year) * 12 + end.month - start.month
+        if unit in ("DAY", "DD", "D"):
+            return (end.date() - start.date()).days
+        if unit in ("WEEK", "WK", "WW"):
+            # Semanas começando no domingo (DATEFIRST 7)
+            return ((end.date() - start.date()).days + (start.isoweekday() % 7) - (end.isoweekday() % 7)) // 7
+        seconds = {"HOUR": 3600, "HH": 3600, "MINUTE": 60, "MI": 60, "N": 60, "SECOND": 1, "SS": 1, "S": 1}
+        if unit not in seconds:
+            raise ValueError(f"Unsupported DATEDIFF unit: {unit}")
+        size = seconds[unit]
+        epoch = datetime(1900, 1, 1)
+        return int((end - epoch).total_seconds() // size - (start - epoch).total_seconds() // size)
+
+    @staticmethod
+    def datepart(unit, value):
+        moment = LocalSql._to_datetime(value)
+        if moment is None:
+            return None
+        unit = unit.upper()
+        if unit in ("WEEKDAY", "DW", "W"):
+            return moment.isoweekday() % 7 + 1  # domingo = 1 (DATEFIRST 7)
+        parts = {
+            "YEAR": moment.year, "YY": moment.year, "YYYY": moment.year,
+            "QUARTER": (moment.month - 1) // 3 + 1, "QQ": (moment.month - 1) // 3 + 1, "Q": (moment.month - 1) // 3 + 1,
+            "MONTH": moment.month, "MM": moment.month, "M": moment.month,
+            "DAY": moment.day, "DD": moment.day, "D": moment.day,
+            "DAYOFYEAR": moment.timetuple().tm_yday, "DY": moment.timetuple().tm_yday, "Y": moment.timetuple().tm_yday,
+            "HOUR": moment.hour, "HH": moment.hour, "MINUTE": moment.minute, "MI": moment.minute, "SECOND": moment.second, "SS": moment.second,
+        }
+        if unit not in parts:
+            raise ValueError(f"Unsupported DATEPART unit: {unit}")
+        return parts[unit]
+
+    @staticmethod
+    def format(value, pattern):
+        moment = LocalSql._to_datetime(value)
+        if moment is None or pattern is None:
+            return None
+        tokens = (("yyyy", "%Y"), ("yy", "%y"), ("MM", "%m"), ("dd", "%d"), ("HH", "%H"), ("mm", "%M"), ("ss", "%S"))
+        for token, directive in tokens:
+            pattern = pattern.replace(token, directive)
+        return moment.strftime(pattern)
+
+    @staticmethod
+    def charindex(substring, value):
+        if substring is None or value is None:
+            return None
+        return str(value).find(str(substring)) + 1
+
+    @staticmethod
+    def left(value, length):
+        if value is None or length is None:
+            return None
+        return str(value)[:max(int(length), 0)]
+
+    @staticmethod
+    def rowversion(value):
+        return int(value).to_bytes(8, "big")
+
+    @staticmethod
+    def to_date_text(value):
+        day = LocalSql._to_date(value)
+        return day.isoformat() if day is not None else None
+
+    @staticmethod
+    def _to_datetime(value):
+        if value is None:
+            return None
+        if isinstance(value, (int, float)):
+            return datetime(1900, 1, 1) + timedelta(days=value)
+        return datetime.fromisoformat(str(value).replace("T", " "))
+
+    @staticmethod
+    def _to_date(value):
+        moment = LocalSql._to_datetime(value)
+        return moment.date() if moment is not None else None
+
+    @staticmethod
+    def _like(original, moment):
+        # Uma data sem hora continua sem hora depois do DATEADD em dias/meses/anos
+        if isinstance(original, str) and len(original) == 10 and moment.time() == datetime.min.time():
+            return moment.date().isoformat()
+        return moment.isoformat(sep=" ", timespec="milliseconds" if moment.microsecond else "seconds")
+
+    @staticmethod
+    def _timedelta_unit(unit):
+        units = {
+            "DAY": "days", "DD": "days", "D": "days", "DAYOFYEAR": "days", "DY": "days", "Y": "days",
+            "WEEKDAY": "days", "DW": "days", "W": "days",
+            "WEEK": "weeks", "WK": "weeks", "WW": "weeks",
+            "HOUR": "hours", "HH": "hours", "MINUTE": "minutes", "MI": "minutes", "N": "minutes",
+            "SECOND": "seconds", "SS": "seconds", "S": "seconds",
+        }
+        if unit not in units:
+            raise ValueError(f"Unsupported DATEADD unit: {unit}")
+        return units[unit]
+
+    @staticmethod
+    def _days_in_month(year, month):
+        following = date(year + month // 12, month % 12 + 1, 1)
+        return (following - timedelta(days=1)).day
+
+    @staticmethod
+    def adapt_param(value):
+        """Parâmetros no formato em que as colunas são gravadas (texto ISO)."""
+        if isinstance(value, datetime):
+            if value.time() == datetime.min.time():
+                return value.date().isoformat()
+            return value.isoformat(sep=" ")
+        if isinstance(value, date):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return float(value)
+        if isinstance(value, bool):
+            return int(value)
+        return value
+
+    @staticmethod
+    def convert_value(value):
+        """
+        Valores no tipo que o pyodbc devolveria: texto ISO de data/hora vira date/datetime e
+        REAL vira Decimal (money/decimal no SQL Server), pela representação mais curta do
+        float, de modo que float(valor) devolve exatamente o número lido.
+        """
+        if isinstance(value, float):
+            return Decimal(repr(value)) if value == value else None
+        if isinstance(value, str) and len(value) in (10, 19, 23, 26) and value[4:5] == "-" and value[7:8] == "-":
+            try:
+                if len(value) == 10:
+                    return date.fromisoformat(value)
+                return datetime.fromisoformat(value)
+            except ValueError:
+                return value
+        return value
+
+
+class LocalConnection:
+    """Conexão SQLite com a interface do pyodbc usada por Database e ConnectionPool."""
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def cursor(self):
+        return LocalCursor(self.raw.cursor())
+
+    def execute(self, query, params=None):
+        cursor = self.cursor()
+        return cursor.execute(query, params) if params else cursor.execute(query)
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def close(self):
+        self.raw.close()
+
+
+class LocalCursor:
+    def __init__(self, raw):
+        self.raw = raw
+        self.arraysize = 1
+        self.messages = []
+
+    @property
+    def description(self):
+        return self.raw.description
+
+    def execute(self, query, params=None):
+        params = tuple(LocalSql.adapt_param(value) for value in (params or ()))
+        try:
+            self.raw.execute(LocalSql.translate(query), params)
+        except (sqlite3.ProgrammingError, sqlite3.OperationalError) as e:
+            raise pyodbc.ProgrammingError(str(e))
+        except sqlite3.Error as e:
+            raise pyodbc.Error(str(e))
+        return self
+
+    def fetchall(self):
+        return [self._convert(row) for row in self.raw.fetchall()]
+
+    def fetchmany(self, size=None):
+        return [self._convert(row) for row in self.raw.fetchmany(size or self.arraysize)]
+
+    def fetchone(self):
+        row = self.raw.fetchone()
+        return self._convert(row) if row is not None else None
+
+    def close(self):
+        self.raw.close()
+
+    @staticmethod
+    def _convert(row):
+        return tuple(LocalSql.convert_value(value) for value in row)
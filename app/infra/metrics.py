@@ -0,0 +1,148 @@
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from flask import g, request
+
+try:
+    import prometheus_client
+    from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+except ImportError:
+    prometheus_client = None
+
+# Método de service que está executando queries; definido pelo decorator `cached`
+_query_caller = contextvars.ContextVar("query_caller", default="other")
+
+class Metrics:
+    """
+    Métricas no formato do Prometheus (dependência opcional prometheus_client), expostas
+    em /metrics: latência das requisições por endpoint, latência das queries por método de
+    service, conexões do pool, acertos/faltas do ResultCache e requisições em andamento.
+
+    Com PROMETHEUS_MULTIPROC_DIR definido (o gunicorn.conf.py define), cada worker grava
+    seus valores em arquivos desse diretório e /metrics agrega todos os processos, não só
+    o worker que atendeu a coleta.
+
+    O /metrics exige login; para a coleta do Prometheus defina METRICS_TOKEN e configure
+    o job com `authorization: {credentials: <token>}` (envia `Authorization: Bearer`).
+    """
+
+    LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    _metrics = None
+    _metrics_lock = threading.Lock()
+
+    def __init__(self, app=None):
+        self.enabled = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = prometheus_client is not None and os.getenv("METRICS_ENABLED", "true").lower() == "true"
+        if not self.enabled:
+            return
+        metrics = self.get_metrics()
+        metrics["workers"].set(1)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    @classmethod
+    def get_metrics(cls):
+        """Métricas do processo, registradas uma única vez (ou None sem prometheus_client)."""
+        if prometheus_client is None:
+            return None
+        if cls._metrics is None:
+            with cls._metrics_lock:
+                if cls._metrics is None:
+                    cls._metrics = {
+                        "request_latency": Histogram(
+                            "http_request_duration_seconds", "Latência das requisições HTTP",
+                            ["method", "endpoint", "status"], buckets=cls.LATENCY_BUCKETS,
+                        ),
+                        "in_flight": Gauge(
+                            "http_requests_in_flight", "Requisições em andamento", multiprocess_mode="livesum",
+                        ),
+                        "query_latency": Histogram(
+                            "db_query_duration_seconds", "Latência das queries (conexão, execução e leitura)",
+                            ["caller"], buckets=cls.LATENCY_BUCKETS,
+                        ),
+                        "query_errors": Counter("db_query_errors", "Queries que falharam", ["caller"]),
+                        "pool_connections": Gauge(
+                            "db_pool_connections", "Conexões do pool por estado", ["state"], multiprocess_mode="livesum",
+                        ),
+                        "pool_events": Gauge(
+                            "db_pool_events", "Eventos acumulados do pool dos workers ativos", ["event"], multiprocess_mode="livesum",
+                        ),
+                        "cache_requests": Counter("cache_requests", "Consultas ao ResultCache", ["namespace", "result"]),
+                        "workers": Gauge("app_workers", "Processos da aplicação ativos", multiprocess_mode="livesum"),
+                    }
+        return cls._metrics
+
+    @staticmethod
+    def observe_query(seconds, failed=False):
+        metrics = Metrics.get_metrics()
+        if metrics is None:
+            return
+        caller = _query_caller.get()
+        if failed:
+            metrics["query_errors"].labels(caller).inc()
+        else:
+            metrics["query_latency"].labels(caller).observe(seconds)
+
+    @staticmethod
+    def count_cache(namespace, result):
+        metrics = Metrics.get_metrics()
+        if metrics is not None:
+            metrics["cache_requests"].labels(namespace, result).inc()
+
+    @staticmethod
+    @contextmanager
+    def query_caller(caller):
+        """Rotula com `caller` ('operations_service.get_daily_volume_data') as queries executadas no bloco."""
+        token = _query_caller.set(caller)
+        try:
+            yield
+        finally:
+            _query_caller.reset(token)
+
+    @staticmethod
+    def update_pool_gauges():
+        from app.infra.db_connection import Database
+
+        metrics = Metrics.get_metrics()
+        stats = Database.get_pool_stats()
+        if metrics is None or not stats:
+            return
+        metrics["pool_connections"].labels("in_use").set(stats["in_use"])
+        metrics["pool_connections"].labels("idle").set(stats["idle"])
+        for event in ("checkouts", "checkout_waits", "checkout_timeouts", "health_check_failures", "connections_created"):
+            metrics["pool_events"].labels(event).set(stats[event])
+
+    @staticmethod
+    def render():
+        """(corpo, content-type) da coleta, agregando os workers no modo multiprocesso."""
+        Metrics.update_pool_gauges()
+        if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = prometheus_client.REGISTRY
+        return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
+
+    def _before_request(self):
+        g.metrics_started_at = time.perf_counter()
+        self.get_metrics()["in_flight"].inc()
+
+    def _after_request(self, response):
+        started_at = g.get("metrics_started_at")
+        if started_at is not None:
+            metrics = self.get_metrics()
+            metrics["request_latency"].labels(request.method, request.endpoint or "unmatched", str(response.status_code)).observe(time.perf_counter() - started_at)
+            self.update_pool_gauges()
+        return response
+
+    def _teardown_request(self, error=None):
+        if g.pop("metrics_started_at", None) is not None:
+            self.get_metrics()["in_flight"].dec()
@@ -0,0 +1,94 @@
+import fcntl
+import hashlib
+import os
+import threading
+
+class _Call:
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Deduplica execuções concorrentes com a mesma chave: a primeira thread executa a função
+    e as demais aguardam e recebem o mesmo resultado (ou a mesma exceção).
+
+    Com `lock_dir` configurado, a execução também é serializada entre processos (workers do
+    gunicorn) por um lock de arquivo; quem obtém o lock depois do líder chama `recheck`,
+    que normalmente consulta um cache compartilhado, antes de recalcular.
+    """
+
+    def __init__(self, lock_dir=None):
+        self.lock_dir = lock_dir
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {"executions": 0, "coalesced": 0, "shared_hits": 0}
+        if lock_dir:
+            os.makedirs(lock_dir, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        return cls(lock_dir=os.getenv("SINGLE_FLIGHT_LOCK_DIR") or None)
+
+    def do(self, key, fn, recheck=None):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._stats["coalesced"] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._execute(key, fn, recheck)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._calls)
+        return stats
+
+    def _execute(self, key, fn, recheck):
+        if not self.lock_dir:
+            return self._run(fn, recheck)
+
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        with open(os.path.join(self.lock_dir, f"{digest}.lock"), "a+") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                return self._run(fn, recheck)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _run(self, fn, recheck):
+        # Um líder anterior pode ter terminado entre o cache miss e a entrada no voo
+        if recheck is not None:
+            found, value = recheck()
+            if found:
+                with self._lock:
+                    self._stats["shared_hits"] += 1
+                return value
+        with self._lock:
+            self._stats["executions"] += 1
+        return fn()
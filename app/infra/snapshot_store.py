@@ -0,0 +1,275 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+from app.infra.sort_whitelist import SortWhitelist
+from app.utils.text_utils import TextUtils
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "var", "snapshots.sqlite3")
+
+class SnapshotStore:
+    """
+    Armazena localmente (SQLite) agregados que não mudam depois de consolidados,
+    para que os endpoints não precisem recalculá-los no SQL Server a cada chamada.
+    O arquivo é compartilhado entre os workers do gunicorn (modo WAL).
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS watermarks (
+        name TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+    );
+    CREATE TABLE IF NOT EXISTS cache_generations (
+        namespace TEXT PRIMARY KEY,
+        generation INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS default_rate_daily (
+        analysis_date TEXT PRIMARY KEY,
+        overdue_documents INTEGER NOT NULL,
+        active_documents INTEGER NOT NULL,
+        overdue_value REAL NOT NULL,
+        active_value REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS churn_clients (
+        client_id TEXT PRIMARY KEY,
+        client_name TEXT NOT NULL COLLATE PT_BR_CI_AI,
+        email_list TEXT NOT NULL,
+        last_date TEXT NOT NULL,
+        inactive_days INTEGER NOT NULL,
+        historical_volume REAL NOT NULL,
+        agent TEXT NOT NULL,
+        risk TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS ix_churn_client_name ON churn_clients (client_name, client_id);
+    CREATE INDEX IF NOT EXISTS ix_churn_last_date ON churn_clients (last_date, client_id);
+    CREATE INDEX IF NOT EXISTS ix_churn_inactive_days ON churn_clients (inactive_days, client_id);
+    CREATE INDEX IF NOT EXISTS ix_churn_historical_volume ON churn_clients (historical_volume, client_id);
+    CREATE INDEX IF NOT EXISTS ix_churn_risk_client_name ON churn_clients (risk, client_name, client_id);
+    CREATE INDEX IF NOT EXISTS ix_churn_risk_last_date ON churn_clients (risk, last_date, client_id);
+    CREATE INDEX IF NOT EXISTS ix_churn_risk_inactive_days ON churn_clients (risk, inactive_days, client_id);
+    CREATE INDEX IF NOT EXISTS ix_churn_risk_historical_volume ON churn_clients (risk, historical_volume, client_id);
+    CREATE TABLE IF NOT EXISTS operations_ledger (
+        operation_id TEXT PRIMARY KEY,
+        day TEXT NOT NULL,
+        value_units INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS operations_volume_daily (
+        day TEXT PRIMARY KEY,
+        volume_units INTEGER NOT NULL,
+        operation_count INTEGER NOT NULL
+    );
+    """
+
+    CHURN_SORT_COLUMNS = SortWhitelist({
+        "ClientName": "client_name",
+        "LastDate": "last_date",
+        "InactiveDays": "inactive_days",
+        "HistoricalVolume": "historical_volume",
+    })
+    CHURN_COLUMNS = "client_id, client_name, email_list, last_date, inactive_days, historical_volume, agent, risk"
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("SNAPSHOT_DB_PATH", DEFAULT_SNAPSHOT_PATH)
+        self._initialized = False
+
+    @contextmanager
+    def connect(self):
+        if not self._initialized:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        # Mesma ordem de nomes do ChurnIndex em memória (sem distinção de caixa e acentos)
+        conn.create_collation(TextUtils.COLLATION, TextUtils.collate)
+        try:
+            if not self._initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(self.SCHEMA)
+                self._initialized = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get_watermark(self, name):
+        with self.connect() as conn:
+            row = conn.execute("SELECT value FROM watermarks WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def set_watermark(self, name, value):
+        with self.connect() as conn:
+            self._write_watermark(conn, name, value)
+
+    def get_watermark_state(self, name):
+        """Watermark e momento (UTC, datetime do SQLite) da sua última gravação; (None, None) se não existir."""
+        with self.connect() as conn:
+            row = conn.execute("SELECT value, updated_at FROM watermarks WHERE name = ?", (name,)).fetchone()
+        return (row[0], row[1]) if row else (None, None)
+
+    def get_cache_generations(self):
+        """Gerações do ResultCache por namespace, compartilhadas entre os processos do servidor."""
+        with self.connect() as conn:
+            return dict(conn.execute("SELECT namespace, generation FROM cache_generations").fetchall())
+
+    def bump_cache_generation(self, namespace):
+        with self.connect() as conn:
+            return conn.execute("""
+                INSERT INTO cache_generations (namespace, generation) VALUES (?, 1)
+                ON CONFLICT(namespace) DO UPDATE SET generation = generation + 1
+                RETURNING generation
+            """, (namespace,)).fetchone()[0]
+
+    def upsert_default_rate_days(self, rows):
+        """
+        Grava linhas (analysis_date, overdue_documents, active_documents, overdue_value, active_value).
+        """
+        with self.connect() as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO default_rate_daily
+                    (analysis_date, overdue_documents, active_documents, overdue_value, active_value)
+                VALUES (?, ?, ?, ?, ?)
+            """, rows)
+
+    def get_default_rate_days(self, start_date, end_date):
+        with self.connect() as conn:
+            return conn.execute("""
+                SELECT analysis_date, overdue_documents, active_documents, overdue_value, active_value
+                FROM default_rate_daily
+                WHERE analysis_date BETWEEN ? AND ?
+                ORDER BY analysis_date
+            """, (start_date, end_date)).fetchall()
+
+    def get_default_rate_bounds(self):
+        with self.connect() as conn:
+            return conn.execute("SELECT MIN(analysis_date), MAX(analysis_date) FROM default_rate_daily").fetchone()
+
+    def replace_churn_clients(self, rows, built_at):
+        """
+        Substitui o snapshot de churn inteiro, na mesma transação do seu watermark, por linhas
+        (client_id, client_name, email_list_json, last_date, inactive_days, historical_volume, agent, risk).
+        `rows` pode ser um gerador; retorna a quantidade de linhas gravadas.
+        """
+        with self.connect() as conn:
+            conn.execute("DELETE FROM churn_clients")
+            inserted = conn.executemany(f"INSERT INTO churn_clients ({self.CHURN_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows).rowcount
+            self._write_watermark(conn, "churn_clients", built_at)
+        return inserted
+
+    def get_all_churn_clients(self):
+        with self.connect() as conn:
+            return conn.execute(f"SELECT {self.CHURN_COLUMNS} FROM churn_clients").fetchall()
+
+    def count_churn_clients(self, risk=None):
+        with self.connect() as conn:
+            if risk is None:
+                return conn.execute("SELECT COUNT(*) FROM churn_clients").fetchone()[0]
+            return conn.execute("SELECT COUNT(*) FROM churn_clients WHERE risk = ?", (risk,)).fetchone()[0]
+
+    def get_churn_page(self, sort_column, sort_direction, limit, risk=None, offset=0, after=None):
+        """
+        Página do snapshot de churn ordenada por (sort_column, client_id). Com `after`
+        (valor da coluna, client_id da última linha da página anterior) usa paginação por
+        keyset, resolvida pelos índices compostos sem percorrer as linhas já exibidas.
+        """
+        column, direction = self.CHURN_SORT_COLUMNS.resolve(sort_column, sort_direction)
+        conditions = []
+        params = []
+        if risk is not None:
+            conditions.append("risk = ?")
+            params.append(risk)
+        if after is not None:
+            conditions.append(f"({column}, client_id) {'<' if direction == 'DESC' else '>'} (?, ?)")
+            params.extend(after)
+            offset = 0
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = f"""
+            SELECT {self.CHURN_COLUMNS}
+            FROM churn_clients
+            {where}
+            ORDER BY {column} {direction}, client_id {direction}
+            LIMIT ? OFFSET ?
+        """
+        with self.connect() as conn:
+            return conn.execute(sql, (*params, limit, offset)).fetchall()
+
+    def replace_operations(self, rows, watermark_name, watermark):
+        """
+        Reconstrói o razão de operações e o agregado diário a partir de linhas
+        (operation_id, day, value_units), gravando o watermark na mesma transação.
+        `rows` pode ser um gerador; retorna a quantidade de operações gravadas.
+        """
+        with self.connect() as conn:
+            conn.execute("DELETE FROM operations_ledger")
+            conn.execute("DELETE FROM operations_volume_daily")
+            inserted = conn.executemany("INSERT INTO operations_ledger (operation_id, day, value_units) VALUES (?, ?, ?)", rows).rowcount
+            conn.execute("""
+                INSERT INTO operations_volume_daily (day, volume_units, operation_count)
+                SELECT day, SUM(value_units), COUNT(*) FROM operations_ledger GROUP BY day
+            """)
+            self._write_watermark(conn, watermark_name, watermark)
+        return inserted
+
+    def apply_operation_changes(self, changes, watermark_name, watermark):
+        """
+        Aplica ao agregado diário as operações alteradas desde o último watermark, como
+        linhas (operation_id, day, value_units) com day = None para operações excluídas.
+        O valor anterior de cada operação vem do razão, então reaplicar a mesma alteração
+        não muda nada e uma operação que mudou de data sai do dia antigo.
+        Retorna os dias afetados.
+        """
+        affected = set()
+        with self.connect() as conn:
+            for operation_id, day, value_units in changes:
+                old = conn.execute("SELECT day, value_units FROM operations_ledger WHERE operation_id = ?", (operation_id,)).fetchone()
+                if old is not None:
+                    conn.execute("""
+                        UPDATE operations_volume_daily
+                        SET volume_units = volume_units - ?, operation_count = operation_count - 1
+                        WHERE day = ?
+                    """, (old[1], old[0]))
+                    affected.add(old[0])
+                if day is None:
+                    conn.execute("DELETE FROM operations_ledger WHERE operation_id = ?", (operation_id,))
+                    continue
+                conn.execute("""
+                    INSERT INTO operations_ledger (operation_id, day, value_units) VALUES (?, ?, ?)
+                    ON CONFLICT(operation_id) DO UPDATE SET day = excluded.day, value_units = excluded.value_units
+                """, (operation_id, day, value_units))
+                conn.execute("""
+                    INSERT INTO operations_volume_daily (day, volume_units, operation_count) VALUES (?, ?, 1)
+                    ON CONFLICT(day) DO UPDATE SET
+                        volume_units = volume_units + excluded.volume_units,
+                        operation_count = operation_count + 1
+                """, (day, value_units))
+                affected.add(day)
+            conn.execute("DELETE FROM operations_volume_daily WHERE operation_count = 0")
+            self._write_watermark(conn, watermark_name, watermark)
+        return sorted(affected)
+
+    def get_operations_volume_days(self, start_date, end_date, weekdays_only=False):
+        weekday_filter = "AND strftime('%w', day) NOT IN ('0', '6')" if weekdays_only else ""
+        with self.connect() as conn:
+            return conn.execute(f"""
+                SELECT day, volume_units, operation_count
+                FROM operations_volume_daily
+                WHERE day BETWEEN ? AND ? {weekday_filter}
+                ORDER BY day
+            """, (start_date, end_date)).fetchall()
+
+    def get_operations_volume_months(self, start_date, end_date):
+        with self.connect() as conn:
+            return conn.execute("""
+                SELECT substr(day, 1, 7) AS period, SUM(volume_units), SUM(operation_count)
+                FROM operations_volume_daily
+                WHERE day BETWEEN ? AND ?
+                GROUP BY period
+                ORDER BY period
+            """, (start_date, end_date)).fetchall()
+
+    @staticmethod
+    def _write_watermark(conn, name, value):
+        conn.execute("""
+            INSERT INTO watermarks (name, value, updated_at) VALUES (?, ?, datetime('now'))
+            ON CONFLICT(name) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+        """, (name, value))
@@ -0,0 +1,25 @@
+class SortWhitelist:
+    """
+    Traduz a coluna e a direção de ordenação recebidas na requisição para identificadores
+    SQL fixos. ORDER BY não aceita parâmetros, então só nomes desta lista chegam ao texto SQL.
+    """
+
+    DIRECTIONS = ("ASC", "DESC")
+
+    def __init__(self, columns):
+        self.columns = dict(columns)
+
+    def __contains__(self, sort_column):
+        return sort_column in self.columns
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def resolve(self, sort_column, sort_direction):
+        """Retorna (coluna SQL, direção) ou levanta ValueError para valores fora da lista."""
+        if sort_column not in self.columns:
+            raise ValueError(f"Invalid sort column: {sort_column}")
+        direction = (sort_direction or "").upper()
+        if direction not in self.DIRECTIONS:
+            raise ValueError(f"Invalid sort direction: {sort_direction}")
+        return self.columns[sort_column], direction
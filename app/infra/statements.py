@@ -0,0 +1,178 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+class StatementCache:
+    """
+    Cursores de uma conexão indexados pelo texto SQL (LRU). O pyodbc só chama
+    SQLPrepare quando o texto do cursor muda, então reexecutar a mesma query
+    parametrizada no mesmo cursor reaproveita o statement já preparado.
+    """
+
+    def __init__(self, max_size=32):
+        self.max_size = max_size
+        self._cursors = OrderedDict()
+
+    def checkout(self, connection, sql):
+        """Retorna (cursor, reaproveitado) para o texto SQL."""
+        cursor = self._cursors.get(sql)
+        if cursor is not None:
+            self._cursors.move_to_end(sql)
+            return cursor, True
+
+        cursor = connection.cursor()
+        if self.max_size > 0:
+            self._cursors[sql] = cursor
+            while len(self._cursors) > self.max_size:
+                _, evicted = self._cursors.popitem(last=False)
+                self._close_cursor(evicted)
+        return cursor, False
+
+    def discard(self, sql):
+        cursor = self._cursors.pop(sql, None)
+        if cursor is not None:
+            self._close_cursor(cursor)
+
+    def close(self):
+        cursors, self._cursors = list(self._cursors.values()), OrderedDict()
+        for cursor in cursors:
+            self._close_cursor(cursor)
+
+    def __len__(self):
+        return len(self._cursors)
+
+    @staticmethod
+    def _close_cursor(cursor):
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+class QueryStats:
+    """
+    Tempos acumulados por fingerprint de query no processo (o texto SQL sem literais, de
+    modo que variações só nos valores caem na mesma entrada). `connect_ms` é a espera pela
+    conexão do pool, `execute_ms` o tempo do execute no cliente (inclui o prepare na
+    primeira execução em cada conexão) e `fetch_ms` o da leitura das linhas; `bytes` é o
+    tamanho aproximado dos valores lidos. Com DB_STATISTICS_TIME=true, `compile_ms` e
+    `server_execute_ms` vêm das mensagens de SET STATISTICS TIME do SQL Server.
+
+    Execuções que levam ao menos DB_SLOW_QUERY_MS ms (padrão 1000; negativo desativa) são
+    registradas no log com o statement completo e os parâmetros.
+    """
+
+    TIMINGS = ("connect_ms", "execute_ms", "fetch_ms", "compile_ms", "server_execute_ms", "max_ms")
+
+    _STRING_LITERAL = re.compile(r"N?'(?:[^']|'')*'")
+    _BLOCK_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+    _LINE_COMMENT = re.compile(r"--[^\n]*")
+    _NUMBER_LITERAL = re.compile(r"(?<![\w@#.$])\d+(?:\.\d+)?(?!\w)")
+    _IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+    _COMPILE_PATTERN = re.compile(r"parse and compile time:\s*CPU time = \d+ ms, elapsed time = (\d+) ms", re.IGNORECASE)
+    _EXECUTE_PATTERN = re.compile(r"Execution Times:\s*CPU time = \d+ ms,\s*elapsed time = (\d+) ms", re.IGNORECASE)
+
+    def __init__(self):
+        self._statements = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def fingerprint(cls, sql):
+        """SQL normalizado: sem comentários, literais trocados por '?' e espaços colapsados."""
+        text = cls._STRING_LITERAL.sub("?", sql)
+        text = cls._BLOCK_COMMENT.sub(" ", text)
+        text = cls._LINE_COMMENT.sub(" ", text)
+        text = cls._NUMBER_LITERAL.sub("?", text)
+        text = " ".join(text.split())
+        return cls._IN_LIST.sub("(?)", text)
+
+    @classmethod
+    def statement_id(cls, sql):
+        return hashlib.sha1(cls.fingerprint(sql).encode("utf-8")).hexdigest()[:12]
+
+    @staticmethod
+    def estimate_bytes(rows):
+        """Tamanho aproximado das linhas: texto e binário pelo comprimento, os demais valores 8 bytes."""
+        total = 0
+        for row in rows:
+            for value in row:
+                if value is None:
+                    continue
+                total += len(value) if isinstance(value, (str, bytes, bytearray)) else 8
+        return total
+
+    @classmethod
+    def parse_server_times(cls, messages):
+        """Soma os tempos (ms) de compilação e execução informados pelo servidor, ou (None, None)."""
+        text = "\n".join(str(m[1]) if isinstance(m, (tuple, list)) else str(m) for m in messages or ())
+        compile_times = [int(v) for v in cls._COMPILE_PATTERN.findall(text)]
+        execute_times = [int(v) for v in cls._EXECUTE_PATTERN.findall(text)]
+        return (sum(compile_times) if compile_times else None, sum(execute_times) if execute_times else None)
+
+    def record(self, sql, timing, params=None):
+        statement_id = self.statement_id(sql)
+        total_ms = timing.get("connect_ms", 0) + timing["execute_ms"] + timing["fetch_ms"]
+        threshold = float(os.getenv("DB_SLOW_QUERY_MS", "1000"))
+        slow = 0 <= threshold <= total_ms
+        with self._lock:
+            entry = self._entry(statement_id, sql)
+            entry["executions"] += 1
+            if not timing["reused"]:
+                entry["prepares"] += 1
+            entry["connect_ms"] += timing.get("connect_ms", 0)
+            entry["execute_ms"] += timing["execute_ms"]
+            entry["fetch_ms"] += timing["fetch_ms"]
+            entry["compile_ms"] += timing["compile_ms"] or 0
+            entry["server_execute_ms"] += timing["server_execute_ms"] or 0
+            entry["max_ms"] = max(entry["max_ms"], total_ms)
+            entry["rows"] += timing.get("rows", 0)
+            entry["bytes"] += timing.get("bytes", 0)
+            if slow:
+                entry["slow"] += 1
+
+        if slow:
+            logger.warning(
+                "Slow query %s: %.1f ms (connect %.1f, execute %.1f, fetch %.1f), %d rows, ~%d bytes\n%s\nparams=%r",
+                statement_id, total_ms, timing.get("connect_ms", 0), timing["execute_ms"], timing["fetch_ms"],
+                timing.get("rows", 0), timing.get("bytes", 0), sql.strip(), params,
+            )
+        return statement_id
+
+    def record_error(self, sql, params, error):
+        statement_id = self.statement_id(sql)
+        with self._lock:
+            self._entry(statement_id, sql)["errors"] += 1
+        logger.error("Query %s failed: %s\n%s\nparams=%r", statement_id, error, sql.strip(), params)
+        return statement_id
+
+    def _entry(self, statement_id, sql):
+        entry = self._statements.get(statement_id)
+        if entry is None:
+            entry = self._statements[statement_id] = {
+                "statement": self.fingerprint(sql)[:160],
+                "executions": 0,
+                "prepares": 0,
+                "rows": 0,
+                "bytes": 0,
+                "slow": 0,
+                "errors": 0,
+                **{key: 0.0 for key in self.TIMINGS},
+            }
+        return entry
+
+    def get_stats(self):
+        with self._lock:
+            statements = {key: dict(entry) for key, entry in self._statements.items()}
+        for entry in statements.values():
+            for key in self.TIMINGS:
+                entry[key] = round(entry[key], 3)
+        return statements
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
@@ -0,0 +1,281 @@
+import os
+from datetime import date
+import numpy as np
+from app.infra.local_sql import LocalSql
+
+class SyntheticData:
+    """
+    Gerador de dados sintéticos para o banco local (LocalSql), reproduzível pela `seed`
+    e com escala dada pelo número de documentos (10 mil a 10 milhões).
+
+    As distribuições seguem o que os services medem:
+    - operações concentradas em dias úteis, valores com cauda longa (lognormal) e poucos
+      clientes responsáveis pela maior parte do volume;
+    - clientes com janela de atividade própria: parte deles para de operar no período, o
+      que alimenta as faixas de risco de churn;
+    - documentos com vencimento de 15 a 120 dias após a emissão, a maioria paga em dia,
+      uma parte paga com atraso e uma parte nunca paga (inadimplência);
+    - e-mails com várias entradas separadas por ';' e endereços internos @fontefm.com.br.
+
+    Os volumes de operações, clientes e agentes são derivados do número de documentos.
+    """
+
+    MIN_DOCUMENTS = 10_000
+    MAX_DOCUMENTS = 10_000_000
+    DOCUMENTS_PER_OPERATION = 6
+    OPERATIONS_PER_CLIENT = 40
+    CLIENTS_PER_AGENT = 40
+
+    NATIONAL_HOLIDAYS = (
+        ("Confraternização Universal", "01-01"),
+        ("Tiradentes", "04-21"),
+        ("Dia do Trabalho", "05-01"),
+        ("Independência do Brasil", "09-07"),
+        ("Nossa Senhora Aparecida", "10-12"),
+        ("Finados", "11-02"),
+        ("Proclamação da República", "11-15"),
+        ("Natal", "12-25"),
+    )
+
+    COMPANY_PREFIXES = ("Comercial", "Indústria", "Distribuidora", "Transportes", "Metalúrgica", "Agro", "Construtora", "Têxtil", "Alimentos", "Papelaria")
+    SURNAMES = ("Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+                "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Soares", "Fernandes", "Vieira", "Barbosa")
+    COMPANY_SUFFIXES = ("Ltda", "S.A.", "ME", "EIRELI", "EPP")
+    FIRST_NAMES = ("ANA", "BRUNO", "CARLOS", "DANIELA", "EDUARDO", "FERNANDA", "GUSTAVO", "HELENA", "IGOR", "JULIANA",
+                   "LUCAS", "MARIANA", "NELSON", "PATRICIA", "RAFAEL", "SABRINA", "THIAGO", "VANESSA")
+
+    def __init__(self, documents=100_000, seed=42, years=3, today=None, batch_size=50_000):
+        self.documents = int(documents)
+        self.seed = seed
+        self.years = years
+        self.today = today or date.today()
+        self.batch_size = batch_size
+        self.operations = max(self.documents // self.DOCUMENTS_PER_OPERATION, 1)
+        self.clients = max(self.operations // self.OPERATIONS_PER_CLIENT, 20)
+        self.agents = max(self.clients // self.CLIENTS_PER_AGENT, 3)
+        self.rng = np.random.default_rng(seed)
+        self._rowversion = 0
+
+    def generate(self, path, schema_path=None):
+        """Cria (ou recria) o banco em `path` e retorna a quantidade de linhas por tabela."""
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+        connection = LocalSql.connect(path, readonly=False)
+        raw = connection.raw
+        try:
+            raw.execute("PRAGMA journal_mode=OFF")
+            raw.execute("PRAGMA synchronous=OFF")
+            LocalSql.create_schema(raw, schema_path)
+
+            counts = {"Feriado": self._insert_holidays(raw)}
+            agents, counts["Agente"] = self._insert_agents(raw)
+            clients, counts["Cliente"] = self._insert_clients(raw, agents)
+            operations, counts["Operacao"] = self._insert_operations(raw, clients)
+            counts["Documento"] = self._insert_documents(raw, operations)
+
+            raw.execute("UPDATE rowversion_counter SET value = ?", (self._rowversion,))
+            raw.commit()
+            raw.execute("ANALYZE")
+            raw.commit()
+            return counts
+        finally:
+            connection.close()
+
+    def _insert_holidays(self, raw):
+        rows = [
+            (self._guid(), description, f"2000-{month_day}", 1, 1, self._next_rowversion())
+            for description, month_day in self.NATIONAL_HOLIDAYS
+        ]
+        self._insert(raw, "Feriado", ("Id", "Descricao", "Data", "Tipo", "ERecorrente", "TimeStamp"), rows)
+        return len(rows)
+
+    def _insert_agents(self, raw):
+        first_names = self.rng.choice(self.FIRST_NAMES, self.agents)
+        surnames = self.rng.choice(self.SURNAMES, self.agents)
+        ids = self._guids(self.agents)
+        registry_ids = self._guids(self.agents)
+
+        registry = [
+            (registry_ids[i], f"{first_names[i]} {surnames[i].upper()}", f"{first_names[i].lower()}@fontefm.com.br", 1, self._next_rowversion())
+            for i in range(self.agents)
+        ]
+        self._insert(raw, "CadastroBase", ("Id", "Razao", "Email", "Tipo", "TimeStamp"), registry)
+        self._insert(raw, "Agente", ("Id", "CadastroBaseId", "TimeStamp"), [
+            (ids[i], registry_ids[i], self._next_rowversion()) for i in range(self.agents)
+        ])
+        return ids, self.agents
+
+    def _insert_clients(self, raw, agent_ids):
+        n = self.clients
+        rng = self.rng
+        first_day = self._today_days() - 365 * self.years
+
+        # Janela de atividade: início espalhado no período, ~45% param de operar antes de hoje
+        start = first_day + rng.integers(0, 365 * self.years * 2 // 3, n)
+        stops = rng.random(n) < 0.45
+        end = np.where(stops, start + rng.integers(30, 365 * self.years, n), self._today_days())
+        end = np.minimum(end, self._today_days())
+        # Poucos clientes concentram o volume (pareto)
+        weight = rng.pareto(1.5, n) + 0.1
+
+        ids = self._guids(n)
+        registry_ids = self._guids(n)
+        prefixes = rng.choice(self.COMPANY_PREFIXES, n)
+        surnames = rng.choice(self.SURNAMES, n)
+        suffixes = rng.choice(self.COMPANY_SUFFIXES, n)
+        extra_email = rng.random(n)
+        has_agent = rng.random(n) < 0.85
+        agent_index = rng.integers(0, len(agent_ids), n)
+        deleted = rng.random(n) < 0.01
+        registered = self._date_strings(start - rng.integers(0, 60, n))
+
+        registry = []
+        clients = []
+        for i in range(n):
+            name = f"{prefixes[i]} {surnames[i]} {i + 1} {suffixes[i]}"
+            domain = f"{surnames[i].lower()}{i + 1}.com.br"
+            emails = [f"contato@{domain}"]
+            if extra_email[i] < 0.3:
+                emails.append(f" Financeiro@{domain}")
+            if extra_email[i] > 0.9:
+                emails.append(f"operacoes{i + 1}@fontefm.com.br")
+            registry.append((registry_ids[i], name, ";".join(emails), 2, int(deleted[i]), self._next_rowversion()))
+            clients.append((ids[i], registry_ids[i], agent_ids[agent_index[i]] if has_agent[i] else None, registered[i], 2, self._next_rowversion()))
+
+        self._insert(raw, "CadastroBase", ("Id", "Razao", "Email", "Tipo", "IsDeleted", "TimeStamp"), registry)
+        self._insert(raw, "Cliente", ("Id", "CadastroBaseId", "AgenteId", "DataCadastro", "Tipo", "TimeStamp"), clients)
+        return {"ids": ids, "start": start, "end": end, "weight": weight / weight.sum(), "agent": np.where(has_agent, agent_index, -1), "agent_ids": agent_ids}, n
+
+    def _insert_operations(self, raw, clients):
+        n = self.operations
+        rng = self.rng
+
+        client = rng.choice(len(clients["ids"]), n, p=clients["weight"])
+        span = clients["end"][client] - clients["start"][client]
+        days = clients["start"][client] + (rng.random(n) * (span + 1)).astype(np.int64)
+        days = self._to_business_days(days)
+
+        purchase = np.round(rng.lognormal(np.log(40_000), 1.0, n), 2)
+        face = np.round(purchase / (1 - rng.uniform(0.02, 0.06, n)), 2)
+        status = np.where(rng.random(n) < 0.97, 1, 0)
+        deleted = rng.random(n) < 0.02
+        ids = self._guids(n)
+        dates = self._date_strings(days)
+        agent = clients["agent"][client]
+
+        columns = ("Id", "Numero", "Data", "Status", "ValorFace", "ValorCompra", "ClienteId", "AgenteId", "IsDeleted", "TimeStamp")
+        for first in range(0, n, self.batch_size):
+            last = min(first + self.batch_size, n)
+            self._insert(raw, "Operacao", columns, [
+                (
+                    ids[i], i + 1, dates[i], int(status[i]), float(face[i]), float(purchase[i]),
+                    clients["ids"][client[i]], clients["agent_ids"][agent[i]] if agent[i] >= 0 else None,
+                    int(deleted[i]), self._next_rowversion(),
+                )
+                for i in range(first, last)
+            ])
+        return {"ids": ids, "days": days, "face": face, "purchase": purchase}, n
+
+    def _insert_documents(self, raw, operations):
+        rng = self.rng
+        n_operations = len(operations["ids"])
+        per_operation = rng.multinomial(self.documents, np.full(n_operations, 1 / n_operations))
+        today = self._today_days()
+        columns = (
+            "Id", "IdBanco", "Numero", "DataMovimento", "DataEmissao", "DataVencimento", "DataVencimentoOriginal",
+            "Prazo", "PrazoOriginal", "Status", "ValorFace", "ValorCompra", "Valor", "DataBaixa", "OperacaoId",
+            "SacadoId", "TipoDocId", "CarteiraId", "IsDeleted", "TimeStamp",
+        )
+
+        written = 0
+        # Lotes de operações com cerca de batch_size documentos: memória limitada em qualquer escala
+        step = max(self.batch_size // self.DOCUMENTS_PER_OPERATION, 1)
+        for first in range(0, n_operations, step):
+            last = min(first + step, n_operations)
+            counts = per_operation[first:last]
+            operation = np.repeat(np.arange(first, last), counts)
+            position = np.arange(len(operation)) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+            size = len(operation)
+            if size == 0:
+                continue
+
+            # Valores da operação repartidos entre os documentos
+            share = rng.random(size) + 0.5
+            local = operation - first
+            share = share / np.bincount(local, share, minlength=last - first)[local]
+            face = np.round(operations["face"][operation] * share, 2)
+            purchase = np.round(operations["purchase"][operation] * share, 2)
+
+            emission = operations["days"][operation]
+            term = rng.integers(15, 121, size)
+            due = emission + term
+
+            # Em dia (até 5 dias antes a 2 depois), com atraso (3 a 90 dias) ou nunca pago
+            behavior = rng.random(size)
+            payment = np.where(
+                behavior < 0.885, due + rng.integers(-5, 3, size),
+                due + rng.integers(3, 91, size),
+            ).astype(np.float64)
+            payment[behavior >= 0.985] = np.nan
+            payment[payment > today] = np.nan
+            paid = ~np.isnan(payment)
+
+            emission_text = self._date_strings(emission)
+            due_text = self._date_strings(due)
+            payment_text = self._date_strings(np.where(paid, payment, 0).astype(np.int64))
+            deleted = rng.random(size) < 0.01
+            ids = self._guids(size)
+            drawees = self._guids(size)
+
+            rows = [
+                (
+                    ids[i], written + i + 1, f"{operation[i] + 1:07d}-{position[i]}",
+                    emission_text[i], emission_text[i], due_text[i], due_text[i], int(term[i]), int(term[i]),
+                    1 if paid[i] else 0, float(face[i]), float(purchase[i]), float(face[i]),
+                    payment_text[i] if paid[i] else None, operations["ids"][operation[i]],
+                    drawees[i], 1, 1, int(deleted[i]), self._next_rowversion(),
+                )
+                for i in range(size)
+            ]
+            self._insert(raw, "Documento", columns, rows)
+            written += size
+        return written
+
+    def _to_business_days(self, days):
+        # 1970-01-01 foi quinta-feira: (dias + 3) % 7 dá 0 para segunda ... 6 para domingo
+        weekday = (days + 3) % 7
+        # Quase todas as operações de fim de semana vão para o dia útil mais próximo
+        moved = self.rng.random(len(days)) < 0.97
+        shift = np.where(weekday == 5, -1, np.where(weekday == 6, 1, 0))
+        days = np.where(moved, days + shift, days)
+        return np.minimum(days, self._today_days())
+
+    def _today_days(self):
+        return int(np.datetime64(self.today, "D").astype(np.int64))
+
+    @staticmethod
+    def _date_strings(days):
+        return np.datetime_as_string(np.asarray(days, dtype=np.int64).astype("datetime64[D]")).tolist()
+
+    def _guids(self, n):
+        data = self.rng.bytes(16 * n)
+        guids = []
+        for i in range(n):
+            value = data[16 * i:16 * i + 16].hex()
+            guids.append(f"{value[:8]}-{value[8:12]}-4{value[13:16]}-{value[16:20]}-{value[20:]}".upper())
+        return guids
+
+    def _guid(self):
+        return self._guids(1)[0]
+
+    def _next_rowversion(self):
+        self._rowversion += 1
+        return LocalSql.rowversion(self._rowversion)
+
+    @staticmethod
+    def _insert(raw, table, columns, rows):
+        placeholders = ", ".join("?" for _ in columns)
+        names = ", ".join(f'"{column}"' for column in columns)
+        raw.executemany(f'INSERT INTO "{table}" ({names}) VALUES ({placeholders})', rows)
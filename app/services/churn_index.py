@@ -0,0 +1,110 @@
+import json
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from app.utils.text_utils import TextUtils
+
+class ChurnRecord:
+    __slots__ = ("client_id", "client", "email_list", "last_operation", "inactive_days", "historical_volume", "agent", "risk")
+
+    def __init__(self, client_id, client, email_list, last_operation, inactive_days, historical_volume, agent, risk):
+        self.client_id = client_id
+        self.client = client
+        self.email_list = email_list
+        self.last_operation = last_operation
+        self.inactive_days = inactive_days
+        self.historical_volume = historical_volume
+        self.agent = agent
+        self.risk = risk
+
+    def to_dict(self):
+        return {
+            "client": self.client,
+            "email_list": self.email_list,
+            "last_operation": self.last_operation,
+            "inactive_days": self.inactive_days,
+            "historical_volume": self.historical_volume,
+            "agent": self.agent,
+            "risk": self.risk
+        }
+
+class ChurnIndex:
+    """
+    Snapshot de churn em memória: registros com __slots__, colunas de ordenação em arrays
+    e, para cada combinação (coluna, filtro de risco), a permutação ascendente das linhas
+    já ordenada por (valor, client_id). A ordem descendente é a mesma permutação lida de
+    trás para frente, então qualquer página é um fatiamento, sem ordenar nada por requisição.
+    """
+
+    SORT_COLUMNS = ("ClientName", "LastDate", "InactiveDays", "HistoricalVolume")
+
+    def __init__(self, records, version=None, expires_at=None):
+        self.records = list(records)
+        self.version = version
+        self.expires_at = expires_at
+
+        ids = [r.client_id for r in self.records]
+        columns = {
+            "ClientName": [TextUtils.sort_key(r.client) for r in self.records],
+            "LastDate": [r.last_operation.toordinal() for r in self.records],
+            "InactiveDays": array('l', (r.inactive_days for r in self.records)),
+            "HistoricalVolume": array('d', (r.historical_volume for r in self.records)),
+        }
+
+        risks = [""] + sorted({r.risk for r in self.records})
+        self._permutations = {}
+        self._keys = {}
+        for column in self.SORT_COLUMNS:
+            values = columns[column]
+            ordered = sorted(range(len(self.records)), key=lambda i: (values[i], ids[i]))
+            for risk in risks:
+                rows = ordered if not risk else [i for i in ordered if self.records[i].risk == risk]
+                self._permutations[(column, risk)] = array('I', rows)
+                self._keys[(column, risk)] = [(values[i], ids[i]) for i in rows]
+
+    @classmethod
+    def from_snapshot_rows(cls, rows, version=None, expires_at=None):
+        records = [
+            ChurnRecord(client_id, client_name, json.loads(email_list), date.fromisoformat(last_date),
+                        inactive_days, historical_volume, agent, risk)
+            for client_id, client_name, email_list, last_date, inactive_days, historical_volume, agent, risk in rows
+        ]
+        return cls(records, version=version, expires_at=expires_at)
+
+    def count(self, risk=None):
+        return len(self._permutations.get((self.SORT_COLUMNS[0], risk or ""), ()))
+
+    def page(self, sort_column, sort_direction, limit, risk=None, offset=0, after=None):
+        """
+        Retorna os registros da página. `after` = (valor da coluna, client_id) do último
+        registro da página anterior, no mesmo formato do cursor do snapshot SQLite.
+        """
+        key = (sort_column, risk or "")
+        rows = self._permutations.get(key, ())
+        descending = sort_direction.upper() == "DESC"
+        total = len(rows)
+
+        if after is not None:
+            seek_key = (self._sort_value(sort_column, after[0]), after[1])
+            keys = self._keys.get(key, [])
+            if descending:
+                end = bisect_left(keys, seek_key)
+                selected = rows[max(end - limit, 0):end][::-1]
+            else:
+                start = bisect_right(keys, seek_key)
+                selected = rows[start:start + limit]
+        elif descending:
+            end = max(total - offset, 0)
+            selected = rows[max(end - limit, 0):end][::-1]
+        else:
+            selected = rows[offset:offset + limit]
+
+        return [self.records[i] for i in selected]
+
+    @staticmethod
+    def _sort_value(sort_column, value):
+        if sort_column == "ClientName":
+            return TextUtils.sort_key(value)
+        if sort_column == "LastDate":
+            return date.fromisoformat(value).toordinal()
+        return value
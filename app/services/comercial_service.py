@@ -1,109 +1,263 @@
+import base64
+import json
+import logging
+import os
+import threading
+from datetime import date, datetime, timedelta
+from app.infra.async_database import AsyncDatabase
+from app.infra.cache import ResultCache, cached
 from app.infra.db_connection import Database
+from app.infra.snapshot_store import SnapshotStore
+from app.services.churn_index import ChurnIndex
+
+logger = logging.getLogger(__name__)
 
 class ComercialService:
+    RISK_LEVELS = ["Consumado", "Alto", "Médio", "Baixo", "-"]
+    CHURN_WATERMARK = "churn_clients"
+    # Posição da coluna de ordenação nas linhas de SnapshotStore.get_churn_page
+    CURSOR_VALUE_INDEX = {"ClientName": 1, "LastDate": 3, "InactiveDays": 4, "HistoricalVolume": 5}
+
+    _snapshot_lock = threading.Lock()
+    _index = None
+    _index_lock = threading.Lock()
+
     @staticmethod
-    def get_client_data(page=1, items_per_page=10, sort_column="HistoricalVolume", sort_direction="DESC", risk_filter=""):
-        valid_sort_columns = ["ClientName", "LastDate", "InactiveDays", "HistoricalVolume"]
-        if sort_column not in valid_sort_columns:
-            raise ValueError(f"Invalid sort column: {sort_column}")
-        if sort_direction.upper() not in ["ASC", "DESC"]:
-            raise ValueError(f"Invalid sort direction: {sort_direction}")
+    @cached("comercial.client_data", ttl=600)
+    def get_client_data(page=1, items_per_page=10, sort_column="HistoricalVolume", sort_direction="DESC", risk_filter="", cursor=None):
+        _, sort_direction = SnapshotStore.CHURN_SORT_COLUMNS.resolve(sort_column, sort_direction)
 
         offset = (page - 1) * items_per_page
+        risk = risk_filter if risk_filter in ComercialService.RISK_LEVELS else None
 
-        risk_conditions = {
-            "Consumado": "InactiveDays > 120",
-            "Alto": "InactiveDays BETWEEN 91 AND 120",
-            "Médio": "InactiveDays BETWEEN 61 AND 90",
-            "Baixo": "InactiveDays BETWEEN 31 AND 60",
-            "-": "InactiveDays <= 30"
-        }
-        risk_condition = risk_conditions.get(risk_filter, "1=1")
+        after = None
+        if cursor:
+            after = ComercialService._decode_cursor(cursor, sort_column, sort_direction, risk)
+
+        try:
+            if os.getenv("CHURN_INDEX_ENABLED", "true").lower() == "true":
+                index = ComercialService.get_churn_index()
+                total_count = index.count(risk)
+                records = index.page(sort_column, sort_direction, items_per_page, risk=risk, offset=offset, after=after)
+                churn_data = [record.to_dict() for record in records]
+                last = (ComercialService._record_sort_value(records[-1], sort_column), records[-1].client_id) if records else None
+            else:
+                store = SnapshotStore()
+                ComercialService.ensure_churn_snapshot(store)
+                total_count = store.count_churn_clients(risk)
+                rows = store.get_churn_page(sort_column, sort_direction, items_per_page, risk=risk, offset=offset, after=after)
+                churn_data = [ComercialService._row_to_dict(row) for row in rows]
+                last = (rows[-1][ComercialService.CURSOR_VALUE_INDEX[sort_column]], rows[-1][0]) if rows else None
+        except Exception as e:
+            logger.exception("Erro ao buscar dados de churn")
+            raise RuntimeError(f"Erro ao buscar dados de churn: {e}")
+
+        next_cursor = None
+        if len(churn_data) == items_per_page:
+            next_cursor = ComercialService._encode_cursor(last, sort_column, sort_direction, risk)
+
+        return {"data": churn_data, "total_count": total_count, "next_cursor": next_cursor}
+
+    @staticmethod
+    async def get_client_data_async(page=1, items_per_page=10, sort_column="HistoricalVolume", sort_direction="DESC", risk_filter="", cursor=None):
+        return await AsyncDatabase.run(ComercialService.get_client_data, page, items_per_page, sort_column, sort_direction, risk_filter, cursor)
+
+    @staticmethod
+    def get_data_version(max_age):
+        """Versão do snapshot de churn (momento da construção) para o ETag HTTP."""
+        generation = ResultCache.get_instance().get_generation("comercial")
+        if os.getenv("CHURN_INDEX_ENABLED", "true").lower() == "true":
+            return f"{ComercialService.get_churn_index().version}:{generation}"
+        store = SnapshotStore()
+        ComercialService.ensure_churn_snapshot(store)
+        return f"{store.get_watermark(ComercialService.CHURN_WATERMARK)}:{generation}"
+
+    @staticmethod
+    def get_risk_counts():
+        """Quantidade de clientes em cada faixa de risco do snapshot de churn."""
+        if os.getenv("CHURN_INDEX_ENABLED", "true").lower() == "true":
+            index = ComercialService.get_churn_index()
+            return {risk: index.count(risk) for risk in ComercialService.RISK_LEVELS}
+        store = SnapshotStore()
+        ComercialService.ensure_churn_snapshot(store)
+        return {risk: store.count_churn_clients(risk) for risk in ComercialService.RISK_LEVELS}
+
+    @staticmethod
+    def get_churn_index():
+        """
+        Índice em memória do snapshot de churn. Enquanto o snapshot não expira as páginas
+        são servidas sem nenhum acesso a disco ou ao banco; depois disso o snapshot é
+        verificado (e reconstruído, se preciso) e o índice recarregado se mudou.
+        """
+        index = ComercialService._index
+        if index is not None and datetime.now() < index.expires_at:
+            return index
+
+        with ComercialService._index_lock:
+            index = ComercialService._index
+            if index is not None and datetime.now() < index.expires_at:
+                return index
+
+            store = SnapshotStore()
+            ComercialService.ensure_churn_snapshot(store)
+            version = store.get_watermark(ComercialService.CHURN_WATERMARK)
+            expires_at = ComercialService._snapshot_expires_at(datetime.fromisoformat(version))
+            if index is None or index.version != version:
+                index = ChurnIndex.from_snapshot_rows(store.get_all_churn_clients(), version=version, expires_at=expires_at)
+            else:
+                index.expires_at = expires_at
+            ComercialService._index = index
+            return index
+
+    @staticmethod
+    def ensure_churn_snapshot(store):
+        """
+        Reconstrói o snapshot de churn quando ele não existe, passou de CHURN_SNAPSHOT_TTL
+        segundos ou foi gerado em outro dia (os dias de inatividade mudam à meia-noite).
+        """
+        if not ComercialService._is_churn_snapshot_stale(store):
+            return
+        with ComercialService._snapshot_lock:
+            if ComercialService._is_churn_snapshot_stale(store):
+                ComercialService.build_churn_snapshot(store)
+
+    @staticmethod
+    def _is_churn_snapshot_stale(store):
+        built_at = store.get_watermark(ComercialService.CHURN_WATERMARK)
+        if built_at is None:
+            return True
+        return datetime.now() >= ComercialService._snapshot_expires_at(datetime.fromisoformat(built_at))
 
-        query = f"""
+    @staticmethod
+    def _snapshot_expires_at(built_at):
+        ttl = timedelta(seconds=float(os.getenv("CHURN_SNAPSHOT_TTL", "900")))
+        next_midnight = datetime.combine(built_at.date() + timedelta(days=1), datetime.min.time())
+        return min(built_at + ttl, next_midnight)
+
+    @staticmethod
+    def build_churn_snapshot(store=None):
+        """
+        Calcula uma linha por cliente (última operação, dias inativo, volume histórico,
+        agente, e-mails e faixa de risco) com uma única varredura de dbo.Operacao.
+        """
+        query = """
         WITH LastOperation AS (
-            SELECT 
+            SELECT
                 ClienteId,
                 MAX(Data) AS LastDate
             FROM dbo.Operacao
-            WHERE 
+            WHERE
                 IsDeleted = 0
                 AND Status = 1
             GROUP BY ClienteId
         ),
-        Clients AS (
-            SELECT 
-                c.Id AS ClientId,
-                cb.Razao AS ClientName,
-                cb.Email AS Email,
-                uo.LastDate,
-                DATEDIFF(DAY, uo.LastDate, GETDATE()) AS InactiveDays,
-                (SELECT SUM(o2.ValorCompra) 
-                 FROM dbo.Operacao o2
-                 WHERE o2.ClienteId = c.Id
-                   AND o2.IsDeleted = 0
-                ) AS HistoricalVolume,
-                a.Id AS AgentId,
-                cba.Razao AS AgentFullName
-            FROM dbo.Cliente c
-            INNER JOIN LastOperation uo ON c.Id = uo.ClienteId
-            INNER JOIN dbo.CadastroBase cb ON c.CadastroBaseId = cb.Id
-            LEFT JOIN dbo.Agente a ON c.AgenteId = a.Id
-            LEFT JOIN dbo.CadastroBase cba ON a.CadastroBaseId = cba.Id
-            WHERE 
-                cb.IsDeleted = 0
+        Volume AS (
+            SELECT
+                ClienteId,
+                SUM(ValorCompra) AS HistoricalVolume
+            FROM dbo.Operacao
+            WHERE IsDeleted = 0
+            GROUP BY ClienteId
         )
-        SELECT 
-            COUNT(*) OVER() AS TotalCount,
-            ClientName,
-            Email,
-            LastDate,
-            InactiveDays,
-            HistoricalVolume,
-            LEFT(AgentFullName, CHARINDEX(' ', AgentFullName + ' ') - 1) AS AgentName
-        FROM Clients
-        WHERE {risk_condition}
-        ORDER BY {sort_column} {sort_direction}
-        OFFSET {offset} ROWS FETCH NEXT {items_per_page} ROWS ONLY;
+        SELECT
+            c.Id AS ClientId,
+            cb.Razao AS ClientName,
+            cb.Email AS Email,
+            uo.LastDate,
+            DATEDIFF(DAY, uo.LastDate, GETDATE()) AS InactiveDays,
+            v.HistoricalVolume,
+            LEFT(cba.Razao, CHARINDEX(' ', cba.Razao + ' ') - 1) AS AgentName
+        FROM dbo.Cliente c
+        INNER JOIN LastOperation uo ON c.Id = uo.ClienteId
+        INNER JOIN Volume v ON c.Id = v.ClienteId
+        INNER JOIN dbo.CadastroBase cb ON c.CadastroBaseId = cb.Id
+        LEFT JOIN dbo.Agente a ON c.AgenteId = a.Id
+        LEFT JOIN dbo.CadastroBase cba ON a.CadastroBaseId = cba.Id
+        WHERE
+            cb.IsDeleted = 0;
         """
 
+        built_at = datetime.now().isoformat(timespec='seconds')
         db = Database()
         try:
-            results = db.execute_query(query)
-            churn_data = []
-            total_count = 0
-            for row in results:
-                total_count = row[0]
-                client_name, email, last_date, inactive_days, historical_volume, agent_name = row[1:]
-
-                email_list = [
-                    e.strip().lower()
-                    for e in email.split(';')
-                    if not e.strip().lower().endswith('@fontefm.com.br')
-                ]
-
-                if inactive_days > 120:
-                    risk = "Consumado"
-                elif inactive_days > 90:
-                    risk = "Alto"
-                elif inactive_days > 60:
-                    risk = "Médio"
-                elif inactive_days > 30:
-                    risk = "Baixo"
-                else:
-                    risk = "-"
-                churn_data.append({
-                    "client": client_name,
-                    "email_list": email_list,
-                    "last_operation": last_date,
-                    "inactive_days": inactive_days,
-                    "historical_volume": historical_volume,
-                    "agent": agent_name.capitalize(),
-                    "risk": risk
-                })
-            return {"data": churn_data, "total_count": total_count}
-        except Exception as e:
-            print(f"Erro ao executar a query no banco de dados: {e}")
-            raise RuntimeError(f"Erro ao buscar dados de churn: {e}")
+            # As linhas são gravadas no snapshot à medida que chegam do SQL Server
+            rows = (ComercialService._snapshot_row(r) for r in db.iter_query(query))
+            clients = (store or SnapshotStore()).replace_churn_clients(rows, built_at)
         finally:
             db.close_connection()
+
+        ResultCache.get_instance().invalidate("comercial")
+        return clients
+
+    @staticmethod
+    def _snapshot_row(result):
+        client_id, client_name, email, last_date, inactive_days, historical_volume, agent_name = result
+        return (
+            str(client_id),
+            client_name,
+            json.dumps(ComercialService._parse_emails(email)),
+            last_date.strftime('%Y-%m-%d'),
+            inactive_days,
+            float(historical_volume or 0),
+            (agent_name or "").capitalize(),
+            ComercialService._classify_risk(inactive_days),
+        )
+
+    @staticmethod
+    def _parse_emails(email):
+        return [
+            e.strip().lower()
+            for e in (email or "").split(';')
+            if e.strip() and not e.strip().lower().endswith('@fontefm.com.br')
+        ]
+
+    @staticmethod
+    def _classify_risk(inactive_days):
+        if inactive_days > 120:
+            return "Consumado"
+        elif inactive_days > 90:
+            return "Alto"
+        elif inactive_days > 60:
+            return "Médio"
+        elif inactive_days > 30:
+            return "Baixo"
+        return "-"
+
+    @staticmethod
+    def _row_to_dict(row):
+        client_id, client_name, email_list, last_date, inactive_days, historical_volume, agent, risk = row
+        return {
+            "client": client_name,
+            "email_list": json.loads(email_list),
+            "last_operation": date.fromisoformat(last_date),
+            "inactive_days": inactive_days,
+            "historical_volume": historical_volume,
+            "agent": agent,
+            "risk": risk
+        }
+
+    @staticmethod
+    def _record_sort_value(record, sort_column):
+        if sort_column == "ClientName":
+            return record.client
+        if sort_column == "LastDate":
+            return record.last_operation.strftime('%Y-%m-%d')
+        if sort_column == "InactiveDays":
+            return record.inactive_days
+        return record.historical_volume
+
+    @staticmethod
+    def _encode_cursor(last, sort_column, sort_direction, risk):
+        value, client_id = last
+        payload = json.dumps([sort_column, sort_direction, risk, value, client_id], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def _decode_cursor(cursor, sort_column, sort_direction, risk):
+        try:
+            cursor_column, cursor_direction, cursor_risk, value, client_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except Exception:
+            raise ValueError("Invalid cursor")
+        if (cursor_column, cursor_direction, cursor_risk) != (sort_column, sort_direction, risk):
+            raise ValueError("Cursor does not match the requested sort and filter")
+        return value, client_id
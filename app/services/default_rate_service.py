@@ -1,24 +1,72 @@
-from typing import Dict, Any, List
+import os
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Any, List, Optional
+import numpy as np
+from app.infra.async_database import AsyncDatabase
+from app.infra.cache import ResultCache, cached
+from app.infra.columnar import Columnar
 from app.infra.db_connection import Database
+from app.infra.http_cache import time_bucket
+from app.infra.snapshot_store import SnapshotStore
+from app.utils.business_calendar import BusinessCalendar
 from app.utils.date_utils import DateUtils
+from app.utils.sweep_line import SweepLine
 
 class DefaultRateService:
-    def get_daily_rate_series(self, start_date: str, end_date: str) -> Dict[str, Any]:
+    ENGINES = ("sql", "sweep")
+    SNAPSHOT_WATERMARK = "default_rate_daily"
+    SNAPSHOT_CHUNK_DAYS = 180
+    DOCUMENT_DTYPES = {
+        "DataEmissao": "datetime64[D]",
+        "DataVencimento": "datetime64[D]",
+        "DataBaixa": "datetime64[D]",
+        "Valor": "float64",
+    }
+    AGGREGATE_COLUMNS = ("dates", "overdue_documents", "active_documents", "overdue_value", "active_value")
+    AGGREGATE_DTYPES = {
+        "dates": "datetime64[D]",
+        "overdue_documents": "int64",
+        "active_documents": "int64",
+        "overdue_value": "float64",
+        "active_value": "float64",
+    }
+
+    def __init__(self, snapshot_store: Optional[SnapshotStore] = None):
+        self.snapshot_store = snapshot_store or SnapshotStore()
+        self.snapshot_enabled = os.getenv("DEFAULT_RATE_SNAPSHOT_ENABLED", "true").lower() == "true"
+
+    @cached("default_rate.daily", ttl=900)
+    def get_daily_rate_series(self, start_date: str, end_date: str, engine: Optional[str] = None) -> Dict[str, Any]:
         start_dt = DateUtils.parse_date(start_date)
         end_dt = DateUtils.parse_date(end_date)
 
+        # "sweep" ajusta os vencimentos em Python pelo BusinessCalendar; "sql" é a query
+        # original, que chama dbo.fn_DataVencimentoAjustada por documento, mantida apenas
+        # como alternativa explícita e para comparação dos resultados
+        engine = (engine or os.getenv("DEFAULT_RATE_ENGINE", "sweep")).lower()
+        if engine not in self.ENGINES:
+            raise ValueError(f"Invalid engine: {engine}")
+        if engine == "sweep":
+            aggregates = self.get_daily_aggregates(start_dt, end_dt)
+            return {"data": self._build_daily_series(aggregates)}
+
+        stored = self._read_snapshot(start_dt.date(), end_dt.date())
+        if stored is not None and len(stored["dates"]) == (end_dt - start_dt).days + 1:
+            return {"data": self._build_daily_series(stored)}
+
         start_str = start_dt.strftime('%Y-%m-%d')
         end_str = end_dt.strftime('%Y-%m-%d')
 
         db = Database()
         try:
-            sql = f"""
+            sql = """
             WITH DateSeries AS (
-                SELECT CAST('{start_str}' AS DATE) AS analysis_date
+                SELECT CAST(? AS DATE) AS analysis_date
                 UNION ALL
                 SELECT DATEADD(DAY, 1, analysis_date)
                 FROM DateSeries
-                WHERE analysis_date < CAST('{end_str}' AS DATE)
+                WHERE analysis_date < CAST(? AS DATE)
             ),
             DocumentosAjustados AS (
                 SELECT 
@@ -37,8 +85,8 @@ class DefaultRateService:
                 FROM Documento d
                 WHERE d.IsDeleted = 0
                   AND d.DataVencimento IS NOT NULL
-                  AND d.DataVencimento <= CAST('{end_str}' AS DATE)
-                  AND (d.DataBaixa IS NULL OR d.DataBaixa >= CAST('{start_str}' AS DATE))
+                  AND d.DataVencimento <= CAST(? AS DATE)
+                  AND (d.DataBaixa IS NULL OR d.DataBaixa >= CAST(? AS DATE))
             ),
             DocumentosVencidosPorDia AS (
                 SELECT 
@@ -100,115 +148,342 @@ class DefaultRateService:
             ORDER BY dvpd.analysis_date
             OPTION (MAXRECURSION 0);
             """
-            rows = db.execute_query(sql)
-            result: List[Dict[str, Any]] = []
-            for r in rows:
-                analysis_date = r[0]
-                rate = float(r[5] or 0)
-                date_obj = DateUtils.create_brazilian_date_without_altering(analysis_date)
-                result.append({
-                    "date": date_obj,
-                    "rate": rate
-                })
+            columns = db.fetch_columns(sql, (start_str, end_str, end_str, start_str), dtypes={
+                "analysis_date": "datetime64[D]",
+                "default_rate_percent": "float64",
+            })
+            dates = columns["analysis_date"].astype(object).tolist()
+            rates = np.nan_to_num(columns["default_rate_percent"]).tolist()
+            result: List[Dict[str, Any]] = [
+                {"date": DateUtils.create_brazilian_date_without_altering(day), "rate": rate}
+                for day, rate in zip(dates, rates)
+            ]
             return {"data": result}
         finally:
             db.close_connection()
 
-    def get_monthly_rate_series(self, start_date: str, end_date: str) -> Dict[str, Any]:
-        start_dt = DateUtils.parse_date(start_date)
-        end_dt = DateUtils.parse_date(end_date)
+    def get_data_version(self, max_age: int) -> str:
+        """
+        Versão dos dados de inadimplência para o ETag HTTP. A taxa do dia corrente muda a
+        qualquer momento, então a versão avança a cada janela de `max_age` segundos.
+        """
+        generation = ResultCache.get_instance().get_generation("default_rate")
+        return f"{date.today().isoformat()}:{time_bucket(max_age)}:{generation}"
+
+    async def get_daily_rate_series_async(self, start_date: str, end_date: str, engine: Optional[str] = None) -> Dict[str, Any]:
+        return await AsyncDatabase.run(self.get_daily_rate_series, start_date, end_date, engine)
+
+    def get_daily_aggregates(self, start_dt: datetime, end_dt: datetime) -> Dict[str, np.ndarray]:
+        """
+        Agregados diários de [start_dt, end_dt]: os dias já consolidados no snapshot local
+        são lidos dele e apenas o restante do período é calculado pelo sweep-line.
+        """
+        stored = self._read_snapshot(start_dt.date(), end_dt.date())
+        if stored is None:
+            return self.compute_daily_aggregates(start_dt, end_dt)
+
+        covered_days = len(stored["dates"])
+        if covered_days == (end_dt - start_dt).days + 1:
+            return stored
+
+        remainder = self.compute_daily_aggregates(start_dt + timedelta(days=covered_days), end_dt)
+        return {key: np.concatenate([stored[key], remainder[key]]) for key in stored}
+
+    def _read_snapshot(self, first_day: date, last_day: date) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Lê do snapshot o trecho contínuo que começa em `first_day`, ou None se o snapshot
+        não cobre o início do período. Se houver uma lacuna entre os dias gravados, só os
+        dias consecutivos anteriores a ela são usados; o restante é recalculado.
+        """
+        if not self.snapshot_enabled:
+            return None
+        min_day, max_day = self.snapshot_store.get_default_rate_bounds()
+        first_str = first_day.strftime('%Y-%m-%d')
+        if min_day is None or not (min_day <= first_str <= max_day):
+            return None
+
+        last_str = min(last_day.strftime('%Y-%m-%d'), max_day)
+        rows = self.snapshot_store.get_default_rate_days(first_str, last_str)
+        stored = Columnar.from_rows(rows, self.AGGREGATE_COLUMNS, self.AGGREGATE_DTYPES)
+
+        expected = np.datetime64(first_day, 'D') + np.arange(len(stored["dates"]))
+        gaps = np.flatnonzero(stored["dates"] != expected)
+        if gaps.size:
+            stored = {key: values[:gaps[0]] for key, values in stored.items()}
+        return stored if len(stored["dates"]) else None
+
+    def backfill_snapshot(self, start_date: str, end_date: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Popula o snapshot diário de [start_date, end_date]. Só dias já encerrados (até ontem)
+        são gravados, pois o dia corrente ainda pode mudar. O período precisa encostar ou
+        sobrepor os dias já gravados, para que o snapshot continue sem lacunas.
+        """
+        yesterday = date.today() - timedelta(days=1)
+        first_day = DateUtils.parse_date(start_date).date()
+        last_day = min(DateUtils.parse_date(end_date).date(), yesterday) if end_date else yesterday
+
+        min_day, max_day = self.snapshot_store.get_default_rate_bounds()
+        if min_day is not None and first_day <= last_day:
+            if last_day + timedelta(days=1) < DateUtils.parse_date(min_day).date() or \
+                    first_day - timedelta(days=1) > DateUtils.parse_date(max_day).date():
+                raise ValueError(
+                    f"Backfill de {first_day} a {last_day} deixaria uma lacuna no snapshot "
+                    f"({min_day} a {max_day}): o período deve encostar nos dias já gravados"
+                )
+
+        watermark = self._get_document_watermark()
+        return self._store_aggregates(first_day, last_day, watermark)
+
+    def refresh_snapshot(self) -> Dict[str, Any]:
+        """
+        Atualização incremental: recalcula apenas os dias que podem ter sido afetados por
+        documentos alterados (rowversion) desde o último watermark, além dos dias
+        encerrados desde a última execução.
+        """
+        last_watermark = self.snapshot_store.get_watermark(self.SNAPSHOT_WATERMARK)
+        min_day, max_day = self.snapshot_store.get_default_rate_bounds()
+        if last_watermark is None or min_day is None:
+            raise RuntimeError("Snapshot de inadimplência vazio: execute o backfill antes do refresh")
+
+        watermark = self._get_document_watermark()
+        sql = """
+        SELECT
+            MIN(d.DataEmissao),
+            MIN(d.DataVencimento),
+            MIN(d.DataVencimentoOriginal),
+            MIN(d.DataBaixa)
+        FROM Documento d
+        WHERE d.TimeStamp >= ?;
+        """
+        db = Database()
+        try:
+            rows = db.execute_query(sql, (bytes.fromhex(last_watermark),))
+        finally:
+            db.close_connection()
+
+        first_day = DateUtils.parse_date(max_day).date() + timedelta(days=1)
+        # Limite inferior dos dias afetados: a menor data (emissão, vencimento ou baixa)
+        # dos documentos alterados; antes dela o documento não era ativo nem vencido.
+        changed_dates = [d for d in (rows[0] if rows else ()) if d is not None]
+        if changed_dates:
+            first_day = min(first_day, min(changed_dates))
+        first_day = max(first_day, DateUtils.parse_date(min_day).date())
+
+        last_day = date.today() - timedelta(days=1)
+        return self._store_aggregates(first_day, last_day, watermark)
+
+    def _store_aggregates(self, first_day: date, last_day: date, watermark: str) -> Dict[str, Any]:
+        day = first_day
+        while day <= last_day:
+            chunk_end = min(day + timedelta(days=self.SNAPSHOT_CHUNK_DAYS - 1), last_day)
+            aggregates = self.compute_daily_aggregates(day, chunk_end)
+            rows = zip(
+                aggregates["dates"].astype(str).tolist(),
+                aggregates["overdue_documents"].tolist(),
+                aggregates["active_documents"].tolist(),
+                aggregates["overdue_value"].tolist(),
+                aggregates["active_value"].tolist(),
+            )
+            self.snapshot_store.upsert_default_rate_days(rows)
+            day = chunk_end + timedelta(days=1)
+
+        self.snapshot_store.set_watermark(self.SNAPSHOT_WATERMARK, watermark)
+        ResultCache.get_instance().invalidate("default_rate")
+        days = max((last_day - first_day).days + 1, 0)
+        return {"start_date": first_day.strftime('%Y-%m-%d'), "end_date": last_day.strftime('%Y-%m-%d'), "days": days}
+
+    @staticmethod
+    def _get_document_watermark() -> str:
+        db = Database()
+        try:
+            rows = db.execute_query("SELECT MIN_ACTIVE_ROWVERSION();")
+        finally:
+            db.close_connection()
+        return bytes(rows[0][0]).hex()
 
+    def compute_daily_aggregates(self, start_dt: datetime, end_dt: datetime) -> Dict[str, np.ndarray]:
+        """
+        Calcula, para cada dia de [start_dt, end_dt], a quantidade e o valor de documentos
+        vencidos e ativos com uma única leitura dos intervalos de cada documento.
+
+        Regras idênticas às da query diária em SQL:
+        - vencido de (vencimento ajustado + 1 dia) até (baixa - 1 dia), ou até hoje se não baixado;
+        - ativo de (emissão) até (baixa - 1 dia), ou indefinidamente se não baixado.
+        """
         start_str = start_dt.strftime('%Y-%m-%d')
         end_str = end_dt.strftime('%Y-%m-%d')
 
+        sql = """
+        SELECT
+            d.DataEmissao,
+            d.DataVencimento,
+            d.DataBaixa,
+            d.Valor
+        FROM Documento d
+        WHERE d.IsDeleted = 0
+          AND (
+              (d.DataEmissao <= CAST(? AS DATE)
+               AND (d.DataBaixa IS NULL OR d.DataBaixa > CAST(? AS DATE)))
+              OR
+              (d.DataVencimento IS NOT NULL
+               AND d.DataVencimento <= CAST(? AS DATE)
+               AND (d.DataBaixa IS NULL OR d.DataBaixa >= CAST(? AS DATE)))
+          );
+        """
+
         db = Database()
         try:
-            sql = f"""
-            WITH MonthlyAggregatedData AS (
-                SELECT 
-                    FORMAT(DataVencimento, 'yyyy-MM') AS period,
-                    SUM(Valor) AS overdue_value_placeholder
-                FROM Documento d
-                WHERE 
-                    d.IsDeleted = 0
-                    AND d.DataVencimento IS NOT NULL
-                    AND CAST(d.DataVencimento AS DATE) BETWEEN '{start_str}' AND '{end_str}'
-                GROUP BY FORMAT(DataVencimento, 'yyyy-MM')
-            )
-            SELECT 
-                period,
-                0 AS overdue_count,
-                0 AS total_count,
-                0.0 AS default_rate_percent
-            FROM MonthlyAggregatedData
-            ORDER BY period ASC;
-            """
-            rows = db.execute_query(sql)
-            result: List[Dict[str, Any]] = []
-            for r in rows:
-                period_raw = r[0]
-                date_obj = DateUtils.create_brazilian_date_without_altering(period_raw)
-                rate = float(r[3] or 0.0)
-                result.append({
-                    "date": date_obj,
-                    "rate": rate
-                })
-            return {"data": result}
+            columns = db.fetch_columns(sql, (end_str, start_str, end_str, start_str), dtypes=self.DOCUMENT_DTYPES)
         finally:
             db.close_connection()
 
+        emission = columns["DataEmissao"]
+        due = columns["DataVencimento"]
+        payment = columns["DataBaixa"]
+        values = np.nan_to_num(columns["Valor"])
+        adjusted_due = BusinessCalendar.get_instance().adjust_due_dates(due)
+
+        return self._sweep_daily_aggregates(start_dt, end_dt, emission, due, adjusted_due, payment, values)
+
+    @staticmethod
+    def _sweep_daily_aggregates(start_dt, end_dt, emission, due, adjusted_due, payment, values) -> Dict[str, np.ndarray]:
+        first_day = np.datetime64(start_dt.date() if isinstance(start_dt, datetime) else start_dt, 'D')
+        last_day = np.datetime64(end_dt.date() if isinstance(end_dt, datetime) else end_dt, 'D')
+        days = np.arange(first_day, last_day + 1, dtype='datetime64[D]')
+        n_days = len(days)
+        one_day = np.timedelta64(1, 'D')
+        today = np.datetime64(date.today(), 'D')
+        paid = ~np.isnat(payment)
+
+        # Documentos ativos: emitidos e ainda não baixados no dia
+        active_end = np.where(paid, payment - one_day, np.datetime64('9999-12-31'))
+        active_end = np.where(np.isnat(emission), np.datetime64('NaT'), active_end)
+
+        # Documentos vencidos: candidatos segundo os mesmos filtros da query SQL
+        candidate = (~np.isnat(due)) & (due <= last_day) & (~paid | (payment >= first_day))
+        overdue_start = np.where(candidate, adjusted_due + one_day, np.datetime64('NaT'))
+        overdue_end = np.where(paid, payment - one_day, today)
+
+        return {
+            "dates": days,
+            "overdue_documents": SweepLine.count_intervals(overdue_start, overdue_end, first_day, n_days),
+            "active_documents": SweepLine.count_intervals(emission, active_end, first_day, n_days),
+            "overdue_value": SweepLine.count_intervals(overdue_start, overdue_end, first_day, n_days, weights=values),
+            "active_value": SweepLine.count_intervals(emission, active_end, first_day, n_days, weights=values),
+        }
+
+    @staticmethod
+    def _daily_rates(aggregates: Dict[str, np.ndarray]) -> np.ndarray:
+        active = aggregates["active_documents"]
+        rates = np.zeros(len(active), dtype=np.float64)
+        np.divide(aggregates["overdue_documents"] * 100.0, active, out=rates, where=active > 0)
+        return rates
+
+    @staticmethod
+    def _build_daily_series(aggregates: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+        # Assim como o INNER JOIN da query SQL, só há linha para dias com vencidos e ativos
+        mask = (aggregates["overdue_documents"] > 0) & (aggregates["active_documents"] > 0)
+        rates = DefaultRateService._daily_rates(aggregates)
+
+        result: List[Dict[str, Any]] = []
+        for day, rate in zip(aggregates["dates"][mask].tolist(), rates[mask].tolist()):
+            result.append({
+                "date": DateUtils.create_brazilian_date_without_altering(day),
+                "rate": rate
+            })
+        return result
+
+    @cached("default_rate.monthly", ttl=900)
+    def get_monthly_rate_series(self, start_date: str, end_date: str) -> Dict[str, Any]:
+        """
+        Taxa de inadimplência mensal obtida a partir de uma única passada diária:
+        `rate` é a taxa no último dia do mês (ou no último dia disponível, para o mês
+        corrente) e `average_rate` é a média das taxas diárias do mês.
+        """
+        start_dt = DateUtils.get_start_of_month(DateUtils.parse_date(start_date))
+        end_of_month = DateUtils.get_end_of_month(DateUtils.parse_date(end_date))
+        end_dt = datetime.combine(min(end_of_month.date(), date.today()), datetime.min.time())
+        if end_dt < start_dt:
+            return {"data": []}
+
+        aggregates = self.get_daily_aggregates(start_dt, end_dt)
+        return {"data": self._build_monthly_series(aggregates)}
+
+    @staticmethod
+    def _build_monthly_series(aggregates: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+        rates = DefaultRateService._daily_rates(aggregates)
+        months = aggregates["dates"].astype('datetime64[M]')
+        periods, first_index, days_in_period = np.unique(months, return_index=True, return_counts=True)
+        last_index = first_index + days_in_period - 1
+        average_rates = np.add.reduceat(rates, first_index) / days_in_period if len(rates) else rates
+
+        result: List[Dict[str, Any]] = []
+        for period, month_end, average in zip(periods.astype(str).tolist(), rates[last_index].tolist(), average_rates.tolist()):
+            result.append({
+                "date": DateUtils.create_brazilian_date_without_altering(period),
+                "rate": month_end,
+                "average_rate": average
+            })
+        return result
+
+    async def get_monthly_rate_series_async(self, start_date: str, end_date: str) -> Dict[str, Any]:
+        return await AsyncDatabase.run(self.get_monthly_rate_series, start_date, end_date)
+
+    @cached("default_rate.current", ttl=300)
     def get_current_default_rate(self) -> Dict[str, Any]:
+        # Agrupa os documentos em aberto por vencimento; o ajuste para dia útil é feito
+        # uma vez por data distinta pelo BusinessCalendar, e não linha a linha no SQL Server.
+        # O ajuste considera fins de semana e feriados (como fn_DataVencimentoAjustada e a
+        # série diária); a versão anterior deste KPI só deslocava sábados e domingos.
         sql = """
             SELECT 
-                COUNT(DISTINCT CASE WHEN is_overdue = 1 THEN d.Id END) as overdue_documents,
+                d.DataVencimento,
                 COUNT(DISTINCT d.Id) as open_documents,
-                SUM(CASE WHEN is_overdue = 1 THEN d.ValorFace ELSE 0 END) as overdue_value,
                 SUM(d.ValorFace) as open_value
-            FROM (
-                SELECT 
-                    d.Id,
-                    d.ValorFace,
-                    CASE 
-                        WHEN d.Status = 0
-                         AND CAST(GETDATE() AS DATE) > 
-                             (CASE 
-                                WHEN DATEPART(WEEKDAY, CAST(d.DataVencimento AS DATE)) = 7 
-                                    THEN DATEADD(DAY, 2, CAST(d.DataVencimento AS DATE))
-                                WHEN DATEPART(WEEKDAY, CAST(d.DataVencimento AS DATE)) = 1 
-                                    THEN DATEADD(DAY, 1, CAST(d.DataVencimento AS DATE))
-                                ELSE CAST(d.DataVencimento AS DATE)
-                              END)
-                        THEN 1
-                        ELSE 0
-                    END as is_overdue
-                FROM Documento d
-                WHERE d.IsDeleted = 0
-                  AND d.Status = 0
-                  AND d.DataVencimento IS NOT NULL
-            ) d
+            FROM Documento d
+            WHERE d.IsDeleted = 0
+              AND d.Status = 0
+              AND d.DataVencimento IS NOT NULL
+            GROUP BY d.DataVencimento
         """
 
         db = Database()
         try:
             rows = db.execute_query(sql)
-            if rows:
-                result = rows[0]
-                overdue_documents = result[0]
-                open_documents = result[1]
-                overdue_value = round(float(result[2] or 0), 2)
-                open_value = round(float(result[3] or 0), 2)
-
-                default_rate_percent = round((overdue_documents / open_documents) * 100, 2) if open_documents > 0 else 0
-                default_rate_value_percent = round((overdue_value / open_value) * 100, 2) if open_value > 0 else 0
-
-                return {
-                    "overdue_documents": overdue_documents,
-                    "open_documents": open_documents,
-                    "overdue_value": overdue_value,
-                    "open_value": open_value,
-                    "default_rate_percent": default_rate_percent,
-                    "default_rate_value_percent": default_rate_value_percent,
-                }
-            return {}
         finally:
             db.close_connection()
+        if not rows:
+            return {}
+
+        due_dates = SweepLine.to_day_array(r[0] for r in rows)
+        adjusted = BusinessCalendar.get_instance().adjust_due_dates(due_dates)
+        is_overdue = (np.datetime64(date.today(), 'D') > adjusted).tolist()
+
+        overdue_documents = 0
+        open_documents = 0
+        overdue_value = Decimal(0)
+        open_value = Decimal(0)
+        for r, overdue in zip(rows, is_overdue):
+            open_documents += r[1]
+            open_value += r[2] or 0
+            if overdue:
+                overdue_documents += r[1]
+                overdue_value += r[2] or 0
+
+        overdue_value = round(float(overdue_value), 2)
+        open_value = round(float(open_value), 2)
+
+        default_rate_percent = round((overdue_documents / open_documents) * 100, 2) if open_documents > 0 else 0
+        default_rate_value_percent = round((overdue_value / open_value) * 100, 2) if open_value > 0 else 0
+
+        return {
+            "overdue_documents": overdue_documents,
+            "open_documents": open_documents,
+            "overdue_value": overdue_value,
+            "open_value": open_value,
+            "default_rate_percent": default_rate_percent,
+            "default_rate_value_percent": default_rate_value_percent,
+        }
+
+    async def get_current_default_rate_async(self) -> Dict[str, Any]:
+        return await AsyncDatabase.run(self.get_current_default_rate)
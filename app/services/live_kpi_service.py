@@ -0,0 +1,22 @@
+from datetime import date
+from typing import Any, Dict
+from app.services.comercial_service import ComercialService
+from app.services.default_rate_service import DefaultRateService
+from app.services.operations_service import OperationsService
+from app.utils.date_utils import DateUtils
+
+class LiveKpiService:
+    """KPIs enviados aos dashboards abertos pelo stream de atualizações (/dashboard/live)."""
+
+    def __init__(self, operations_service=None, default_rate_service=None):
+        self.operations_service = operations_service or OperationsService()
+        self.default_rate_service = default_rate_service or DefaultRateService()
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        today = date.today().isoformat()
+        volume = self.operations_service.get_daily_volume_data(today, today)["data"]
+        return {
+            "current_default_rate": self.default_rate_service.get_current_default_rate(),
+            "today_volume": volume[-1] if volume else {"date": DateUtils.create_brazilian_date_without_altering(today), "total_volume": 0.0, "average_ticket": 0.0},
+            "churn_counts": ComercialService.get_risk_counts(),
+        }
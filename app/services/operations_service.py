@@ -1,9 +1,39 @@
+import logging
+import os
+import threading
+import time
 from datetime import datetime, timezone, timedelta
-from typing import Dict, Any
+from decimal import Decimal
+from typing import Dict, Any, Optional
+import numpy as np
+from app.infra.async_database import AsyncDatabase
+from app.infra.cache import ResultCache, cached
 from app.infra.db_connection import Database
+from app.infra.http_cache import time_bucket
+from app.infra.metrics import Metrics
+from app.infra.snapshot_store import SnapshotStore
 from app.utils.date_utils import DateUtils
 
+logger = logging.getLogger(__name__)
+
 class OperationsService:
+    ROLLUP_WATERMARK = "operations_volume"
+    # ValorCompra é money (4 casas): o agregado local guarda inteiros em 1/10000 para somar sem erro
+    VALUE_SCALE = 10000
+
+    VOLUME_DTYPES = {"total_volume": "float64", "average_ticket": "float64"}
+
+    _refresh_lock = threading.Lock()
+    _refresh_thread: Optional[threading.Thread] = None
+
+    def __init__(self, snapshot_store: Optional[SnapshotStore] = None):
+        self.snapshot_store = snapshot_store or SnapshotStore()
+        self.rollup_enabled = os.getenv("OPERATIONS_ROLLUP_ENABLED", "true").lower() == "true"
+        # (watermark, updated_at, momento da leitura) do agregado, relido do SQLite no
+        # máximo a cada OPERATIONS_ROLLUP_CHECK_INTERVAL segundos
+        self._rollup_state = None
+
+    @cached("operations.monthly_volume", ttl=600)
     def get_monthly_volume_data(self, start_date: str, end_date: str) -> Dict[str, Any]:
         start_date_obj = DateUtils.get_start_of_month(DateUtils.parse_date(start_date))
         end_date_obj = DateUtils.get_end_of_month(DateUtils.parse_date(end_date))
@@ -11,7 +41,11 @@ class OperationsService:
         start_date_str = start_date_obj.strftime('%Y-%m-%d')
         end_date_str = end_date_obj.strftime('%Y-%m-%d')
 
-        sql = f"""
+        if self.ensure_rollup():
+            rows = self.snapshot_store.get_operations_volume_months(start_date_str, end_date_str)
+            return {"data": [self._rollup_entry(period, units, count) for period, units, count in rows]}
+
+        sql = """
         WITH MonthlyAggregatedData AS (
             SELECT 
                 FORMAT(Data, 'yyyy-MM') AS period,
@@ -20,7 +54,7 @@ class OperationsService:
             FROM dbo.Operacao
             WHERE 
                 IsDeleted = 0
-                AND Data >= '{start_date_str}' AND Data <= '{end_date_str}'
+                AND Data >= ? AND Data <= ?
             GROUP BY FORMAT(Data, 'yyyy-MM')
         )
         SELECT 
@@ -33,19 +67,12 @@ class OperationsService:
 
         db = Database()
         try:
-            rows = db.execute_query(sql)
-            result = [
-                {
-                    "date": DateUtils.create_brazilian_date_without_altering(r[0]),
-                    "total_volume": round(float(r[1]), 2),
-                    "average_ticket": round(float(r[2]), 2)
-                }
-                for r in rows
-            ]
-            return {"data": result}
+            columns = db.fetch_columns(sql, (start_date_str, end_date_str), dtypes=self.VOLUME_DTYPES)
+            return {"data": self._volume_entries(columns["period_date"].tolist(), columns)}
         finally:
             db.close_connection()
 
+    @cached("operations.daily_volume", ttl=600)
     def get_daily_volume_data(self, start_date: str, end_date: str) -> Dict[str, Any]:
         start_date_obj = DateUtils.parse_date(start_date)
         end_date_obj = DateUtils.parse_date(end_date)
@@ -53,7 +80,11 @@ class OperationsService:
         start_date_str = start_date_obj.strftime('%Y-%m-%d')
         end_date_str = end_date_obj.strftime('%Y-%m-%d')
 
-        sql = f"""
+        if self.ensure_rollup():
+            rows = self.snapshot_store.get_operations_volume_days(start_date_str, end_date_str, weekdays_only=True)
+            return {"data": [self._rollup_entry(day, units, count) for day, units, count in rows]}
+
+        sql = """
         WITH DailyAggregatedData AS (
             SELECT 
                 CAST(Data AS DATE) AS period,
@@ -62,7 +93,7 @@ class OperationsService:
             FROM dbo.Operacao
             WHERE 
                 IsDeleted = 0
-                AND Data >= '{start_date_str}' AND Data <= '{end_date_str}'
+                AND Data >= ? AND Data <= ?
                 AND DATEPART(WEEKDAY, Data) NOT IN (1, 7)
             GROUP BY CAST(Data AS DATE)
         )
@@ -76,15 +107,163 @@ class OperationsService:
 
         db = Database()
         try:
-            rows = db.execute_query(sql)
-            result = [
-                {
-                    "date": DateUtils.create_brazilian_date_without_altering(r[0].strftime('%Y-%m-%d')),
-                    "total_volume": round(float(r[1]), 2),
-                    "average_ticket": round(float(r[2]), 2)
-                }
-                for r in rows
-            ]
-            return {"data": result}
+            columns = db.fetch_columns(sql, (start_date_str, end_date_str), dtypes=dict(self.VOLUME_DTYPES, period_date="datetime64[D]"))
+            return {"data": self._volume_entries(columns["period_date"].astype(object).tolist(), columns)}
         finally:
             db.close_connection()
+
+    async def get_monthly_volume_data_async(self, start_date: str, end_date: str) -> Dict[str, Any]:
+        return await AsyncDatabase.run(self.get_monthly_volume_data, start_date, end_date)
+
+    async def get_daily_volume_data_async(self, start_date: str, end_date: str) -> Dict[str, Any]:
+        return await AsyncDatabase.run(self.get_daily_volume_data, start_date, end_date)
+
+    @staticmethod
+    def _volume_entries(periods, columns) -> list:
+        # Arredondamento em lote; só a montagem final dos dicts é por linha
+        total_volume = np.round(columns["total_volume"], 2).tolist()
+        average_ticket = np.round(columns["average_ticket"], 2).tolist()
+        return [
+            {
+                "date": DateUtils.create_brazilian_date_without_altering(period),
+                "total_volume": volume,
+                "average_ticket": ticket
+            }
+            for period, volume, ticket in zip(periods, total_volume, average_ticket)
+        ]
+
+    def get_data_version(self, max_age: int) -> str:
+        """
+        Versão dos dados de volume para o ETag HTTP: com o agregado local, o watermark dele;
+        sem o agregado, a janela de `max_age` segundos atual.
+        """
+        generation = ResultCache.get_instance().get_generation("operations")
+        watermark = self._usable_rollup_watermark()
+        if watermark is not None:
+            return f"rollup:{watermark}:{generation}"
+        return f"sql:{time_bucket(max_age)}:{generation}"
+
+    def ensure_rollup(self) -> bool:
+        """
+        Indica se as leituras podem usar o agregado diário local. O agregado só é usado
+        depois do primeiro rebuild; a partir daí é atualizado incrementalmente quando o
+        watermark tem mais de OPERATIONS_ROLLUP_MAX_AGE segundos.
+
+        A atualização roda numa thread em segundo plano (uma por processo): a requisição
+        que a dispara e as seguintes leem o agregado como está, e se o SQL Server falhar
+        o agregado antigo continua sendo servido (o próximo acesso tenta de novo).
+        """
+        return self._usable_rollup_watermark() is not None
+
+    def _usable_rollup_watermark(self) -> Optional[str]:
+        if not self.rollup_enabled:
+            return None
+        watermark, updated_at = self._get_rollup_state()
+        if watermark is not None and self._is_rollup_stale(updated_at) \
+                and OperationsService._refresh_lock.acquire(blocking=False):
+            thread = threading.Thread(target=self._refresh_in_background, name="operations-rollup-refresh", daemon=True)
+            OperationsService._refresh_thread = thread
+            thread.start()
+        return watermark
+
+    def _refresh_in_background(self):
+        try:
+            # Outro processo pode ter atualizado o agregado desde a última leitura
+            if self._is_rollup_stale(self._get_rollup_state(reload=True)[1]):
+                with Metrics.query_caller("operations_service.refresh_rollup"):
+                    self.refresh_rollup()
+        except Exception:
+            logger.exception("Falha ao atualizar o agregado de operações; servindo o agregado anterior")
+        finally:
+            OperationsService._refresh_lock.release()
+
+    def _get_rollup_state(self, reload: bool = False):
+        state = self._rollup_state
+        interval = float(os.getenv("OPERATIONS_ROLLUP_CHECK_INTERVAL", "5"))
+        if reload or state is None or time.monotonic() - state[2] > interval:
+            watermark, updated_at = self.snapshot_store.get_watermark_state(self.ROLLUP_WATERMARK)
+            state = (watermark, updated_at, time.monotonic())
+            self._rollup_state = state
+        return state[0], state[1]
+
+    @staticmethod
+    def _is_rollup_stale(updated_at: Optional[str]) -> bool:
+        if updated_at is None:
+            return True
+        max_age = float(os.getenv("OPERATIONS_ROLLUP_MAX_AGE", "300"))
+        age = datetime.now(timezone.utc).replace(tzinfo=None) - datetime.fromisoformat(updated_at)
+        return age.total_seconds() > max_age
+
+    def rebuild_rollup(self) -> Dict[str, Any]:
+        """Recria o agregado diário com uma leitura completa de dbo.Operacao."""
+        watermark = self._get_rowversion_watermark()
+        sql = """
+        SELECT Id, Data, ValorCompra
+        FROM dbo.Operacao
+        WHERE IsDeleted = 0;
+        """
+        db = Database()
+        try:
+            ledger = ((str(r[0]), r[1].strftime('%Y-%m-%d'), self._to_units(r[2])) for r in db.iter_query(sql))
+            operations = self.snapshot_store.replace_operations(ledger, self.ROLLUP_WATERMARK, watermark)
+        finally:
+            db.close_connection()
+        self._rollup_state = None
+
+        ResultCache.get_instance().invalidate("operations")
+        return {"operations": operations}
+
+    def refresh_rollup(self) -> Dict[str, Any]:
+        """
+        Atualização incremental: aplica apenas as operações alteradas (rowversion) desde o
+        último watermark. Exclusões lógicas (IsDeleted = 1) removem a operação do seu dia.
+        """
+        last_watermark = self.snapshot_store.get_watermark(self.ROLLUP_WATERMARK)
+        if last_watermark is None:
+            raise RuntimeError("Agregado de operações vazio: execute o rebuild antes do refresh")
+
+        watermark = self._get_rowversion_watermark()
+        sql = """
+        SELECT Id, Data, ValorCompra, IsDeleted
+        FROM dbo.Operacao
+        WHERE TimeStamp >= ?;
+        """
+        db = Database()
+        try:
+            rows = db.execute_query(sql, (bytes.fromhex(last_watermark),))
+        finally:
+            db.close_connection()
+
+        changes = [
+            (str(r[0]), None if r[3] else r[1].strftime('%Y-%m-%d'), self._to_units(r[2]))
+            for r in rows
+        ]
+        affected = self.snapshot_store.apply_operation_changes(changes, self.ROLLUP_WATERMARK, watermark)
+        self._rollup_state = None
+        if affected:
+            ResultCache.get_instance().invalidate("operations")
+        return {"operations": len(changes), "days": affected}
+
+    @staticmethod
+    def _get_rowversion_watermark() -> str:
+        db = Database()
+        try:
+            rows = db.execute_query("SELECT MIN_ACTIVE_ROWVERSION();")
+        finally:
+            db.close_connection()
+        return bytes(rows[0][0]).hex()
+
+    @classmethod
+    def _to_units(cls, value) -> int:
+        return int((Decimal(value or 0) * cls.VALUE_SCALE).to_integral_value())
+
+    @classmethod
+    def _rollup_entry(cls, period: str, units: int, count: int) -> Dict[str, Any]:
+        total_volume = Decimal(units) / cls.VALUE_SCALE
+        # AVG sobre money devolve money: 4 casas antes do arredondamento para exibição
+        average_ticket = (total_volume / count).quantize(Decimal("0.0001")) if count else Decimal(0)
+        return {
+            "date": DateUtils.create_brazilian_date_without_altering(period),
+            "total_volume": round(float(total_volume), 2),
+            "average_ticket": round(float(average_ticket), 2)
+        }
@@ -150,9 +150,21 @@ function setupRiskFilterHandler() {
     });
 }
 
+// Mostra a quantidade de clientes de cada faixa no filtro de risco
+function updateRiskCounts(counts) {
+    document.querySelectorAll('#risk-filter option').forEach(option => {
+        if (!option.value || !(option.value in counts)) return;
+        if (!option.dataset.label) option.dataset.label = option.textContent;
+        option.textContent = `${option.dataset.label} (${counts[option.value]})`;
+    });
+}
+
 document.addEventListener('DOMContentLoaded', () => {
     setupSortHandlers();
     setupPaginationHandlers();
     setupRiskFilterHandler();
     fetchChurnData();
+    liveUpdates.subscribe(kpis => {
+        if (kpis.churn_counts) updateRiskCounts(kpis.churn_counts);
+    });
 });
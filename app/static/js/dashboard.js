@@ -7,7 +7,7 @@ class VolumeChart {
         this.typeSelect = document.getElementById('typeSelect');
     }
 
-    async init() {
+    async init(initialData = null) {
         this.filterButton.addEventListener('click', async () => {
             const start_date = this.startDateInput.value;
             const end_date = this.endDateInput.value;
@@ -20,14 +20,9 @@ class VolumeChart {
             }
         });
 
-        const endDate = new Date();
-        const startDate = dateUtils.subtractMonthsFromDate(endDate, 1);
+        this.setDefaultFilters();
 
-        this.startDateInput.value = dateUtils.formatDateToPattern(startDate, 'yyyy-MM-01');
-        this.endDateInput.value = dateUtils.formatDateToPattern(endDate, 'yyyy-MM-01');
-        this.typeSelect.value = 'daily';
-
-        const data = await this.fetchVolumeData(
+        const data = initialData || await this.fetchVolumeData(
             this.startDateInput.value,
             this.endDateInput.value,
             this.typeSelect.value
@@ -36,6 +31,21 @@ class VolumeChart {
         this.renderChart(data, this.typeSelect.value);
     }
 
+    setDefaultFilters() {
+        const endDate = new Date();
+        const startDate = dateUtils.subtractMonthsFromDate(endDate, 1);
+
+        this.startDateInput.value = dateUtils.formatDateToPattern(startDate, 'yyyy-MM-01');
+        this.endDateInput.value = dateUtils.formatDateToPattern(endDate, 'yyyy-MM-01');
+        this.typeSelect.value = 'daily';
+
+        return {
+            start_date: this.startDateInput.value,
+            end_date: this.endDateInput.value,
+            type: this.typeSelect.value
+        };
+    }
+
     async fetchVolumeData(start_date, end_date, type = 'monthly') {
         try {
             const response = await fetch(`/operations/volume-data?start_date=${start_date}&end_date=${end_date}&type=${type}`);
@@ -67,6 +77,9 @@ class VolumeChart {
         const gridColor = getComputedStyle(document.documentElement).getPropertyValue('--input-border');
         const fontFamily = getComputedStyle(document.documentElement).getPropertyValue('--font-family').trim();
 
+        this.data = data;
+        this.type = type;
+
         if (this.chart) this.chart.destroy();
 
         this.chart = new Chart(ctx, {
@@ -253,6 +266,17 @@ class VolumeChart {
             },
         });
     }
+
+    // Atualiza o ponto do dia corrente quando ele está no gráfico diário exibido
+    updateDay(entry) {
+        if (!entry || this.type !== 'daily' || !this.data) return;
+        const index = this.data.findIndex(item => item.date === entry.date);
+        if (index === -1) return;
+
+        const data = [...this.data];
+        data[index] = entry;
+        this.renderChart(data, this.type);
+    }
 }
 
 class DocumentStats {
@@ -261,15 +285,15 @@ class DocumentStats {
         this.documentValueChart = null;
     }
 
-    async init() {
-        const data = await this.fetchDefaultRateData();
+    async init(initialData = null) {
+        const data = initialData || await this.fetchDefaultRateData();
         this.updateStats(data);
         this.renderCharts(data);
     }
 
     async fetchDefaultRateData() {
         try {
-            const response = await fetch('/operations/default-rate');
+            const response = await fetch('/default-rate/');
             if (!response.ok) throw new Error('Erro ao buscar dados de inadimplência');
             return await response.json();
         } catch (error) {
@@ -413,10 +437,39 @@ class DocumentStats {
     }
 }
 
+async function fetchDashboardBundle(start_date, end_date, volume_type) {
+    try {
+        const params = new URLSearchParams({
+            start_date,
+            end_date,
+            volume_type,
+            sections: 'volume,current_default_rate'
+        });
+        const response = await fetch(`/dashboard/bundle?${params.toString()}`);
+        if (!response.ok) throw new Error('Erro ao buscar dados do dashboard');
+        return await response.json();
+    } catch (error) {
+        console.error('Erro ao buscar dados do dashboard:', error);
+        return {};
+    }
+}
+
 document.addEventListener('DOMContentLoaded', async () => {
     const volumeChart = new VolumeChart();
-    await volumeChart.init();
-
     const documentStats = new DocumentStats();
-    await documentStats.init();
+
+    // Carga inicial em uma única requisição; os filtros continuam buscando só o volume
+    const { start_date, end_date, type } = volumeChart.setDefaultFilters();
+    const bundle = await fetchDashboardBundle(start_date, end_date, type);
+
+    await volumeChart.init(bundle.volume?.data);
+    await documentStats.init(bundle.current_default_rate);
+
+    liveUpdates.subscribe(kpis => {
+        if (kpis.current_default_rate) {
+            documentStats.updateStats(kpis.current_default_rate);
+            documentStats.renderCharts(kpis.current_default_rate);
+        }
+        volumeChart.updateDay(kpis.today_volume);
+    });
 });
@@ -1,8 +1,7 @@
 class DefaultRate {
     constructor() {
         this.API_CONFIG = {
-            currentRateEndpoint: '/default-rate',
-            historicalDataEndpoint: '/default-rate/data'
+            bundleEndpoint: '/dashboard/bundle'
         };
         this.lineChart = null;
         this.quantityBarChart = null;
@@ -83,12 +82,10 @@ class DefaultRate {
         try {
             if (!start || !end) throw new Error('Selecione datas válidas');
 
-            // Fetch current default rate
-            const currentRate = await this.fetchCurrentRate();
+            // Taxa atual e série histórica em uma única requisição
+            const { currentRate, historicalData } = await this.fetchBundle(start, end, type);
             this.updateCurrentMetrics(currentRate);
 
-            // Fetch historical data
-            const historicalData = await this.fetchHistoricalData(start, end, type);
             const processed = this.processHistoricalData(historicalData, type);
             this.renderLineChart(processed.labels, processed.values);
             this.renderMetricCharts(currentRate);
@@ -111,31 +108,37 @@ class DefaultRate {
         if (defaultRatePercentEl) defaultRatePercentEl.textContent = `${data.default_rate_percent?.toFixed(2) || '0.00'}%`;
     }
 
-    async fetchCurrentRate() {
+    async fetchBundle(start_date, end_date, type) {
         try {
-            const url = this.API_CONFIG.currentRateEndpoint;
+            const params = new URLSearchParams({
+                start_date,
+                end_date,
+                rate_type: type,
+                sections: 'current_default_rate,default_rate_series',
+                format: 'columns'
+            });
+            const url = `${this.API_CONFIG.bundleEndpoint}?${params.toString()}`;
             const res = await fetch(url, { method: 'GET', headers: { 'Content-Type': 'application/json' } });
             if (!res.ok) throw new Error(`HTTP ${res.status}: ${res.statusText}`);
             const payload = await res.json();
-            return payload || {};
+            return {
+                currentRate: payload.current_default_rate || {},
+                historicalData: payload.default_rate_series?.data || {}
+            };
         } catch (err) {
-            console.error('Error fetching current default rate:', err);
+            console.error('Error fetching default rate data:', err);
             throw err;
         }
     }
 
-    async fetchHistoricalData(start_date, end_date, type) {
-        try {
-            const params = new URLSearchParams({ start_date, end_date, type });
-            const url = `${this.API_CONFIG.historicalDataEndpoint}?${params.toString()}`;
-            const res = await fetch(url, { method: 'GET', headers: { 'Content-Type': 'application/json' } });
-            if (!res.ok) throw new Error(`HTTP ${res.status}: ${res.statusText}`);
-            const payload = await res.json();
-            return payload.data || [];
-        } catch (err) {
-            console.error('Error fetching historical default rate data:', err);
-            throw err;
-        }
+    processHistoricalData(series, type) {
+        // Série no formato 'columns': { date: ['yyyy-MM-dd', ...], rate: [...] }
+        const months = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez'];
+        const labels = (series.date || []).map(value => {
+            const [year, month, day] = value.split('-');
+            return type === 'monthly' ? `${months[Number(month) - 1]}/${year}` : `${day}/${month}`;
+        });
+        return { labels, values: series.rate || [] };
     }
 
     renderLineChart(labels, values) {
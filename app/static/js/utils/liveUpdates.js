@@ -0,0 +1,21 @@
+const liveUpdates = {
+    // Assina o stream de KPIs do servidor (/dashboard/live); o EventSource reconecta sozinho,
+    // inclusive no limite de conexões (o servidor manda um retry longo). Com o recurso
+    // desativado o servidor responde 204 e a conexão fica fechada.
+    subscribe(onKpis) {
+        if (!window.EventSource) return null;
+
+        const source = new EventSource('/dashboard/live');
+        source.addEventListener('kpis', event => {
+            try {
+                onKpis(JSON.parse(event.data));
+            } catch (error) {
+                console.error('Erro ao processar atualização dos KPIs:', error);
+            }
+        });
+        return source;
+    }
+};
+
+// Disponibilizar como variável global
+window.liveUpdates = liveUpdates;
@@ -0,0 +1,183 @@
+import json
+import os
+import threading
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+import numpy as np
+
+class BusinessCalendar:
+    """
+    Calendário de dias úteis em memória, equivalente a dbo.fn_DataVencimentoAjustada:
+    a data de vencimento ajustada é o próprio vencimento, ou o próximo dia útil se
+    ele cair em fim de semana ou feriado.
+
+    Os feriados são carregados uma única vez por processo a partir de dbo.Feriado
+    (nacionais, estaduais e municipais, conforme a coluna Tipo; o estado e a cidade
+    vêm da Empresa do feriado) e, opcionalmente, de um arquivo JSON apontado por
+    HOLIDAYS_FILE:
+
+        {
+            "national": ["2025-01-01", "12-25"],
+            "states": {"SP": ["07-09"]},
+            "cities": {"SP/São Paulo": ["01-25"]}
+        }
+
+    Entradas no formato 'MM-dd' são recorrentes e valem para todos os anos.
+    """
+
+    FIRST_YEAR = 1990
+    LAST_YEAR = 2100
+    # Valores de dbo.Feriado.Tipo
+    NATIONAL = 1
+    STATE = 2
+    CITY = 3
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, national: Iterable[str] = (), states: Optional[Dict[str, Iterable[str]]] = None,
+                 cities: Optional[Dict[str, Iterable[str]]] = None):
+        self._national = self._expand(national)
+        self._states = {key.upper(): self._expand(values) for key, values in (states or {}).items()}
+        self._cities = {self._city_key(*key.split('/', 1)): self._expand(values) for key, values in (cities or {}).items()}
+        self._calendars: Dict[Tuple[Optional[str], Optional[str]], np.busdaycalendar] = {}
+        self._lock = threading.Lock()
+        self.adjust_due_date = lru_cache(maxsize=65536)(self._adjust_due_date)
+
+    @classmethod
+    def get_instance(cls) -> "BusinessCalendar":
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls.load()
+        return cls._instance
+
+    @classmethod
+    def reload(cls) -> "BusinessCalendar":
+        with cls._instance_lock:
+            cls._instance = cls.load()
+        return cls._instance
+
+    @classmethod
+    def load(cls) -> "BusinessCalendar":
+        national = []
+        states: Dict[str, list] = {}
+        cities: Dict[str, list] = {}
+
+        if os.getenv("HOLIDAYS_FROM_DATABASE", "true").lower() == "true":
+            national, states, cities = cls.group_holidays(cls._load_from_database())
+
+        holidays_file = os.getenv("HOLIDAYS_FILE")
+        if holidays_file:
+            with open(holidays_file, encoding='utf-8') as f:
+                bundled = json.load(f)
+            national.extend(bundled.get("national", []))
+            for key, values in bundled.get("states", {}).items():
+                states.setdefault(key, []).extend(values)
+            for key, values in bundled.get("cities", {}).items():
+                cities.setdefault(key, []).extend(values)
+
+        return cls(national, states, cities)
+
+    @classmethod
+    def group_holidays(cls, rows) -> Tuple[list, Dict[str, list], Dict[str, list]]:
+        """
+        Separa linhas (Data, ERecorrente, Tipo, Estado, Cidade) de dbo.Feriado em
+        feriados nacionais, estaduais ('UF') e municipais ('UF/cidade').
+        Feriados estaduais ou municipais sem a localidade preenchida são ignorados.
+        """
+        national = []
+        states: Dict[str, list] = {}
+        cities: Dict[str, list] = {}
+        for day, recurring, kind, state, city in rows:
+            day = day.isoformat() if isinstance(day, date) else str(day)
+            value = day[5:10] if recurring else day[:10]
+            if kind == cls.STATE:
+                if state:
+                    states.setdefault(state.strip().upper(), []).append(value)
+            elif kind == cls.CITY:
+                if state and city:
+                    cities.setdefault(cls._city_key(state.strip(), city), []).append(value)
+            else:
+                national.append(value)
+        return national, states, cities
+
+    @staticmethod
+    def _load_from_database():
+        from app.infra.db_connection import Database
+
+        sql = """
+        SELECT f.Data, f.ERecorrente, f.Tipo, e.Estado, e.Cidade
+        FROM dbo.Feriado f
+        LEFT JOIN dbo.Empresa e ON e.Id = f.EmpresaId
+        WHERE f.IsDeleted = 0;
+        """
+        db = Database()
+        try:
+            return db.execute_query(sql)
+        finally:
+            db.close_connection()
+
+    def adjust_due_dates(self, due_dates: np.ndarray, state: Optional[str] = None, city: Optional[str] = None) -> np.ndarray:
+        """
+        Versão vetorizada de `adjust_due_date` para um array datetime64[D]. NaT é preservado.
+        Cada data distinta é ajustada uma única vez.
+        """
+        due_dates = np.asarray(due_dates, dtype='datetime64[D]')
+        if due_dates.size == 0:
+            return due_dates.copy()
+        unique_dates, inverse = np.unique(due_dates, return_inverse=True)
+        adjusted = np.busday_offset(unique_dates, 0, roll='forward', busdaycal=self._get_calendar(state, city))
+        return adjusted[inverse].reshape(due_dates.shape)
+
+    def is_business_day(self, day: date, state: Optional[str] = None, city: Optional[str] = None) -> bool:
+        return bool(np.is_busday(np.datetime64(self._as_date(day), 'D'), busdaycal=self._get_calendar(state, city)))
+
+    def _adjust_due_date(self, due_date: date, state: Optional[str] = None, city: Optional[str] = None) -> date:
+        """
+        Retorna a data de vencimento ajustada (próximo dia útil) para uma única data.
+        Memoizada por (data, estado, cidade).
+        """
+        adjusted = np.busday_offset(np.datetime64(self._as_date(due_date), 'D'), 0, roll='forward',
+                                    busdaycal=self._get_calendar(state, city))
+        return adjusted.astype(date)
+
+    def _get_calendar(self, state: Optional[str], city: Optional[str]) -> np.busdaycalendar:
+        key = (state.upper() if state else None, self._city_key(state, city) if city else None)
+        calendar = self._calendars.get(key)
+        if calendar is None:
+            with self._lock:
+                calendar = self._calendars.get(key)
+                if calendar is None:
+                    holidays = set(self._national)
+                    if key[0]:
+                        holidays |= self._states.get(key[0], set())
+                    if key[1]:
+                        holidays |= self._cities.get(key[1], set())
+                    calendar = np.busdaycalendar(weekmask='1111100', holidays=sorted(holidays))
+                    self._calendars[key] = calendar
+        return calendar
+
+    @classmethod
+    def _expand(cls, values: Iterable[str]) -> set:
+        days = set()
+        for value in values:
+            value = str(value)
+            if len(value) == 5:  # 'MM-dd': feriado recorrente
+                for year in range(cls.FIRST_YEAR, cls.LAST_YEAR + 1):
+                    try:
+                        days.add(np.datetime64(date(year, int(value[:2]), int(value[3:])), 'D'))
+                    except ValueError:
+                        continue  # 29/02 em anos não bissextos
+            else:
+                days.add(np.datetime64(value[:10], 'D'))
+        return days
+
+    @staticmethod
+    def _city_key(state: Optional[str], city: str) -> str:
+        return f"{(state or '').upper()}/{city.strip().lower()}"
+
+    @staticmethod
+    def _as_date(value) -> date:
+        return value.date() if isinstance(value, datetime) else value
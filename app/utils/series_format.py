@@ -0,0 +1,30 @@
+from datetime import date
+from typing import Any, Dict, List, Union
+
+class SeriesFormat:
+    """
+    Formatos de resposta das séries dos gráficos, escolhidos pelo parâmetro `format`:
+    - records (padrão): lista de objetos, ex. [{"date": ..., "rate": 1.2}, ...];
+    - columns: arrays paralelos, ex. {"date": ["2025-01-02", ...], "rate": [1.2, ...]},
+      com as datas reduzidas a 'yyyy-MM-dd'. Bem menor para séries diárias longas.
+    """
+
+    FORMATS = ("records", "columns")
+
+    @staticmethod
+    def parse(value) -> str:
+        series_format = (value or "records").lower()
+        if series_format not in SeriesFormat.FORMATS:
+            raise ValueError(f"Invalid format parameter. Use {' or '.join(repr(f) for f in SeriesFormat.FORMATS)}.")
+        return series_format
+
+    @staticmethod
+    def apply(series: List[Dict[str, Any]], series_format: str) -> Union[List[Dict[str, Any]], Dict[str, List[Any]]]:
+        if series_format == "records":
+            return series
+        if not series:
+            return {}
+        columns = {key: [item[key] for item in series] for key in series[0]}
+        if "date" in columns:
+            columns["date"] = [d.strftime('%Y-%m-%d') if isinstance(d, date) else d for d in columns["date"]]
+        return columns
@@ -0,0 +1,51 @@
+from datetime import date
+import numpy as np
+
+class SweepLine:
+    @staticmethod
+    def to_day_array(values) -> np.ndarray:
+        """
+        Converte uma sequência de datas (date, datetime ou None) para um array datetime64[D].
+        Valores None viram NaT.
+        """
+        return np.array(list(values), dtype='datetime64[D]')
+
+    @staticmethod
+    def day_range(start: date, end: date) -> np.ndarray:
+        """
+        Retorna todos os dias entre `start` e `end` (inclusive) como datetime64[D].
+        """
+        return np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1, dtype='datetime64[D]')
+
+    @staticmethod
+    def count_intervals(interval_starts: np.ndarray, interval_ends: np.ndarray, first_day: date, n_days: int, weights=None) -> np.ndarray:
+        """
+        Conta, para cada um dos `n_days` dias a partir de `first_day`, quantos intervalos
+        fechados [início, fim] contêm o dia (ou a soma de `weights` desses intervalos).
+
+        Usa um array de diferenças: +1 no início e -1 no dia seguinte ao fim de cada
+        intervalo, seguido de uma soma acumulada. O custo é O(intervalos + dias).
+        Intervalos com início ou fim NaT, vazios ou fora da janela são ignorados.
+        """
+        result_dtype = np.float64 if weights is not None else np.int64
+        if n_days <= 0:
+            return np.zeros(0, dtype=result_dtype)
+
+        origin = np.datetime64(first_day, 'D')
+        valid = ~(np.isnat(interval_starts) | np.isnat(interval_ends))
+        starts = (interval_starts[valid] - origin).astype(np.int64)
+        ends = (interval_ends[valid] - origin).astype(np.int64)
+
+        starts = np.maximum(starts, 0)
+        ends = np.minimum(ends, n_days - 1)
+        in_window = starts <= ends
+        starts = starts[in_window]
+        ends = ends[in_window]
+
+        if weights is not None:
+            w = np.asarray(weights, dtype=np.float64)[valid][in_window]
+            diff = np.bincount(starts, weights=w, minlength=n_days + 1) - np.bincount(ends + 1, weights=w, minlength=n_days + 1)
+        else:
+            diff = np.bincount(starts, minlength=n_days + 1) - np.bincount(ends + 1, minlength=n_days + 1)
+
+        return np.cumsum(diff[:n_days]).astype(result_dtype)
@@ -0,0 +1,22 @@
+import unicodedata
+from functools import lru_cache
+
+class TextUtils:
+    # Nome da collation registrada nas conexões SQLite que ordenam nomes (SnapshotStore)
+    COLLATION = "PT_BR_CI_AI"
+
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def sort_key(value: str) -> str:
+        """
+        Chave de ordenação sem distinção de maiúsculas e acentos, como a collation
+        *_CI_AI do SQL Server: 'Água' fica junto de 'Agua', e não depois de 'Z'.
+        """
+        decomposed = unicodedata.normalize("NFKD", value or "")
+        return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+    @staticmethod
+    def collate(left: str, right: str) -> int:
+        """Comparação no formato de sqlite3.Connection.create_collation, usando sort_key."""
+        left_key, right_key = TextUtils.sort_key(left), TextUtils.sort_key(right)
+        return (left_key > right_key) - (left_key < right_key)
@@ -0,0 +1,83 @@
+import pytest
+from conftest import RANGE_DAYS, SQL_ENGINE_LIMIT, window
+from app.infra.snapshot_store import SnapshotStore
+from app.services.comercial_service import ComercialService
+from app.services.default_rate_service import DefaultRateService
+from app.services.operations_service import OperationsService
+
+pytest.importorskip("pytest_benchmark")
+
+days_param = pytest.mark.parametrize("days", RANGE_DAYS, ids=lambda days: f"{days}d")
+
+
+@pytest.fixture
+def operations(local_db):
+    service = OperationsService(snapshot_store=SnapshotStore())
+    service.rollup_enabled = False
+    return service
+
+
+@pytest.fixture
+def operations_rollup(local_db):
+    service = OperationsService(snapshot_store=SnapshotStore())
+    if service.snapshot_store.get_watermark(service.ROLLUP_WATERMARK) is None:
+        service.rebuild_rollup()
+    return service
+
+
+@pytest.fixture
+def default_rate(local_db):
+    service = DefaultRateService(snapshot_store=SnapshotStore())
+    service.snapshot_enabled = False
+    return service
+
+
+@days_param
+def bench_operations_monthly_volume_sql(measure, operations, days):
+    measure(operations.get_monthly_volume_data, *window(days))
+
+
+@days_param
+def bench_operations_daily_volume_sql(measure, operations, days):
+    measure(operations.get_daily_volume_data, *window(days))
+
+
+@days_param
+def bench_operations_daily_volume_rollup(measure, operations_rollup, days):
+    measure(operations_rollup.get_daily_volume_data, *window(days))
+
+
+def bench_operations_rebuild_rollup(measure, operations):
+    measure(operations.rebuild_rollup)
+
+
+@days_param
+def bench_default_rate_daily_sweep(measure, default_rate, days):
+    measure(default_rate.get_daily_rate_series, *window(days), engine="sweep")
+
+
+@days_param
+def bench_default_rate_daily_sql(measure, default_rate, local_db, days):
+    if local_db * days > SQL_ENGINE_LIMIT:
+        pytest.skip(f"documentos x dias acima de BENCHMARK_SQL_ENGINE_LIMIT ({SQL_ENGINE_LIMIT})")
+    measure(default_rate.get_daily_rate_series, *window(days), engine="sql")
+
+
+@days_param
+def bench_default_rate_monthly(measure, default_rate, days):
+    measure(default_rate.get_monthly_rate_series, *window(days))
+
+
+def bench_default_rate_current(measure, default_rate):
+    measure(default_rate.get_current_default_rate)
+
+
+def bench_comercial_build_churn_snapshot(measure, local_db):
+    measure(ComercialService.build_churn_snapshot, SnapshotStore())
+
+
+@pytest.mark.parametrize("sort_column", ["HistoricalVolume", "ClientName", "InactiveDays"])
+def bench_comercial_client_page(measure, local_db, sort_column):
+    # Índice de churn carregado antes: mede a paginação, não a construção do snapshot
+    ComercialService.get_churn_index()
+    measure(ComercialService.get_client_data, page=3, items_per_page=25, sort_column=sort_column, sort_direction="DESC")
@@ -0,0 +1,117 @@
+"""
+Benchmarks da camada de services (pytest-benchmark) contra o banco local sintético
+(LocalSql + SyntheticData), em várias escalas e larguras de período.
+
+    pip install -r requirements-dev.txt
+    cd benchmarks
+    pytest                                   # mede e grava o resultado em benchmarks/.benchmarks/
+    pytest --benchmark-compare --benchmark-compare-fail=median:25%   # compara com o último
+
+Variáveis:
+- BENCHMARK_SCALES: quantidades de documentos, separadas por vírgula (padrão 10000,100000)
+- BENCHMARK_RANGE_DAYS: larguras dos períodos em dias, terminando hoje (padrão 30,180,365)
+- BENCHMARK_SEED: semente do gerador (padrão 42)
+- BENCHMARK_DATA_DIR: onde os bancos gerados são guardados e reaproveitados (padrão var/benchmarks)
+- BENCHMARK_SQL_ENGINE_LIMIT: maior documentos x dias medido na query diária de inadimplência
+  em SQL, cujo custo cresce com o produto dos dois (padrão 3000000)
+
+Além dos tempos, cada benchmark registra em extra_info o pico de memória alocada pelo Python
+(tracemalloc, inclui os arrays NumPy) e as queries, linhas e bytes lidos do banco em uma
+execução avulsa, fora das rodadas cronometradas.
+"""
+import os
+import tempfile
+import tracemalloc
+from datetime import date, timedelta
+import pytest
+from app.infra.cache import MemoryCacheBackend, ResultCache
+from app.infra.connection_pool import ConnectionPool
+from app.infra.db_connection import Database
+from app.infra.local_sql import ROOT_DIR
+from app.infra.synthetic_data import SyntheticData
+from app.services.comercial_service import ComercialService
+from app.utils.business_calendar import BusinessCalendar
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+SCALES = [int(value) for value in os.getenv("BENCHMARK_SCALES", "10000,100000").split(",")]
+RANGE_DAYS = [int(value) for value in os.getenv("BENCHMARK_RANGE_DAYS", "30,180,365").split(",")]
+SEED = int(os.getenv("BENCHMARK_SEED", "42"))
+DATA_DIR = os.getenv("BENCHMARK_DATA_DIR", os.path.join(ROOT_DIR, "var", "benchmarks"))
+SQL_ENGINE_LIMIT = int(os.getenv("BENCHMARK_SQL_ENGINE_LIMIT", "3000000"))
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Sem --benchmark-storage explícito, os resultados ficam em benchmarks/.benchmarks (no
+    # .gitignore) qualquer que seja o diretório de onde o pytest foi chamado
+    if config.getoption("benchmark_storage", None) == "file://./.benchmarks":
+        config.option.benchmark_storage = "file://" + os.path.join(BENCHMARKS_DIR, ".benchmarks")
+
+
+def scale_id(documents):
+    return f"{documents // 1000}k" if documents < 1_000_000 else f"{documents // 1_000_000}m"
+
+
+def window(days):
+    """(início, fim) de um período de `days` dias terminando hoje, como os filtros da tela."""
+    end = date.today()
+    return (end - timedelta(days=days - 1)).isoformat(), end.isoformat()
+
+
+@pytest.fixture(scope="session", params=SCALES, ids=scale_id)
+def local_db(request):
+    """
+    Banco sintético da escala, gerado uma vez por dia (as datas são relativas a hoje) e
+    reaproveitado entre execuções. Aponta o Database para ele, sem cache de resultados.
+    """
+    documents = request.param
+    path = os.path.join(DATA_DIR, f"livework-{scale_id(documents)}-{SEED}-{date.today().isoformat()}.sqlite3")
+    if not os.path.isfile(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        SyntheticData(documents=documents, seed=SEED).generate(path + ".tmp")
+        os.replace(path + ".tmp", path)
+
+    with tempfile.TemporaryDirectory() as snapshots, pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("DB_ENGINE", "sqlite")
+        monkeypatch.setenv("DB_LOCAL_PATH", path)
+        monkeypatch.setenv("DB_SLOW_QUERY_MS", "-1")
+        monkeypatch.setenv("SNAPSHOT_DB_PATH", os.path.join(snapshots, "snapshots.sqlite3"))
+        ConnectionPool.reset_instance()
+        BusinessCalendar._instance = None
+        ComercialService._index = None
+        ResultCache._instance = ResultCache(MemoryCacheBackend(), enabled=False)
+        try:
+            yield documents
+        finally:
+            ResultCache._instance = None
+            ComercialService._index = None
+            BusinessCalendar._instance = None
+            ConnectionPool.reset_instance()
+
+
+@pytest.fixture
+def measure(benchmark):
+    """
+    Executa `func` uma vez com tracemalloc e estatísticas de query para o extra_info e
+    depois cronometra as rodadas com o pytest-benchmark. Retorna o resultado da função.
+    A primeira chamada (conexão, tradução do SQL, calendário) fica fora das medições.
+    """
+    def run(func, *args, **kwargs):
+        func(*args, **kwargs)
+        Database.query_stats.reset()
+        tracemalloc.start()
+        try:
+            func(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        statements = Database.get_query_stats().values()
+        benchmark.extra_info.update({
+            "peak_memory_kb": round(peak / 1024, 1),
+            "queries": sum(entry["executions"] for entry in statements),
+            "rows": sum(entry["rows"] for entry in statements),
+            "bytes": sum(entry["bytes"] for entry in statements),
+        })
+        return benchmark(func, *args, **kwargs)
+
+    return run
@@ -0,0 +1,30 @@
+import glob
+import os
+import tempfile
+
+# Com mais de uma thread por worker o gunicorn usa workers gthread: enquanto uma requisição
+# aguarda o SQL Server, as demais threads do mesmo worker continuam atendendo.
+workers = int(os.getenv("GUNICORN_WORKERS", "1"))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+# Cada stream SSE (/dashboard/live) prende uma thread enquanto está aberto: essas threads
+# ficam reservadas além das que atendem as requisições comuns.
+if os.getenv("LIVE_UPDATES_ENABLED", "true").lower() == "true":
+    threads += int(os.getenv("LIVE_UPDATES_MAX_STREAMS", "16"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+
+# Métricas do Prometheus agregadas entre os workers (ver app/infra/metrics.py): cada processo
+# grava seus valores neste diretório, que é limpo quando o gunicorn sobe.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "dashboard-metrics"))
+
+def on_starting(server):
+    directory = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, "*.db")):
+        os.remove(path)
+
+def child_exit(server, worker):
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
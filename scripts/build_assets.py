@@ -0,0 +1,24 @@
+import os
+import sys
+from app.infra.assets import Assets
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app", "static")
+
+
+def main():
+    """Gera os bundles versionados de CSS/JS e o manifest em app/static/dist"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Gera os bundles de CSS/JS com hash do conteúdo no nome e o manifest')
+    parser.add_argument('--static-dir', default=STATIC_DIR, help='Diretório dos arquivos estáticos')
+    args = parser.parse_args()
+
+    manifest = Assets.build(args.static_dir)
+    for name, path in sorted(manifest.items()):
+        print(f"  {name} -> {path}")
+    print(f"✓ {len(manifest)} assets gerados em {os.path.join(args.static_dir, Assets.DIST_DIR)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,37 @@
+import os
+import sys
+import time
+from app.infra.local_sql import DEFAULT_LOCAL_DB_PATH, DEFAULT_SCHEMA_PATH
+from app.infra.synthetic_data import SyntheticData
+
+
+def main():
+    """Gera o banco local (SQLite) com dados sintéticos para rodar as queries sem o SQL Server"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Gera um banco SQLite com as tabelas do LiveWork usadas pelos services e dados sintéticos. '
+                    'Use com DB_ENGINE=sqlite e DB_LOCAL_PATH apontando para o arquivo gerado.'
+    )
+    parser.add_argument('--documents', type=int, default=100_000,
+                        help=f'Quantidade de documentos ({SyntheticData.MIN_DOCUMENTS} a {SyntheticData.MAX_DOCUMENTS})')
+    parser.add_argument('--seed', type=int, default=42, help='Semente do gerador (mesma semente, mesmos dados)')
+    parser.add_argument('--years', type=int, default=3, help='Anos de histórico até hoje')
+    parser.add_argument('--path', default=os.getenv("DB_LOCAL_PATH", DEFAULT_LOCAL_DB_PATH), help='Arquivo SQLite a ser (re)criado')
+    parser.add_argument('--schema', default=DEFAULT_SCHEMA_PATH, help='schema.json com a definição das tabelas')
+    args = parser.parse_args()
+
+    if not SyntheticData.MIN_DOCUMENTS <= args.documents <= SyntheticData.MAX_DOCUMENTS:
+        parser.error(f"--documents deve estar entre {SyntheticData.MIN_DOCUMENTS} e {SyntheticData.MAX_DOCUMENTS}")
+
+    started = time.perf_counter()
+    generator = SyntheticData(documents=args.documents, seed=args.seed, years=args.years)
+    counts = generator.generate(args.path, args.schema)
+    for table, count in counts.items():
+        print(f"  {table}: {count} linhas")
+    print(f"✓ Banco local gerado em {args.path} ({time.perf_counter() - started:.1f}s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,426 @@
+import asyncio
+import json
+import os
+import random
+import secrets
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import defaultdict
+from datetime import date, timedelta
+from urllib.parse import urlencode, urlsplit
+import numpy as np
+from werkzeug.security import generate_password_hash
+from app.infra.local_sql import ROOT_DIR
+from app.infra.synthetic_data import SyntheticData
+
+
+class HttpSession:
+    """
+    Cliente HTTP/1.1 mínimo sobre asyncio (sem dependências): uma conexão keep-alive por
+    usuário virtual, com os cookies de sessão guardados entre as requisições como no
+    navegador. O tempo medido inclui a leitura do corpo inteiro.
+    """
+
+    def __init__(self, base_url, timeout=30.0):
+        parts = urlsplit(base_url)
+        if parts.scheme != "http":
+            raise ValueError(f"Only http:// targets are supported: {base_url}")
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.cookies = {}
+        self._reader = None
+        self._writer = None
+
+    async def request(self, method, path, body=None, headers=None):
+        """(status, headers, corpo). Repete uma vez se a conexão reaproveitada foi fechada pelo servidor."""
+        reused = self._writer is not None
+        try:
+            return await asyncio.wait_for(self._send(method, path, body, headers), self.timeout)
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            await self.close()
+            # Só a conexão keep-alive encerrada pelo servidor antes da resposta é repetida
+            if not reused or isinstance(e, asyncio.IncompleteReadError) and e.partial:
+                raise
+        except BaseException:
+            await self.close()
+            raise
+        try:
+            return await asyncio.wait_for(self._send(method, path, body, headers), self.timeout)
+        except BaseException:
+            await self.close()
+            raise
+
+    async def close(self):
+        writer, self._reader, self._writer = self._writer, None, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    async def _send(self, method, path, body, headers):
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+        lines = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            "Accept: application/json",
+            "Accept-Encoding: br, gzip",
+            "Connection: keep-alive",
+        ]
+        if self.cookies:
+            lines.append("Cookie: " + "; ".join(f"{name}={value}" for name, value in self.cookies.items()))
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        if body is not None:
+            lines.append(f"Content-Length: {len(body)}")
+        self._writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (body or b""))
+        await self._writer.drain()
+
+        status_line = await self._reader.readuntil(b"\r\n")
+        status = int(status_line.split(b" ", 2)[1])
+        response_headers = {}
+        while True:
+            line = await self._reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            name, value = name.strip().lower(), value.strip()
+            if name == "set-cookie":
+                cookie_name, _, cookie_value = value.split(";", 1)[0].partition("=")
+                self.cookies[cookie_name.strip()] = cookie_value.strip()
+            response_headers[name] = value
+
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            content = await self._read_chunked()
+        elif "content-length" in response_headers:
+            content = await self._reader.readexactly(int(response_headers["content-length"]))
+        elif status in (204, 304) or method == "HEAD":
+            content = b""
+        else:
+            content = await self._reader.read()
+            response_headers["connection"] = "close"
+
+        if response_headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status, response_headers, content
+
+    async def _read_chunked(self):
+        chunks = []
+        while True:
+            size = int((await self._reader.readuntil(b"\r\n")).split(b";", 1)[0], 16)
+            if size == 0:
+                # Trailers (normalmente nenhum) até a linha vazia
+                while await self._reader.readuntil(b"\r\n") != b"\r\n":
+                    pass
+                return b"".join(chunks)
+            chunks.append(await self._reader.readexactly(size))
+            await self._reader.readexactly(2)
+
+
+
+class Scenario:
+    """
+    Mistura de requisições de um usuário do dashboard: pares (peso, gerador). Cada gerador
+    recebe o Random do usuário e devolve (nome do endpoint no relatório, caminho com a
+    query string). Mesma seed, mesma sequência de requisições.
+    """
+
+    RISK_LEVELS = ["Consumado", "Alto", "Médio", "Baixo", "-"]
+    SORT_COLUMNS = ["HistoricalVolume", "ClientName", "LastDate", "InactiveDays"]
+    # Larguras dos filtros de data: meses para as séries mensais, dias para as diárias
+    MONTHLY_WIDTHS = (3, 6, 12, 24)
+    DAILY_WIDTHS = (7, 30, 90, 180)
+
+    def __init__(self, mix=None, today=None):
+        self.today = today or date.today()
+        self.mix = mix or [
+            (30, self.operations_volume),
+            (25, self.default_rate_series),
+            (20, self.current_default_rate),
+            (25, self.client_data),
+        ]
+        self._weights = [weight for weight, _ in self.mix]
+
+    def next_request(self, rng):
+        generator = rng.choices([generator for _, generator in self.mix], weights=self._weights)[0]
+        return generator(rng)
+
+    def operations_volume(self, rng):
+        period_type, start, end = self._date_range(rng)
+        return "/operations/volume-data", self._path("/operations/volume-data", start_date=start, end_date=end, type=period_type)
+
+    def default_rate_series(self, rng):
+        period_type, start, end = self._date_range(rng)
+        return "/default-rate/data", self._path("/default-rate/data", start_date=start, end_date=end, type=period_type)
+
+    def current_default_rate(self, rng):
+        return "/default-rate/", "/default-rate/"
+
+    def client_data(self, rng):
+        params = {
+            "page": 1 if rng.random() < 0.6 else rng.randint(2, 20),
+            "items_per_page": rng.choice((10, 10, 25, 50)),
+            "sort_column": rng.choice(self.SORT_COLUMNS),
+            "sort_direction": rng.choice(("DESC", "ASC")),
+        }
+        if rng.random() < 0.3:
+            params["risk_filter"] = rng.choice(self.RISK_LEVELS)
+        return "/comercial/client-data", self._path("/comercial/client-data", **params)
+
+    def _date_range(self, rng):
+        # Períodos terminando hoje são os mais comuns; os demais terminam até 90 dias antes
+        end = self.today - timedelta(days=0 if rng.random() < 0.7 else rng.randint(1, 90))
+        if rng.random() < 0.6:
+            months = rng.choice(self.MONTHLY_WIDTHS)
+            year, month = divmod(end.year * 12 + end.month - 1 - (months - 1), 12)
+            return "monthly", date(year, month + 1, 1).isoformat(), end.isoformat()
+        return "daily", (end - timedelta(days=rng.choice(self.DAILY_WIDTHS) - 1)).isoformat(), end.isoformat()
+
+    @staticmethod
+    def _path(path, **params):
+        return f"{path}?{urlencode(params)}"
+
+
+
+class LoadTest:
+    """
+    Usuários virtuais concorrentes (tarefas asyncio): cada um faz login em /auth/login e
+    repete requisições do Scenario com um tempo de pensamento exponencial entre elas, até
+    o fim de `duration` segundos. Os usuários entram aos poucos ao longo de `ramp_up`.
+    """
+
+    def __init__(self, base_url, username, password, users=10, duration=60.0, ramp_up=10.0,
+                 think_time=1.0, seed=42, timeout=30.0, scenario=None):
+        self.base_url = base_url.rstrip("/")
+        self.username = username
+        self.password = password
+        self.users = users
+        self.duration = duration
+        self.ramp_up = ramp_up
+        self.think_time = think_time
+        self.seed = seed
+        self.timeout = timeout
+        self.scenario = scenario or Scenario()
+        self.report = Report()
+
+    def run(self):
+        return asyncio.run(self.run_async())
+
+    async def run_async(self):
+        self.report = Report()
+        started = time.perf_counter()
+        deadline = started + self.duration
+        await asyncio.gather(*(self._user(index, deadline) for index in range(self.users)))
+        self.report.elapsed = time.perf_counter() - started
+        return self.report
+
+    async def _user(self, index, deadline):
+        rng = random.Random(self.seed * 100_003 + index)
+        if self.users > 1 and self.ramp_up > 0:
+            await asyncio.sleep(min(self.ramp_up * index / (self.users - 1), max(deadline - time.perf_counter(), 0)))
+
+        session = HttpSession(self.base_url, self.timeout)
+        try:
+            body = json.dumps({"username": self.username, "password": self.password}).encode("utf-8")
+            if not await self._timed(session, "POST /auth/login", "POST", "/auth/login", body, {"Content-Type": "application/json"}):
+                return
+            while time.perf_counter() < deadline:
+                name, path = self.scenario.next_request(rng)
+                await self._timed(session, f"GET {name}", "GET", path)
+                if self.think_time > 0:
+                    await asyncio.sleep(min(rng.expovariate(1 / self.think_time), max(deadline - time.perf_counter(), 0)))
+        finally:
+            await session.close()
+
+    async def _timed(self, session, name, method, path, body=None, headers=None):
+        started = time.perf_counter()
+        try:
+            status, _, _ = await session.request(method, path, body, headers)
+        except asyncio.TimeoutError:
+            self.report.add(name, time.perf_counter() - started, "timeout")
+            return False
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            self.report.add(name, time.perf_counter() - started, type(e).__name__)
+            return False
+        ok = status < 400
+        self.report.add(name, time.perf_counter() - started, None if ok else str(status))
+        return ok
+
+
+
+class Report:
+    """Latências e erros por endpoint, com vazão, percentis e taxa de erro."""
+
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(lambda: defaultdict(int))
+        self.elapsed = 0.0
+
+    def add(self, name, seconds, error=None):
+        self.latencies[name].append(seconds)
+        if error is not None:
+            self.errors[name][error] += 1
+
+    def summary(self):
+        """{endpoint: {requests, errors, error_rate, rps, mean_ms, p50_ms, p95_ms, p99_ms, max_ms, error_kinds}}."""
+        summary = {}
+        names = sorted(self.latencies)
+        for name in names + (["Total"] if len(names) > 1 else []):
+            samples = np.array(self.latencies[name] if name != "Total" else [v for n in names for v in self.latencies[n]])
+            errors = self.errors[name] if name != "Total" else self._total_errors()
+            failed = sum(errors.values())
+            percentiles = np.percentile(samples, self.PERCENTILES) * 1000 if samples.size else [0.0] * len(self.PERCENTILES)
+            summary[name] = {
+                "requests": int(samples.size),
+                "errors": failed,
+                "error_rate": round(failed / samples.size, 4) if samples.size else 0.0,
+                "rps": round(samples.size / self.elapsed, 2) if self.elapsed else 0.0,
+                "mean_ms": round(float(samples.mean()) * 1000, 1) if samples.size else 0.0,
+                **{f"p{p}_ms": round(float(value), 1) for p, value in zip(self.PERCENTILES, percentiles)},
+                "max_ms": round(float(samples.max()) * 1000, 1) if samples.size else 0.0,
+                "error_kinds": dict(errors),
+            }
+        return summary
+
+    def format_table(self):
+        header = f"{'Endpoint':<32} {'Req':>7} {'Req/s':>8} {'Erros':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'máx ms':>9}"
+        lines = [header, "-" * len(header)]
+        for name, row in self.summary().items():
+            lines.append(
+                f"{name:<32} {row['requests']:>7} {row['rps']:>8.2f} {row['error_rate']:>7.1%} "
+                f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}"
+            )
+        return "\n".join(lines)
+
+    def _total_errors(self):
+        total = defaultdict(int)
+        for errors in self.errors.values():
+            for kind, count in errors.items():
+                total[kind] += count
+        return total
+
+
+def serve(port, workers, threads, db_path, documents, seed, username, password, log_dir, log):
+    """
+    Sobe o gunicorn (gunicorn.conf.py) com o banco local sintético, gerando-o se não existir,
+    com a saída em `log` (arquivo aberto pelo chamador). Retorna o processo, já respondendo
+    em /health.
+    """
+    if not os.path.isfile(db_path):
+        print(f"Gerando banco local com {documents} documentos em {db_path}...")
+        SyntheticData(documents=documents, seed=seed).generate(db_path)
+
+    env = dict(
+        os.environ,
+        DB_ENGINE="sqlite",
+        DB_LOCAL_PATH=db_path,
+        SNAPSHOT_DB_PATH=os.path.join(log_dir, "snapshots.sqlite3"),
+        APP_USER=username,
+        APP_PASSWORD_HASH=generate_password_hash(password),
+        SECRET_KEY=secrets.token_hex(16),
+        GUNICORN_WORKERS=str(workers),
+        GUNICORN_THREADS=str(threads),
+        DB_SLOW_QUERY_MS="-1",
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "-b", f"127.0.0.1:{port}", "wsgi:app"],
+        cwd=ROOT_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("gunicorn encerrou ao subir")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=2) as response:
+                if response.status == 200:
+                    return process
+        except OSError:
+            time.sleep(0.5)
+    process.terminate()
+    process.wait(timeout=30)
+    raise RuntimeError("gunicorn não respondeu em /health em 60s")
+
+
+def main():
+    """Teste de carga dos endpoints do dashboard com usuários virtuais concorrentes"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Faz login e repete uma mistura realista de requisições do dashboard, '
+                    'reportando vazão, latência p50/p95/p99 e taxa de erro por endpoint'
+    )
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='Aplicação alvo (ignorado com --serve)')
+    parser.add_argument('--username', default=os.getenv('LOADTEST_USER', 'loadtest'), help='Usuário do login')
+    parser.add_argument('--password', default=os.getenv('LOADTEST_PASSWORD'), help='Senha do login (padrão LOADTEST_PASSWORD)')
+    parser.add_argument('--users', type=int, default=10, help='Usuários virtuais concorrentes')
+    parser.add_argument('--duration', type=float, default=60, help='Duração do teste em segundos')
+    parser.add_argument('--ramp-up', type=float, default=10, help='Segundos até todos os usuários estarem ativos')
+    parser.add_argument('--think-time', type=float, default=1.0, help='Pausa média entre requisições de um usuário (0 = sem pausa)')
+    parser.add_argument('--timeout', type=float, default=30, help='Timeout de cada requisição em segundos')
+    parser.add_argument('--seed', type=int, default=42, help='Semente da mistura de requisições e do banco gerado')
+    parser.add_argument('--json', help='Grava o resumo por endpoint neste arquivo')
+
+    local = parser.add_argument_group('aplicação local com banco sintético (--serve)')
+    local.add_argument('--serve', action='store_true', help='Sobe o gunicorn com DB_ENGINE=sqlite e testa contra ele')
+    local.add_argument('--port', type=int, default=8765, help='Porta do gunicorn local')
+    local.add_argument('--workers', type=int, default=int(os.getenv('GUNICORN_WORKERS', '1')), help='Workers do gunicorn')
+    local.add_argument('--threads', type=int, default=int(os.getenv('GUNICORN_THREADS', '4')), help='Threads por worker')
+    local.add_argument('--documents', type=int, default=100_000, help='Documentos do banco sintético gerado')
+    local.add_argument('--db-path', help='Banco local (padrão var/loadtest/livework-<documentos>-<seed>.sqlite3)')
+    args = parser.parse_args()
+
+    if not args.serve and not args.password:
+        parser.error("--password (ou LOADTEST_PASSWORD) é obrigatório sem --serve")
+
+    process = None
+    log = None
+    try:
+        if args.serve:
+            args.password = args.password or secrets.token_urlsafe(12)
+            db_path = args.db_path or os.path.join(ROOT_DIR, "var", "loadtest", f"livework-{args.documents}-{args.seed}.sqlite3")
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+            # Snapshots e log da execução; o log fica para consulta depois do teste
+            work_dir = tempfile.mkdtemp(prefix="loadtest-")
+            log = open(os.path.join(work_dir, "gunicorn.log"), "wb")
+            process = serve(args.port, args.workers, args.threads, db_path, args.documents, args.seed,
+                            args.username, args.password, work_dir, log)
+            args.url = f"http://127.0.0.1:{args.port}"
+
+        print(f"Carga: {args.users} usuários, {args.duration:.0f}s, think time {args.think_time}s contra {args.url}")
+        report = LoadTest(
+            args.url, args.username, args.password, users=args.users, duration=args.duration,
+            ramp_up=args.ramp_up, think_time=args.think_time, seed=args.seed, timeout=args.timeout,
+        ).run()
+    except Exception as e:
+        print(f"❌ Erro no teste de carga: {e}")
+        return 1
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        if log is not None:
+            log.close()
+            print(f"Log do gunicorn: {log.name}")
+
+    print(report.format_table())
+    summary = report.summary()
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"elapsed": report.elapsed, "endpoints": summary}, f, indent=2, ensure_ascii=False)
+    errors = sum(row["errors"] for name, row in summary.items() if name != "Total")
+    print(f"✓ {sum(row['requests'] for name, row in summary.items() if name != 'Total')} requisições, {errors} erros em {report.elapsed:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
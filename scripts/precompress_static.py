@@ -0,0 +1,60 @@
+import gzip
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app", "static")
+EXTENSIONS = (".css", ".js", ".svg", ".html", ".json", ".txt")
+
+
+def precompress(path):
+    """Grava path.gz (e path.br, com o pacote brotli) quando a variante não existe ou está desatualizada"""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    written = []
+    variants = [(".gz", lambda d: gzip.compress(d, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append((".br", lambda d: brotli.compress(d, quality=11)))
+
+    for suffix, compress in variants:
+        target = path + suffix
+        if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+            continue
+        compressed = compress(data)
+        # Variantes que não economizam nada só atrasariam o cliente com a descompressão
+        if len(compressed) >= len(data):
+            continue
+        with open(target, "wb") as f:
+            f.write(compressed)
+        written.append(target)
+    return written
+
+
+def main():
+    """Gera as variantes .gz/.br pré-comprimidas dos arquivos estáticos"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Pré-comprime os arquivos de app/static (gzip e brotli)')
+    parser.add_argument('--static-dir', default=STATIC_DIR, help='Diretório dos arquivos estáticos')
+    args = parser.parse_args()
+
+    if brotli is None:
+        print("⚠️  Pacote brotli não instalado: apenas variantes .gz serão geradas")
+
+    total = 0
+    for root, _, files in os.walk(args.static_dir):
+        for name in files:
+            if name.endswith(EXTENSIONS):
+                total += len(precompress(os.path.join(root, name)))
+
+    print(f"✓ {total} arquivos pré-comprimidos gerados em {args.static_dir}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,39 @@
+import sys
+from dotenv import load_dotenv
+from app.services.default_rate_service import DefaultRateService
+
+
+def main():
+    """Popula ou atualiza o snapshot local da taxa de inadimplência diária"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Backfill e atualização incremental do snapshot diário de inadimplência'
+    )
+    parser.add_argument(
+        '--backfill-from',
+        help='Recalcula todo o período a partir desta data (yyyy-MM-dd) até ontem'
+    )
+    parser.add_argument(
+        '--backfill-to',
+        help='Data final do backfill (yyyy-MM-dd, padrão: ontem)'
+    )
+
+    args = parser.parse_args()
+    load_dotenv()
+
+    service = DefaultRateService()
+    try:
+        if args.backfill_from:
+            result = service.backfill_snapshot(args.backfill_from, args.backfill_to)
+            print(f"✓ Backfill concluído: {result['days']} dias ({result['start_date']} a {result['end_date']})")
+        else:
+            result = service.refresh_snapshot()
+            print(f"✓ Refresh concluído: {result['days']} dias recalculados ({result['start_date']} a {result['end_date']})")
+    except Exception as e:
+        print(f"❌ Erro ao atualizar o snapshot: {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+import sys
+from dotenv import load_dotenv
+from app.services.operations_service import OperationsService
+
+
+def main():
+    """Recria ou atualiza o agregado diário local do volume de operações"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Rebuild e atualização incremental do agregado diário de volume de operações'
+    )
+    parser.add_argument(
+        '--rebuild',
+        action='store_true',
+        help='Recria o agregado a partir de uma leitura completa de dbo.Operacao'
+    )
+
+    args = parser.parse_args()
+    load_dotenv()
+
+    service = OperationsService()
+    try:
+        if args.rebuild:
+            result = service.rebuild_rollup()
+            print(f"✓ Rebuild concluído: {result['operations']} operações")
+        else:
+            result = service.refresh_rollup()
+            print(f"✓ Refresh concluído: {result['operations']} operações alteradas, {len(result['days'])} dias afetados")
+    except Exception as e:
+        print(f"❌ Erro ao atualizar o agregado de operações: {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
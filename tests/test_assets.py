@@ -0,0 +1,97 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from flask import Flask, render_template_string
+from app.infra.assets import Assets
+
+class TestAssets(unittest.TestCase):
+    def setUp(self):
+        self.static_dir = tempfile.mkdtemp()
+        self._write("css/colors.css", ":root {\n    --primary: #BB5927;\n}\n")
+        self._write("css/page.css", "@import url('/static/css/colors.css');\n@import url('https://fonts.example.com/css');\n\n/* título */\nh1 {\n    color: var(--primary);\n}\n")
+        self._write("css/other.css", "@import url('./colors.css');\nh2 { margin: 0 }\n")
+        self._write("js/a.js", "const a = 1\n")
+        self._write("js/b.js", "// comentário\nfunction b() {\n    return a;\n}\n")
+        self._write("images/logo.png", "png")
+
+        self.bundles = patch.object(Assets, "BUNDLES", {"page.css": ["css/page.css", "css/other.css"], "page.js": ["js/a.js", "js/b.js"]})
+        self.fingerprinted = patch.object(Assets, "FINGERPRINTED", ["images/logo.png"])
+        self.bundles.start()
+        self.fingerprinted.start()
+
+    def tearDown(self):
+        self.fingerprinted.stop()
+        self.bundles.stop()
+        shutil.rmtree(self.static_dir)
+
+    def _write(self, name, content):
+        path = os.path.join(self.static_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def _read(self, name):
+        with open(os.path.join(self.static_dir, name), encoding="utf-8") as f:
+            return f.read()
+
+    def _app(self):
+        app = Flask(__name__, static_folder=self.static_dir, static_url_path="/static")
+        Assets(app)
+        return app
+
+    def test_build_writes_fingerprinted_bundles_and_manifest(self):
+        manifest = Assets.build(self.static_dir)
+
+        self.assertRegex(manifest["page.css"], r"^dist/page\.[0-9a-f]{12}\.css$")
+        self.assertRegex(manifest["images/logo.png"], r"^dist/images/logo\.[0-9a-f]{12}\.png$")
+        self.assertEqual(json.loads(self._read("dist/manifest.json")), manifest)
+
+        css = self._read(manifest["page.css"])
+        self.assertTrue(css.startswith("@import url('https://fonts.example.com/css');"))
+        self.assertEqual(css.count("--primary"), 2)  # colors.css entra uma vez; o outro é o var()
+        self.assertNotIn("título", css)
+        self.assertIn("h2{margin:0}", css)
+        self.assertIn("function b()", self._read(manifest["page.js"]))
+
+    def test_fingerprint_changes_with_content(self):
+        first = Assets.build(self.static_dir)
+        self._write("js/b.js", "function b() { return 2; }\n")
+        second = Assets.build(self.static_dir)
+
+        self.assertNotEqual(first["page.js"], second["page.js"])
+        self.assertEqual(first["page.css"], second["page.css"])
+        # O bundle da versão anterior não fica em dist/
+        self.assertFalse(os.path.exists(os.path.join(self.static_dir, first["page.js"])))
+        self.assertTrue(os.path.exists(os.path.join(self.static_dir, second["page.js"])))
+
+    def test_tags_use_manifest_when_available(self):
+        app = self._app()
+        with app.test_request_context():
+            tags = render_template_string("{{ asset_tags('page.css') }}{{ asset_tags('page.js', defer=True) }}")
+        self.assertIn('href="/static/css/page.css"', tags)
+        self.assertIn('src="/static/js/b.js" defer', tags)
+
+        manifest = Assets.build(self.static_dir)
+        app = self._app()
+        with app.test_request_context():
+            tags = render_template_string("{{ asset_tags('page.css') }} {{ asset_url('images/logo.png') }}")
+        self.assertEqual(tags, f'<link rel="stylesheet" href="/static/{manifest["page.css"]}"> /static/{manifest["images/logo.png"]}')
+
+    def test_fingerprinted_files_are_immutable(self):
+        manifest = Assets.build(self.static_dir)
+        client = self._app().test_client()
+
+        bundle = client.get(f"/static/{manifest['page.js']}")
+        source = client.get("/static/js/a.js")
+
+        self.assertIn("immutable", bundle.headers["Cache-Control"])
+        self.assertIn(f"max-age={Assets.IMMUTABLE_MAX_AGE}", bundle.headers["Cache-Control"])
+        self.assertNotIn("immutable", source.headers.get("Cache-Control", ""))
+        bundle.close()
+        source.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from app.infra.async_database import AsyncDatabase
+from app.infra.cache import MemoryCacheBackend, ResultCache
+from app.services.operations_service import OperationsService
+
+class FakeDatabase:
+    def execute_query(self, query, params=None):
+        time.sleep(0.2)
+        return [(query, threading.current_thread().name)]
+
+    def close_connection(self):
+        pass
+
+class TestAsyncDatabase(unittest.TestCase):
+    def setUp(self):
+        self.database = patch("app.infra.async_database.Database", FakeDatabase)
+        self.database.start()
+
+    def tearDown(self):
+        self.database.stop()
+
+    def test_queries_run_concurrently(self):
+        db = AsyncDatabase()
+        started = time.perf_counter()
+        results = AsyncDatabase.run_all({
+            "volume": db.execute_query("SELECT 1"),
+            "daily_rate": db.execute_query("SELECT 2"),
+            "current_rate": db.execute_query("SELECT 3"),
+        })
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual([r[0][0] for r in results.values()], ["SELECT 1", "SELECT 2", "SELECT 3"])
+        self.assertTrue(all(r[0][1].startswith("db-async") for r in results.values()))
+
+    def test_first_error_is_propagated(self):
+        async def failing():
+            raise RuntimeError("Erro ao executar a query")
+
+        with self.assertRaises(RuntimeError):
+            AsyncDatabase.run_all({"ok": AsyncDatabase().execute_query("SELECT 1"), "failing": failing()})
+
+    def test_service_async_variant_matches_sync(self):
+        ResultCache._instance = ResultCache(MemoryCacheBackend(), enabled=False)
+        service = OperationsService()
+        expected = {"data": []}
+        try:
+            with patch.object(OperationsService, "get_daily_volume_data", return_value=expected) as sync:
+                result = asyncio.run(service.get_daily_volume_data_async("2025-01-01", "2025-01-31"))
+        finally:
+            ResultCache._instance = None
+
+        self.assertIs(result, expected)
+        sync.assert_called_once_with("2025-01-01", "2025-01-31")
+
+if __name__ == "__main__":
+    unittest.main()
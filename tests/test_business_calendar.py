@@ -0,0 +1,77 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest.mock import patch
+import numpy as np
+from app.utils.business_calendar import BusinessCalendar
+
+class TestBusinessCalendar(unittest.TestCase):
+    def setUp(self):
+        self.calendar = BusinessCalendar(
+            national=["2025-11-20", "12-25"],
+            states={"SP": ["07-09"]},
+            cities={"SP/São Paulo": ["01-25"]},
+        )
+
+    def test_weekend_rolls_to_monday(self):
+        self.assertEqual(self.calendar.adjust_due_date(date(2025, 11, 1)), date(2025, 11, 3))
+        self.assertEqual(self.calendar.adjust_due_date(date(2025, 11, 2)), date(2025, 11, 3))
+        self.assertEqual(self.calendar.adjust_due_date(date(2025, 11, 4)), date(2025, 11, 4))
+
+    def test_national_and_recurring_holidays(self):
+        self.assertEqual(self.calendar.adjust_due_date(date(2025, 11, 20)), date(2025, 11, 21))
+        self.assertEqual(self.calendar.adjust_due_date(date(2030, 12, 25)), date(2030, 12, 26))
+
+    def test_state_and_city_variants(self):
+        self.assertEqual(self.calendar.adjust_due_date(date(2025, 7, 9)), date(2025, 7, 9))
+        self.assertEqual(self.calendar.adjust_due_date(date(2025, 7, 9), "SP"), date(2025, 7, 10))
+        self.assertEqual(self.calendar.adjust_due_date(date(2027, 1, 25), "SP", "São Paulo"), date(2027, 1, 26))
+        self.assertEqual(self.calendar.adjust_due_date(date(2027, 1, 25), "SP"), date(2027, 1, 25))
+
+    def test_vectorized_matches_scalar_and_keeps_nat(self):
+        days = np.array(["2025-11-01", "NaT", "2025-11-20", "2025-11-01"], dtype="datetime64[D]")
+
+        adjusted = self.calendar.adjust_due_dates(days)
+
+        self.assertEqual(adjusted[0], np.datetime64("2025-11-03"))
+        self.assertTrue(np.isnat(adjusted[1]))
+        self.assertEqual(adjusted[2], np.datetime64("2025-11-21"))
+        self.assertEqual(adjusted[3], adjusted[0])
+
+    def test_database_rows_are_grouped_by_type(self):
+        rows = [
+            (date(2000, 12, 25), 1, BusinessCalendar.NATIONAL, None, None),
+            (date(2000, 7, 9), 1, BusinessCalendar.STATE, "sp ", "Campinas"),
+            ("2027-01-25", 0, BusinessCalendar.CITY, "SP", "São Paulo"),
+            (date(2000, 4, 23), 1, BusinessCalendar.STATE, None, None),
+        ]
+        with patch.object(BusinessCalendar, "_load_from_database", return_value=rows), \
+                patch.dict(os.environ, {"HOLIDAYS_FROM_DATABASE": "true"}):
+            os.environ.pop("HOLIDAYS_FILE", None)
+            calendar = BusinessCalendar.load()
+
+        self.assertFalse(calendar.is_business_day(date(2025, 12, 25)))
+        self.assertTrue(calendar.is_business_day(date(2025, 7, 9)))
+        self.assertFalse(calendar.is_business_day(date(2025, 7, 9), "SP"))
+        self.assertTrue(calendar.is_business_day(date(2027, 1, 25), "SP"))
+        self.assertFalse(calendar.is_business_day(date(2027, 1, 25), "SP", "São Paulo"))
+        # Feriado estadual sem estado não vira nacional
+        self.assertTrue(calendar.is_business_day(date(2025, 4, 23)))
+
+    def test_load_merges_bundled_file(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump({"national": ["2026-02-16"], "states": {"RJ": ["04-23"]}}, f)
+        env = {"HOLIDAYS_FILE": f.name, "HOLIDAYS_FROM_DATABASE": "false"}
+        try:
+            with patch.dict(os.environ, env):
+                calendar = BusinessCalendar.load()
+        finally:
+            os.unlink(f.name)
+
+        self.assertFalse(calendar.is_business_day(date(2026, 2, 16)))
+        self.assertFalse(calendar.is_business_day(date(2026, 4, 23), "RJ"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import tempfile
+import time
+import unittest
+from datetime import date, datetime
+from unittest.mock import patch
+from app.infra.cache import MemoryCacheBackend, ResultCache, cached
+from app.infra.snapshot_store import SnapshotStore
+
+class ReportService:
+    def __init__(self):
+        self.calls = 0
+
+    @cached("report.series", ttl=60)
+    def get_series(self, start_date, end_date, engine=None):
+        self.calls += 1
+        return {"data": [start_date, end_date, engine]}
+
+class TestMemoryCacheBackend(unittest.TestCase):
+    def test_expired_entries_are_misses(self):
+        backend = MemoryCacheBackend()
+        backend.set("key", "value", ttl=0.01)
+        time.sleep(0.02)
+
+        self.assertEqual(backend.get("key"), (False, None))
+
+    def test_evicts_least_recently_used(self):
+        backend = MemoryCacheBackend(max_entries=2)
+        backend.set("a", 1, ttl=60)
+        backend.set("b", 2, ttl=60)
+        backend.get("a")
+        backend.set("c", 3, ttl=60)
+
+        self.assertEqual(backend.get("a"), (True, 1))
+        self.assertEqual(backend.get("b"), (False, None))
+        self.assertEqual(backend.evictions, 1)
+
+    def test_returns_copies_of_cached_values(self):
+        backend = MemoryCacheBackend()
+        value = {"data": [1, 2]}
+        backend.set("key", value, ttl=60)
+        value["data"].append(3)
+        backend.get("key")[1]["data"].append(4)
+
+        self.assertEqual(backend.get("key"), (True, {"data": [1, 2]}))
+
+    def test_generations_are_shared_through_the_snapshot_store(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "snapshots.sqlite3")
+            # Um worker do gunicorn e o processo do script de refresh
+            worker = ResultCache(MemoryCacheBackend(generation_store=SnapshotStore(path), generation_poll=0))
+            script = ResultCache(MemoryCacheBackend(generation_store=SnapshotStore(path), generation_poll=0))
+            before = worker.build_key("default_rate.daily", {"start_date": "2025-01-01"})
+
+            script.invalidate("default_rate")
+
+            self.assertNotEqual(worker.build_key("default_rate.daily", {"start_date": "2025-01-01"}), before)
+            self.assertEqual(worker.get_generation("default_rate"), "1")
+
+class TestCachedDecorator(unittest.TestCase):
+    def setUp(self):
+        ResultCache._instance = ResultCache(MemoryCacheBackend())
+        self.service = ReportService()
+
+    def tearDown(self):
+        ResultCache._instance = None
+
+    def test_normalized_parameters_share_entry(self):
+        self.service.get_series("2025-01-01", "2025-01-31")
+        self.service.get_series(start_date=" 2025-01-01", end_date="2025-01-31", engine=None)
+
+        self.assertEqual(self.service.calls, 1)
+        stats = ResultCache.get_instance().get_stats()
+        self.assertEqual(stats["namespaces"]["report.series"], {"hits": 1, "misses": 1})
+
+    def test_dates_share_entry_with_iso_strings(self):
+        self.service.get_series(date(2025, 1, 1), datetime(2025, 1, 31, 12, 30))
+        self.service.get_series("2025-01-01", "2025-01-31T12:30:00")
+
+        self.assertEqual(self.service.calls, 1)
+
+    def test_different_parameters_are_cached_separately(self):
+        self.service.get_series("2025-01-01", "2025-01-31")
+        self.service.get_series("2025-01-01", "2025-02-28")
+
+        self.assertEqual(self.service.calls, 2)
+
+    def test_invalidating_root_namespace_drops_entries(self):
+        self.service.get_series("2025-01-01", "2025-01-31")
+        ResultCache.get_instance().invalidate("report")
+        self.service.get_series("2025-01-01", "2025-01-31")
+
+        self.assertEqual(self.service.calls, 2)
+
+    def test_ttl_can_be_overridden_by_environment(self):
+        with patch.dict(os.environ, {"CACHE_TTL_REPORT_SERIES": "0"}):
+            self.service.get_series("2025-01-01", "2025-01-31")
+            time.sleep(0.01)
+            self.service.get_series("2025-01-01", "2025-01-31")
+
+        self.assertEqual(self.service.calls, 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+import os
+import random
+import tempfile
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+from app.infra.cache import MemoryCacheBackend, ResultCache
+from app.infra.snapshot_store import SnapshotStore
+from app.services.comercial_service import ComercialService
+
+class FakeDatabase:
+    rows = []
+    queries = 0
+
+    def execute_query(self, query, params=None):
+        FakeDatabase.queries += 1
+        return self.rows
+
+    def iter_query(self, query, params=None, batch_size=None):
+        return iter(self.execute_query(query, params))
+
+    def close_connection(self):
+        pass
+
+class TestChurnSnapshot(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        today = date.today()
+        FakeDatabase.queries = 0
+        FakeDatabase.rows = []
+        for i in range(57):
+            inactive = rng.randint(0, 200)
+            FakeDatabase.rows.append((
+                f"00000000-0000-0000-0000-{i:012d}",
+                f"Cliente {rng.choice('ABCDE')}{i}",
+                f"contato{i}@cliente.com.br; Gerente@FonteFM.com.br",
+                today - timedelta(days=inactive),
+                inactive,
+                Decimal(rng.randint(1, 50)) * 1000,
+                rng.choice(["MARIA SILVA", "JOAO", None]),
+            ))
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.env = patch.dict(os.environ, {"SNAPSHOT_DB_PATH": os.path.join(self.tmpdir.name, "snapshots.sqlite3")})
+        self.env.start()
+        self.database = patch("app.services.comercial_service.Database", FakeDatabase)
+        self.database.start()
+        ResultCache._instance = ResultCache(MemoryCacheBackend(), enabled=False)
+        ComercialService._index = None
+
+    def tearDown(self):
+        ResultCache._instance = None
+        ComercialService._index = None
+        self.database.stop()
+        self.env.stop()
+        self.tmpdir.cleanup()
+
+    def test_snapshot_is_built_once_and_rows_are_parsed(self):
+        first = ComercialService.get_client_data(page=1, items_per_page=5)
+        ComercialService.get_client_data(page=2, items_per_page=5)
+
+        self.assertEqual(FakeDatabase.queries, 1)
+        self.assertEqual(first["total_count"], 57)
+        row = first["data"][0]
+        self.assertEqual(len(row["email_list"]), 1)
+        self.assertTrue(row["email_list"][0].startswith("contato"))
+        self.assertIn(row["agent"], ("Maria silva", "Joao", ""))
+
+    def test_cursor_pages_match_offset_pages(self):
+        for sort_column in ComercialService.CURSOR_VALUE_INDEX:
+            for direction in ("ASC", "DESC"):
+                for risk in ("", "Consumado", "-"):
+                    offset_pages = []
+                    cursor_pages = []
+                    cursor = None
+                    for page in range(1, 8):
+                        kwargs = dict(items_per_page=8, sort_column=sort_column, sort_direction=direction, risk_filter=risk)
+                        offset_pages.extend(ComercialService.get_client_data(page=page, **kwargs)["data"])
+                        result = ComercialService.get_client_data(cursor=cursor, **kwargs)
+                        cursor_pages.extend(result["data"])
+                        cursor = result["next_cursor"]
+                        if cursor is None:
+                            break
+
+                    self.assertEqual(cursor_pages, offset_pages)
+                    if risk:
+                        self.assertTrue(all(r["risk"] == risk for r in cursor_pages))
+
+    def test_memory_index_matches_sqlite_pages(self):
+        combinations = [
+            dict(items_per_page=7, sort_column=column, sort_direction=direction, risk_filter=risk, page=page)
+            for column in ComercialService.CURSOR_VALUE_INDEX
+            for direction in ("ASC", "DESC")
+            for risk in ("", "Consumado", "Baixo", "-")
+            for page in (1, 2, 5, 10)
+        ]
+        with patch.dict(os.environ, {"CHURN_INDEX_ENABLED": "false"}):
+            expected = [ComercialService.get_client_data(**kwargs) for kwargs in combinations]
+
+        with patch("app.services.comercial_service.SnapshotStore.get_all_churn_clients",
+                   side_effect=SnapshotStore.get_all_churn_clients, autospec=True) as load:
+            actual = [ComercialService.get_client_data(**kwargs) for kwargs in combinations]
+
+        self.assertEqual(load.call_count, 1)
+        self.assertEqual(actual, expected)
+
+    def test_client_names_sort_ignoring_accents(self):
+        names = ["Zeta Ltda", "Ótica Central", "agua viva", "Água Branca", "Bela Vista", "Éden", "Ostra", "Ema"]
+        FakeDatabase.rows = [
+            (f"00000000-0000-0000-0000-{i:012d}", name, "", date.today(), 0, Decimal(1000), None)
+            for i, name in enumerate(names)
+        ]
+        expected = ["Água Branca", "agua viva", "Bela Vista", "Éden", "Ema", "Ostra", "Ótica Central", "Zeta Ltda"]
+        kwargs = dict(items_per_page=20, sort_column="ClientName", sort_direction="ASC")
+
+        with patch.dict(os.environ, {"CHURN_INDEX_ENABLED": "false"}):
+            sqlite_page = [r["client"] for r in ComercialService.get_client_data(**kwargs)["data"]]
+            cursor = ComercialService.get_client_data(items_per_page=3, sort_column="ClientName", sort_direction="ASC")["next_cursor"]
+            sqlite_after = [r["client"] for r in ComercialService.get_client_data(cursor=cursor, **dict(kwargs, items_per_page=3))["data"]]
+        index_page = [r["client"] for r in ComercialService.get_client_data(**kwargs)["data"]]
+        index_after = [r["client"] for r in ComercialService.get_client_data(cursor=cursor, **dict(kwargs, items_per_page=3))["data"]]
+
+        self.assertEqual(sqlite_page, expected)
+        self.assertEqual(index_page, expected)
+        self.assertEqual(sqlite_after, expected[3:6])
+        self.assertEqual(index_after, expected[3:6])
+
+    def test_building_snapshot_invalidates_cached_pages(self):
+        generation = ResultCache.get_instance().get_generation("comercial")
+        ComercialService.build_churn_snapshot()
+
+        self.assertNotEqual(ResultCache.get_instance().get_generation("comercial"), generation)
+
+    def test_memory_index_is_reused_until_expiry(self):
+        ComercialService.get_client_data(items_per_page=5)
+        with patch("app.services.comercial_service.SnapshotStore.connect", side_effect=AssertionError("disk access")):
+            result = ComercialService.get_client_data(page=3, items_per_page=5, sort_column="ClientName", risk_filter="Alto")
+        self.assertLessEqual(len(result["data"]), 5)
+
+    def test_cursor_must_match_sort(self):
+        cursor = ComercialService.get_client_data(items_per_page=5, sort_column="ClientName")["next_cursor"]
+
+        with self.assertRaises(ValueError):
+            ComercialService.get_client_data(items_per_page=5, sort_column="LastDate", cursor=cursor)
+
+if __name__ == "__main__":
+    unittest.main()
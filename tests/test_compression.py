@@ -0,0 +1,105 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from flask import Flask, jsonify
+from app import create_app
+from app.infra import compression
+from app.infra.cache import MemoryCacheBackend, ResultCache
+from app.infra.compression import Compression
+from app.services.operations_service import OperationsService
+
+class TestCompression(unittest.TestCase):
+    def setUp(self):
+        self.env = patch.dict(os.environ, {"SECRET_KEY": "test", "APP_USER": "admin", "COMPRESSION_MIN_SIZE": "1024"})
+        self.env.start()
+        ResultCache._instance = ResultCache(MemoryCacheBackend(), enabled=False)
+        self.client = create_app().test_client()
+        with self.client.session_transaction() as session:
+            session["_user_id"] = "admin"
+
+        rows = [{"date": f"2025-01-{day:02d}", "total_volume": day * 1000.5, "average_volume": 10.25} for day in range(1, 32)]
+        self.version = patch.object(OperationsService, "get_data_version", return_value="rollup:0001:0.0")
+        self.version.start()
+        self.service = patch.object(OperationsService, "get_daily_volume_data", return_value={"data": rows})
+        self.service.start()
+        self.url = "/operations/volume-data?start_date=2025-01-01&end_date=2025-01-31&type=daily"
+
+    def tearDown(self):
+        self.service.stop()
+        self.version.stop()
+        ResultCache._instance = None
+        self.env.stop()
+
+    def test_gzips_large_json(self):
+        plain = self.client.get(self.url, headers={"Accept-Encoding": "identity"})
+        response = self.client.get(self.url, headers={"Accept-Encoding": "gzip"})
+
+        self.assertNotIn("Content-Encoding", plain.headers)
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        self.assertEqual(gzip.decompress(response.data), plain.data)
+        self.assertLess(len(response.data), len(plain.data))
+
+    @unittest.skipIf(compression.brotli is None, "brotli não instalado")
+    def test_prefers_brotli(self):
+        plain = self.client.get(self.url, headers={"Accept-Encoding": "identity"})
+        response = self.client.get(self.url, headers={"Accept-Encoding": "gzip, br"})
+
+        self.assertEqual(response.headers["Content-Encoding"], "br")
+        self.assertEqual(compression.brotli.decompress(response.data), plain.data)
+
+    def test_conditional_request_matches_compressed_etag(self):
+        first = self.client.get(self.url, headers={"Accept-Encoding": "gzip"})
+        etag = first.headers["ETag"]
+        self.assertTrue(etag.endswith('-gzip"'))
+
+        second = self.client.get(self.url, headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.data, b"")
+
+    def test_skips_small_and_non_allowlisted_responses(self):
+        app = Flask(__name__)
+        Compression(app)
+        app.add_url_rule("/small", "small", lambda: jsonify({"ok": True}))
+        app.add_url_rule("/binary", "binary", lambda: app.response_class(b"x" * 4096, mimetype="application/octet-stream"))
+        client = app.test_client()
+
+        self.assertNotIn("Content-Encoding", client.get("/small", headers={"Accept-Encoding": "gzip"}).headers)
+        self.assertNotIn("Content-Encoding", client.get("/binary", headers={"Accept-Encoding": "gzip"}).headers)
+
+class TestPrecompressedStatic(unittest.TestCase):
+    def setUp(self):
+        self.static_dir = tempfile.mkdtemp()
+        with open(os.path.join(self.static_dir, "app.js"), "w") as f:
+            f.write("console.log('dashboard');\n" * 200)
+        with open(os.path.join(self.static_dir, "app.js.gz"), "wb") as f:
+            f.write(gzip.compress(b"precompressed"))
+
+        app = Flask(__name__, static_folder=self.static_dir, static_url_path="/static")
+        Compression(app)
+        self.client = app.test_client()
+
+    def tearDown(self):
+        shutil.rmtree(self.static_dir)
+
+    def test_serves_precompressed_variant(self):
+        response = self.client.get("/static/app.js", headers={"Accept-Encoding": "gzip"})
+
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertIn("javascript", response.headers["Content-Type"])
+        self.assertEqual(gzip.decompress(response.data), b"precompressed")
+        response.close()
+
+    def test_falls_back_to_original_file(self):
+        response = self.client.get("/static/app.js", headers={"Accept-Encoding": "identity"})
+
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertTrue(response.data.startswith(b"console.log"))
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        response.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import threading
+import time
+import unittest
+from app.infra.connection_pool import ConnectionPool, PoolTimeoutError
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, query):
+        if not self.connection.alive:
+            raise RuntimeError("connection lost")
+
+    def fetchall(self):
+        return [(1,)]
+
+    def close(self):
+        pass
+
+class FakeConnection:
+    def __init__(self):
+        self.alive = True
+        self.closed = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.created = []
+
+    def factory(self):
+        conn = FakeConnection()
+        self.created.append(conn)
+        return conn
+
+    def test_reuses_released_connection(self):
+        pool = ConnectionPool(self.factory, min_size=0, max_size=2)
+        first = pool.acquire()
+        pool.release(first)
+        second = pool.acquire()
+
+        self.assertIs(first, second)
+        self.assertEqual(len(self.created), 1)
+        self.assertEqual(pool.get_stats()["checkouts"], 2)
+
+    def test_blocks_until_timeout_when_exhausted(self):
+        pool = ConnectionPool(self.factory, min_size=0, max_size=1, checkout_timeout=0.05)
+        pool.acquire()
+
+        with self.assertRaises(PoolTimeoutError):
+            pool.acquire()
+        self.assertEqual(pool.get_stats()["checkout_timeouts"], 1)
+
+    def test_waiting_thread_receives_released_connection(self):
+        pool = ConnectionPool(self.factory, min_size=0, max_size=1, checkout_timeout=2)
+        conn = pool.acquire()
+        received = []
+
+        worker = threading.Thread(target=lambda: received.append(pool.acquire()))
+        worker.start()
+        time.sleep(0.05)
+        pool.release(conn)
+        worker.join(1)
+
+        self.assertEqual(received, [conn])
+
+    def test_unhealthy_connection_is_replaced_on_checkout(self):
+        pool = ConnectionPool(self.factory, min_size=0, max_size=1)
+        conn = pool.acquire()
+        pool.release(conn)
+        conn.alive = False
+
+        replacement = pool.acquire()
+
+        self.assertIsNot(conn, replacement)
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.get_stats()["health_check_failures"], 1)
+
+    def test_expired_connections_are_discarded(self):
+        pool = ConnectionPool(self.factory, min_size=0, max_size=2, idle_timeout=0.01, max_lifetime=0)
+        conn = pool.acquire()
+        pool.release(conn)
+        time.sleep(0.02)
+
+        replacement = pool.acquire()
+
+        self.assertIsNot(conn, replacement)
+        self.assertEqual(pool.get_stats()["expired_idle"], 1)
+
+    def test_expired_connections_are_closed_outside_the_lock(self):
+        pool = ConnectionPool(self.factory, min_size=0, max_size=2, idle_timeout=0.01, max_lifetime=0)
+        locked_on_close = []
+
+        def close(conn):
+            locked_on_close.append(pool._condition.acquire(blocking=False))
+            if locked_on_close[-1]:
+                pool._condition.release()
+
+        for acquire in (pool.acquire, pool.prune):
+            conn = pool.acquire()
+            pool.release(conn)
+            conn.close = lambda conn=conn: close(conn)
+            time.sleep(0.02)
+            acquire()
+
+        self.assertEqual(locked_on_close, [True, True])
+        self.assertEqual(pool.get_stats()["expired_idle"], 2)
+
+    def test_first_checkout_warms_pool_to_min_size(self):
+        pool = ConnectionPool(self.factory, min_size=3, max_size=5, idle_timeout=0.01)
+        self.assertEqual(self.created, [])
+
+        conn = pool.acquire()
+        stats = pool.get_stats()
+        self.assertEqual((stats["size"], stats["idle"], stats["in_use"]), (3, 2, 1))
+
+        # Conexões do mínimo não expiram por ociosidade
+        pool.release(conn)
+        time.sleep(0.02)
+        pool.prune()
+        self.assertEqual(pool.get_stats()["size"], 3)
+        self.assertEqual(len(self.created), 3)
+
+    def test_warm_up_failure_is_not_raised(self):
+        calls = []
+
+        def flaky_factory():
+            calls.append(1)
+            if len(calls) > 1:
+                raise RuntimeError("server unavailable")
+            return FakeConnection()
+
+        pool = ConnectionPool(flaky_factory, min_size=3, max_size=5)
+        conn = pool.acquire()
+
+        self.assertIsInstance(conn, FakeConnection)
+        self.assertEqual(pool.get_stats()["size"], 1)
+
+    def test_discarded_connection_frees_slot(self):
+        pool = ConnectionPool(self.factory, min_size=0, max_size=1, checkout_timeout=0.05)
+        conn = pool.acquire()
+        pool.release(conn, discard=True)
+
+        self.assertIsNot(pool.acquire(), conn)
+        self.assertEqual(pool.get_stats()["size"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
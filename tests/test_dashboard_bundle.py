@@ -0,0 +1,74 @@
+import os
+import unittest
+from unittest.mock import patch
+from app import create_app
+from app.infra.cache import MemoryCacheBackend, ResultCache
+from app.services.default_rate_service import DefaultRateService
+from app.services.operations_service import OperationsService
+
+class TestDashboardBundle(unittest.TestCase):
+    def setUp(self):
+        self.env = patch.dict(os.environ, {"SECRET_KEY": "test", "APP_USER": "admin"})
+        self.env.start()
+        ResultCache._instance = ResultCache(MemoryCacheBackend(), enabled=False)
+        self.client = create_app().test_client()
+        with self.client.session_transaction() as session:
+            session["_user_id"] = "admin"
+
+        self.patches = [
+            patch.object(OperationsService, "get_daily_volume_data", return_value={"data": [{"total_volume": 1.0}]}),
+            patch.object(OperationsService, "get_monthly_volume_data", return_value={"data": [{"total_volume": 30.0}]}),
+            patch.object(DefaultRateService, "get_current_default_rate", return_value={"open_documents": 10}),
+            patch.object(DefaultRateService, "get_daily_rate_series", return_value={"data": [{"rate": 2.5}]}),
+            patch.object(DefaultRateService, "get_monthly_rate_series", return_value={"data": [{"rate": 3.5}]}),
+            patch.object(OperationsService, "get_data_version", return_value="rollup:0001:0.0"),
+            patch.object(DefaultRateService, "get_data_version", return_value="2025-01-31:1:0.0"),
+        ]
+        self.mocks = [p.start() for p in self.patches]
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        ResultCache._instance = None
+        self.env.stop()
+
+    def test_returns_all_sections(self):
+        response = self.client.get("/dashboard/bundle?start_date=2025-01-01&end_date=2025-01-31&rate_type=monthly")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {
+            "volume": {"type": "daily", "data": [{"total_volume": 1.0}]},
+            "current_default_rate": {"open_documents": 10},
+            "default_rate_series": {"type": "monthly", "data": [{"rate": 3.5}]},
+        })
+        self.mocks[0].assert_called_once_with("2025-01-01", "2025-01-31")
+        self.mocks[4].assert_called_once_with("2025-01-01", "2025-01-31")
+
+    def test_only_requested_sections_are_computed(self):
+        response = self.client.get("/dashboard/bundle?sections=current_default_rate")
+
+        self.assertEqual(response.get_json(), {"current_default_rate": {"open_documents": 10}})
+        self.mocks[0].assert_not_called()
+        self.mocks[3].assert_not_called()
+
+    def test_columns_format(self):
+        response = self.client.get("/dashboard/bundle?start_date=2025-01-01&end_date=2025-01-31&sections=volume&format=columns")
+
+        self.assertEqual(response.get_json(), {"volume": {"type": "daily", "data": {"total_volume": [1.0]}}})
+
+    def test_validates_parameters(self):
+        self.assertEqual(self.client.get("/dashboard/bundle?sections=volume").status_code, 400)
+        self.assertEqual(self.client.get("/dashboard/bundle?sections=unknown").status_code, 400)
+        self.assertEqual(self.client.get("/dashboard/bundle?sections=current_default_rate&format=csv").status_code, 400)
+        self.assertEqual(self.client.get("/dashboard/bundle?start_date=2025-01-01&end_date=2025-01-31&volume_type=weekly").status_code, 400)
+
+    def test_service_error_returns_500(self):
+        self.mocks[2].side_effect = RuntimeError("Erro ao executar a query")
+
+        response = self.client.get("/dashboard/bundle?start_date=2025-01-01&end_date=2025-01-31")
+
+        self.assertEqual(response.status_code, 500)
+        self.assertIn("Erro ao executar a query", response.get_json()["error"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+import os
+import random
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+from app.infra.cache import MemoryCacheBackend, ResultCache
+from app.infra.columnar import Columnar
+from app.infra.snapshot_store import SnapshotStore
+from app.services.default_rate_service import DefaultRateService
+from app.utils.business_calendar import BusinessCalendar
+
+def next_weekday(day):
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return day
+
+def brute_force(documents, start, end, today):
+    """Avaliação dia a dia com as mesmas regras da query SQL diária."""
+    series = []
+    day = start
+    while day <= end:
+        overdue = 0
+        active = 0
+        for emission, due, payment, value in documents:
+            if emission <= day and (payment is None or payment > day):
+                active += 1
+            if due is None or due > end or (payment is not None and payment < start):
+                continue
+            overdue_end = payment - timedelta(days=1) if payment else today
+            if next_weekday(due) + timedelta(days=1) <= day <= overdue_end:
+                overdue += 1
+        if overdue and active:
+            series.append((day, overdue * 100.0 / active))
+        day += timedelta(days=1)
+    return series
+
+class FakeDatabase:
+    rows = []
+    watermark = b"\x00\x00\x00\x00\x00\x00\x10\x00"
+    changed = (None, None, None, None)
+
+    def execute_query(self, query, params=None):
+        if "MIN_ACTIVE_ROWVERSION" in query:
+            return [(self.watermark,)]
+        if "TimeStamp" in query:
+            return [self.changed]
+        return self.rows
+
+    def fetch_columns(self, query, params=None, dtypes=None, batch_size=None):
+        return Columnar.from_rows(self.execute_query(query, params), list(dtypes), dtypes)
+
+    def close_connection(self):
+        pass
+
+class TestDefaultRateSweep(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(42)
+        base = date.today() - timedelta(days=200)
+        self.documents = []
+        for _ in range(300):
+            emission = base + timedelta(days=rng.randint(0, 150))
+            due = emission + timedelta(days=rng.randint(5, 60)) if rng.random() > 0.05 else None
+            payment = emission + timedelta(days=rng.randint(1, 120)) if rng.random() > 0.3 else None
+            self.documents.append((emission, due, payment, rng.randint(100, 10000)))
+
+        FakeDatabase.rows = list(self.documents)
+        FakeDatabase.changed = (None, None, None, None)
+        BusinessCalendar._instance = BusinessCalendar()
+        ResultCache._instance = ResultCache(MemoryCacheBackend(), enabled=False)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = SnapshotStore(os.path.join(self.tmpdir.name, "snapshots.sqlite3"))
+        self.service = DefaultRateService(snapshot_store=self.store)
+
+    def tearDown(self):
+        BusinessCalendar._instance = None
+        ResultCache._instance = None
+        self.tmpdir.cleanup()
+
+    def test_sweep_matches_day_by_day_evaluation(self):
+        start = date.today() - timedelta(days=120)
+        end = date.today() + timedelta(days=5)
+
+        with patch("app.services.default_rate_service.Database", FakeDatabase):
+            result = self.service.get_daily_rate_series(
+                start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'), engine="sweep"
+            )
+
+        expected = brute_force(self.documents, start, end, date.today())
+        actual = [(item["date"].date(), item["rate"]) for item in result["data"]]
+        self.assertEqual([d for d, _ in actual], [d for d, _ in expected])
+        for (_, actual_rate), (_, expected_rate) in zip(actual, expected):
+            self.assertAlmostEqual(actual_rate, expected_rate, places=9)
+
+    def test_monthly_series_rolls_up_daily_rates(self):
+        start = date.today() - timedelta(days=120)
+        end = date.today()
+        first_of_month = start.replace(day=1)
+
+        with patch("app.services.default_rate_service.Database", FakeDatabase):
+            monthly = self.service.get_monthly_rate_series(start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'))
+            daily = self.service.compute_daily_aggregates(first_of_month, end)
+
+        rates = {}
+        for day, overdue, active in zip(daily["dates"].tolist(), daily["overdue_documents"].tolist(), daily["active_documents"].tolist()):
+            rates.setdefault((day.year, day.month), []).append(overdue * 100.0 / active if active else 0.0)
+
+        self.assertEqual([(item["date"].year, item["date"].month) for item in monthly["data"]], list(rates))
+        for item, month_rates in zip(monthly["data"], rates.values()):
+            self.assertAlmostEqual(item["rate"], month_rates[-1], places=9)
+            self.assertAlmostEqual(item["average_rate"], sum(month_rates) / len(month_rates), places=9)
+
+    def test_current_rate_shifts_holidays_and_keeps_empty_contract(self):
+        yesterday = date.today() - timedelta(days=1)
+        BusinessCalendar._instance = BusinessCalendar(national=[yesterday.strftime('%Y-%m-%d')])
+        # (vencimento, documentos em aberto, valor): vencido ontem em feriado ainda não está atrasado
+        rows = [(yesterday, 2, Decimal("300.00")), (date.today() - timedelta(days=30), 1, Decimal("100.00"))]
+
+        with patch("app.services.default_rate_service.Database", FakeDatabase), \
+                patch.object(FakeDatabase, "rows", rows):
+            current = self.service.get_current_default_rate()
+        with patch("app.services.default_rate_service.Database", FakeDatabase), \
+                patch.object(FakeDatabase, "rows", []):
+            empty = self.service.get_current_default_rate()
+
+        self.assertEqual((current["overdue_documents"], current["open_documents"]), (1, 3))
+        self.assertEqual((current["overdue_value"], current["open_value"]), (100.0, 400.0))
+        self.assertEqual(empty, {})
+
+    def test_default_engine_does_not_call_the_udf(self):
+        start = date.today() - timedelta(days=30)
+        with patch("app.services.default_rate_service.Database", FakeDatabase), \
+                patch.object(FakeDatabase, "fetch_columns", autospec=True, side_effect=FakeDatabase.fetch_columns) as fetch, \
+                patch.dict(os.environ):
+            os.environ.pop("DEFAULT_RATE_ENGINE", None)
+            self.service.get_daily_rate_series(start.strftime('%Y-%m-%d'), date.today().strftime('%Y-%m-%d'))
+
+        self.assertTrue(fetch.called)
+        self.assertFalse(any("fn_DataVencimentoAjustada" in call.args[1] for call in fetch.call_args_list))
+
+    def test_rejects_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            self.service.get_daily_rate_series("2025-01-01", "2025-01-31", engine="cube")
+
+    def test_snapshot_backfill_and_refresh(self):
+        start = date.today() - timedelta(days=120)
+        end = date.today()
+        fmt = '%Y-%m-%d'
+
+        with patch("app.services.default_rate_service.Database", FakeDatabase):
+            computed = self.service.compute_daily_aggregates(start, end)
+            result = self.service.backfill_snapshot(start.strftime(fmt))
+            self.assertEqual(result["days"], 120)
+            self.assertEqual(self.store.get_watermark("default_rate_daily"), FakeDatabase.watermark.hex())
+
+            combined = self.service.get_daily_aggregates(
+                datetime.combine(start, datetime.min.time()), datetime.combine(end, datetime.min.time())
+            )
+            for key in computed:
+                self.assertEqual(combined[key].tolist(), computed[key].tolist())
+
+            # Um documento pago há 10 dias muda a série apenas a partir da sua emissão
+            emission = date.today() - timedelta(days=30)
+            FakeDatabase.rows.append((emission, emission, date.today() - timedelta(days=10), 500))
+            FakeDatabase.changed = (emission, emission, emission, date.today() - timedelta(days=10))
+            refreshed = self.service.refresh_snapshot()
+            self.assertEqual(refreshed["start_date"], emission.strftime(fmt))
+
+            expected = self.service.compute_daily_aggregates(start, end - timedelta(days=1))
+            stored = self.store.get_default_rate_days(start.strftime(fmt), end.strftime(fmt))
+            self.assertEqual([r[2] for r in stored], expected["active_documents"].tolist())
+
+    def test_snapshot_with_gap_reads_only_leading_run(self):
+        start = date.today() - timedelta(days=60)
+        end = date.today()
+        fmt = '%Y-%m-%d'
+
+        with patch("app.services.default_rate_service.Database", FakeDatabase):
+            computed = self.service.compute_daily_aggregates(start, end)
+            self.service.backfill_snapshot(start.strftime(fmt))
+            # Lacuna gravada por uma versão anterior do backfill, que aceitava qualquer período
+            hole = (start + timedelta(days=20)).strftime(fmt)
+            with self.store.connect() as conn:
+                conn.execute("DELETE FROM default_rate_daily WHERE analysis_date BETWEEN ? AND ?",
+                             (hole, (start + timedelta(days=25)).strftime(fmt)))
+
+            combined = self.service.get_daily_aggregates(
+                datetime.combine(start, datetime.min.time()), datetime.combine(end, datetime.min.time())
+            )
+            for key in computed:
+                self.assertEqual(combined[key].tolist(), computed[key].tolist())
+
+    def test_backfill_rejects_gap_next_to_snapshot(self):
+        fmt = '%Y-%m-%d'
+        with patch("app.services.default_rate_service.Database", FakeDatabase):
+            self.service.backfill_snapshot((date.today() - timedelta(days=30)).strftime(fmt))
+            with self.assertRaises(ValueError):
+                self.service.backfill_snapshot(
+                    (date.today() - timedelta(days=90)).strftime(fmt),
+                    (date.today() - timedelta(days=60)).strftime(fmt),
+                )
+            # Encostado no início do snapshot é aceito
+            result = self.service.backfill_snapshot(
+                (date.today() - timedelta(days=60)).strftime(fmt),
+                (date.today() - timedelta(days=31)).strftime(fmt),
+            )
+            self.assertEqual(result["days"], 30)
+            self.assertEqual(self.store.get_default_rate_bounds()[0], (date.today() - timedelta(days=60)).strftime(fmt))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import os
+import unittest
+from unittest.mock import patch
+from app import create_app
+from app.infra.cache import MemoryCacheBackend, ResultCache
+
+class TestHealthcheck(unittest.TestCase):
+    DETAIL_ENDPOINTS = ["/health/db-pool", "/health/cache", "/health/queries", "/health/live-updates"]
+
+    def setUp(self):
+        self.env = patch.dict(os.environ, {"SECRET_KEY": "test", "APP_USER": "admin"})
+        self.env.start()
+        ResultCache._instance = ResultCache(MemoryCacheBackend())
+        self.client = create_app().test_client()
+
+    def tearDown(self):
+        ResultCache._instance = None
+        self.env.stop()
+
+    def test_only_health_is_public(self):
+        self.assertEqual(self.client.get("/health").status_code, 200)
+        for endpoint in self.DETAIL_ENDPOINTS:
+            self.assertEqual(self.client.get(endpoint).status_code, 302, endpoint)
+
+    def test_details_are_available_after_login(self):
+        with self.client.session_transaction() as session:
+            session["_user_id"] = "admin"
+        for endpoint in self.DETAIL_ENDPOINTS:
+            self.assertEqual(self.client.get(endpoint).status_code, 200, endpoint)
+
+if __name__ == "__main__":
+    unittest.main()
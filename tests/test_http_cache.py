@@ -0,0 +1,63 @@
+import os
+import unittest
+from unittest.mock import patch
+from app import create_app
+from app.infra.cache import MemoryCacheBackend, ResultCache
+from app.services.operations_service import OperationsService
+
+class TestHttpCache(unittest.TestCase):
+    def setUp(self):
+        self.env = patch.dict(os.environ, {"SECRET_KEY": "test", "APP_USER": "admin", "HTTP_CACHE_MAX_AGE": "120"})
+        self.env.start()
+        ResultCache._instance = ResultCache(MemoryCacheBackend(), enabled=False)
+        self.client = create_app().test_client()
+        with self.client.session_transaction() as session:
+            session["_user_id"] = "admin"
+
+        self.version = patch.object(OperationsService, "get_data_version", return_value="rollup:0001:0.0")
+        self.version.start()
+        self.service = patch.object(OperationsService, "get_daily_volume_data", return_value={"data": [{"total_volume": 1.0}]})
+        self.compute = self.service.start()
+        self.url = "/operations/volume-data?start_date=2025-01-01&end_date=2025-01-31&type=daily"
+
+    def tearDown(self):
+        self.service.stop()
+        self.version.stop()
+        ResultCache._instance = None
+        self.env.stop()
+
+    def test_emits_etag_and_cache_control(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["ETag"])
+        self.assertEqual(response.headers["Cache-Control"], "private, max-age=120")
+
+    def test_if_none_match_returns_304_without_running_the_service(self):
+        etag = self.client.get(self.url).headers["ETag"]
+
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+        self.assertEqual(response.headers["ETag"], etag)
+        self.assertEqual(self.compute.call_count, 1)
+
+    def test_etag_changes_with_data_version_and_parameters(self):
+        etag = self.client.get(self.url).headers["ETag"]
+        other_range = self.client.get(self.url.replace("2025-01-31", "2025-02-28")).headers["ETag"]
+        OperationsService.get_data_version.return_value = "rollup:0002:0.0"
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+
+        self.assertNotEqual(etag, other_range)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_errors_are_not_cached(self):
+        response = self.client.get("/operations/volume-data?type=daily")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn("ETag", response.headers)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import json
+import os
+import unittest
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import patch
+import numpy as np
+from flask import Flask
+from app.infra import json_provider
+from app.infra.json_provider import FastJSONProvider
+from app.utils.series_format import SeriesFormat
+
+BRAZIL = timezone(timedelta(hours=-3))
+
+class TestJSONProvider(unittest.TestCase):
+    payload = {
+        "data": [
+            {"date": datetime(2025, 1, 15, tzinfo=BRAZIL), "total_volume": 1500.12, "average_ticket": Decimal("750.0625")},
+            {"date": datetime(2025, 2, 15, tzinfo=BRAZIL), "total_volume": np.float64(20.5), "average_ticket": np.int64(3)},
+        ],
+        "days": np.array(["2025-01-02", "2025-01-03"], dtype="datetime64[D]"),
+        "as_of": date(2025, 3, 1),
+        "client": "Associação",
+    }
+
+    def build_provider(self, backend):
+        with patch.dict(os.environ, {"JSON_BACKEND": backend}):
+            return FastJSONProvider(Flask(__name__))
+
+    def test_backends_produce_the_same_output(self):
+        outputs = {backend: self.build_provider(backend).dumps(self.payload) for backend in ("orjson", "stdlib")}
+
+        self.assertEqual(outputs["orjson"], outputs["stdlib"])
+        decoded = json.loads(outputs["stdlib"])
+        self.assertEqual(decoded["data"][0]["date"], "2025-01-15T00:00:00-03:00")
+        self.assertEqual(decoded["data"][0]["average_ticket"], 750.0625)
+        self.assertEqual(decoded["days"], ["2025-01-02", "2025-01-03"])
+        self.assertEqual(decoded["client"], "Associação")
+
+    @unittest.skipIf(json_provider.orjson is None, "orjson não instalado")
+    def test_uses_orjson_when_installed(self):
+        self.assertTrue(self.build_provider("orjson").use_orjson)
+        self.assertFalse(self.build_provider("stdlib").use_orjson)
+
+    def test_columns_format(self):
+        series = [
+            {"date": datetime(2025, 1, 2, tzinfo=BRAZIL), "rate": 1.5},
+            {"date": datetime(2025, 1, 3, tzinfo=BRAZIL), "rate": 2.0},
+        ]
+
+        self.assertIs(SeriesFormat.apply(series, SeriesFormat.parse(None)), series)
+        self.assertEqual(SeriesFormat.apply(series, SeriesFormat.parse("columns")), {
+            "date": ["2025-01-02", "2025-01-03"],
+            "rate": [1.5, 2.0],
+        })
+        with self.assertRaises(ValueError):
+            SeriesFormat.parse("csv")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import json
+import os
+import unittest
+from unittest.mock import patch
+from app import create_app
+from app.infra.cache import MemoryCacheBackend, ResultCache
+from app.infra.live_updates import LiveUpdates
+from app.services.comercial_service import ComercialService
+from app.services.default_rate_service import DefaultRateService
+from app.services.operations_service import OperationsService
+
+class TestLiveUpdates(unittest.TestCase):
+    def setUp(self):
+        self.calls = 0
+        self.values = [{"rate": 1.5}]
+
+    def producer(self):
+        self.calls += 1
+        return self.values[-1]
+
+    def live(self, **kwargs):
+        options = {"interval": 0.01, "max_streams": 4, "stream_ttl": 5, "heartbeat": 0.05}
+        options.update(kwargs)
+        return LiveUpdates(self.producer, lambda obj: json.dumps(obj, sort_keys=True), **options)
+
+    def test_publish_only_when_payload_changes(self):
+        live = self.live(interval=60)
+        subscriber = live.subscribe()
+        # Primeiro evento vem da thread de publicação; depois dele ela só roda de novo em 60s
+        self.assertIn('data: {"rate": 1.5}', subscriber.get(timeout=2)[1])
+
+        self.assertTrue(live.publish({"rate": 1.0}))
+        self.assertFalse(live.publish({"rate": 1.0}))
+        self.assertTrue(live.publish({"rate": 2.0}))
+
+        events = [subscriber.get_nowait()[1] for _ in range(subscriber.qsize())]
+        self.assertIn('data: {"rate": 1.0}', events[0])
+        self.assertIn('data: {"rate": 2.0}', events[-1])
+        self.assertEqual(sum('"rate": 1.0' in e for e in events), 1)
+        live.unsubscribe(subscriber)
+
+    def test_subscribers_share_one_computation(self):
+        live = self.live(interval=60)
+        first = live.subscribe()
+        second = live.subscribe()
+
+        first_event = first.get(timeout=2)
+        second_event = second.get(timeout=2)
+
+        self.assertEqual(first_event, second_event)
+        self.assertEqual(self.calls, 1)
+        live.unsubscribe(first)
+        live.unsubscribe(second)
+
+    def test_stream_skips_event_already_seen(self):
+        live = self.live(stream_ttl=0.2)
+        live.publish({"rate": 1.0})
+        event_id = live.get_stats()["last_event_id"]
+        subscriber = live.subscribe()
+        self.values.append({"rate": 1.0})
+
+        body = "".join(live.stream(subscriber, last_event_id=event_id))
+
+        self.assertTrue(body.startswith("retry: "))
+        self.assertNotIn("event: kpis", body)
+        self.assertIn(": keepalive", body)
+        self.assertEqual(live.get_stats()["streams"], 0)
+
+    def test_limits_streams(self):
+        live = self.live(max_streams=1, interval=60)
+        subscriber = live.subscribe()
+
+        self.assertIsNone(live.subscribe())
+        live.unsubscribe(subscriber)
+        self.assertIsNotNone(live.subscribe())
+
+class TestLiveEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.env = patch.dict(os.environ, {"SECRET_KEY": "test", "APP_USER": "admin", "LIVE_UPDATES_STREAM_TTL": "0.3"})
+        self.env.start()
+        ResultCache._instance = ResultCache(MemoryCacheBackend(), enabled=False)
+        self.client = create_app().test_client()
+        with self.client.session_transaction() as session:
+            session["_user_id"] = "admin"
+
+        self.patches = [
+            patch.object(OperationsService, "get_daily_volume_data", return_value={"data": [{"date": "2025-01-31", "total_volume": 1.0}]}),
+            patch.object(DefaultRateService, "get_current_default_rate", return_value={"open_documents": 10}),
+            patch.object(ComercialService, "get_risk_counts", return_value={"Alto": 2}),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        ResultCache._instance = None
+        self.env.stop()
+
+    def test_streams_kpis(self):
+        response = self.client.get("/dashboard/live")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "text/event-stream")
+        body = response.get_data(as_text=True)
+        self.assertIn("event: kpis", body)
+        data = json.loads(next(line[len("data: "):] for line in body.splitlines() if line.startswith("data: ")))
+        self.assertEqual(data, {
+            "churn_counts": {"Alto": 2},
+            "current_default_rate": {"open_documents": 10},
+            "today_volume": {"date": "2025-01-31", "total_volume": 1.0},
+        })
+
+    def test_stream_limit_asks_client_to_retry_later(self):
+        with patch.dict(os.environ, {"LIVE_UPDATES_MAX_STREAMS": "0"}):
+            response = self.client.get("/dashboard/live")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "text/event-stream")
+        body = response.get_data(as_text=True)
+        self.assertTrue(body.startswith("retry: 60000\n"))
+        self.assertNotIn("event: kpis", body)
+
+    def test_disabled(self):
+        with patch.dict(os.environ, {"LIVE_UPDATES_ENABLED": "false"}):
+            self.assertEqual(self.client.get("/dashboard/live").status_code, 204)
+
+if __name__ == "__main__":
+    unittest.main()
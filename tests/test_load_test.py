@@ -0,0 +1,106 @@
+import random
+import threading
+import unittest
+from datetime import date
+from urllib.parse import parse_qs, urlsplit
+from flask import Flask, jsonify, request
+from werkzeug.serving import make_server
+from scripts.load_test import LoadTest, Report, Scenario
+
+class TestScenario(unittest.TestCase):
+    def test_same_seed_same_requests(self):
+        scenario = Scenario(today=date(2025, 3, 14))
+        first_rng, second_rng = random.Random(7), random.Random(7)
+        first = [scenario.next_request(first_rng) for _ in range(50)]
+        second = [scenario.next_request(second_rng) for _ in range(50)]
+        self.assertEqual(first, second)
+        self.assertEqual({name for name, _ in first}, {"/operations/volume-data", "/default-rate/data", "/default-rate/", "/comercial/client-data"})
+
+    def test_date_ranges_are_valid_filters(self):
+        scenario = Scenario(today=date(2025, 3, 14))
+        rng = random.Random(3)
+        for _ in range(200):
+            _, path = scenario.operations_volume(rng)
+            params = {key: values[0] for key, values in parse_qs(urlsplit(path).query).items()}
+            start, end = date.fromisoformat(params["start_date"]), date.fromisoformat(params["end_date"])
+            self.assertLessEqual(start, end)
+            self.assertLessEqual(end, date(2025, 3, 14))
+            if params["type"] == "monthly":
+                self.assertEqual(start.day, 1)
+
+
+class TestReport(unittest.TestCase):
+    def test_percentiles_throughput_and_error_rate(self):
+        report = Report()
+        for ms in range(1, 101):
+            report.add("GET /a", ms / 1000, "500" if ms % 10 == 0 else None)
+        report.add("GET /b", 0.5, "timeout")
+        report.elapsed = 10.0
+
+        summary = report.summary()
+        self.assertEqual(summary["GET /a"]["requests"], 100)
+        self.assertEqual(summary["GET /a"]["error_rate"], 0.1)
+        self.assertEqual(summary["GET /a"]["rps"], 10.0)
+        self.assertAlmostEqual(summary["GET /a"]["p50_ms"], 50.5, places=1)
+        self.assertAlmostEqual(summary["GET /a"]["p99_ms"], 99.0, places=0)
+        self.assertEqual(summary["Total"]["requests"], 101)
+        self.assertEqual(summary["Total"]["error_kinds"], {"500": 10, "timeout": 1})
+        self.assertIn("GET /b", report.format_table())
+
+
+class TestLoadTest(unittest.TestCase):
+    def setUp(self):
+        app = Flask(__name__)
+        app.secret_key = "test"
+
+        @app.route("/auth/login", methods=["POST"])
+        def login():
+            data = request.get_json()
+            if data != {"username": "user", "password": "secret"}:
+                return jsonify({"success": False}), 401
+            response = jsonify({"success": True})
+            response.set_cookie("session", "abc")
+            return response
+
+        @app.route("/ok")
+        def ok():
+            if request.cookies.get("session") != "abc":
+                return jsonify({"error": "login required"}), 401
+            return jsonify({"data": list(range(100))})
+
+        @app.route("/stream")
+        def stream():
+            return app.response_class((f"{i}\n" for i in range(50)), mimetype="text/plain")
+
+        @app.route("/fail")
+        def fail():
+            return jsonify({"error": "boom"}), 500
+
+        self.server = make_server("127.0.0.1", 0, app, threaded=True)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.thread.join()
+
+    def scenario(self):
+        return Scenario(mix=[(3, lambda rng: ("/ok", "/ok")), (1, lambda rng: ("/fail", "/fail")), (1, lambda rng: ("/stream", "/stream"))])
+
+    def test_logs_in_and_reports_per_endpoint(self):
+        report = LoadTest(self.url, "user", "secret", users=3, duration=1.0, ramp_up=0.2, think_time=0.01, scenario=self.scenario()).run()
+        summary = report.summary()
+
+        self.assertEqual(summary["POST /auth/login"]["requests"], 3)
+        self.assertEqual(summary["POST /auth/login"]["errors"], 0)
+        self.assertGreater(summary["GET /ok"]["requests"], 0)
+        self.assertEqual(summary["GET /ok"]["errors"], 0)
+        self.assertEqual(summary["GET /stream"]["errors"], 0)
+        self.assertEqual(summary["GET /fail"]["error_rate"], 1.0)
+        self.assertEqual(set(summary["GET /fail"]["error_kinds"]), {"500"})
+
+    def test_failed_login_stops_the_user(self):
+        report = LoadTest(self.url, "user", "wrong", users=2, duration=0.5, ramp_up=0, think_time=0, scenario=self.scenario()).run()
+        self.assertEqual(set(report.summary()), {"POST /auth/login"})
+        self.assertEqual(report.summary()["POST /auth/login"]["error_kinds"], {"401": 2})
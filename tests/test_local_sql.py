@@ -0,0 +1,137 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import patch
+from app.infra.cache import MemoryCacheBackend, ResultCache
+from app.infra.connection_pool import ConnectionPool
+from app.infra.local_sql import LocalSql
+from app.infra.snapshot_store import SnapshotStore
+from app.infra.synthetic_data import SyntheticData
+from app.services.comercial_service import ComercialService
+from app.services.default_rate_service import DefaultRateService
+from app.services.operations_service import OperationsService
+from app.utils.business_calendar import BusinessCalendar
+
+class TestLocalSqlTranslation(unittest.TestCase):
+    def test_translates_tsql_constructs(self):
+        query = LocalSql.translate("""
+            SELECT LEFT(cba.Razao, CHARINDEX(' ', cba.Razao + ' ') - 1), ISNULL(x, 0),
+                   DATEDIFF(DAY, d.Data, GETDATE()), CAST(? AS DATE), dbo.fn_DataVencimentoAjustada(d.Data, NULL, NULL)
+            FROM dbo.Documento d LEFT JOIN dbo.Agente a ON 1 = 1
+            OPTION (MAXRECURSION 0);
+        """)
+        self.assertNotIn("dbo.", query)
+        self.assertNotIn("MAXRECURSION", query)
+        self.assertIn("tsql_left(cba.Razao, CHARINDEX(' ', cba.Razao || ' ') - 1)", query)
+        self.assertIn("IFNULL(x, 0)", query)
+        self.assertIn("DATEDIFF('DAY', d.Data, GETDATE())", query)
+        self.assertIn("tsql_date(?)", query)
+        self.assertIn("LEFT JOIN Agente", query)
+
+    def test_date_functions_follow_sql_server(self):
+        self.assertEqual(LocalSql.datediff("DAY", "2025-01-31", "2025-03-01 10:00:00"), 29)
+        self.assertEqual(LocalSql.datediff("MONTH", "2025-01-31", "2025-02-01"), 1)
+        self.assertEqual(LocalSql.datepart("WEEKDAY", "2025-03-02"), 1)  # domingo
+        self.assertEqual(LocalSql.datepart("WEEKDAY", "2025-03-08"), 7)  # sábado
+        self.assertEqual(LocalSql.dateadd("DAY", 1, "2024-02-28"), "2024-02-29")
+        self.assertEqual(LocalSql.dateadd("MONTH", 1, "2025-01-31"), "2025-02-28")
+        self.assertEqual(LocalSql.format("2025-03-09", "yyyy-MM"), "2025-03")
+        self.assertEqual(LocalSql.charindex(" ", "ANA SILVA"), 4)
+
+    def test_results_are_converted_like_pyodbc(self):
+        self.assertEqual(LocalSql.convert_value("2025-03-09"), date(2025, 3, 9))
+        self.assertEqual(LocalSql.convert_value("2025-03-09 10:30:00.000"), datetime(2025, 3, 9, 10, 30))
+        self.assertEqual(LocalSql.convert_value(1234.5678), Decimal("1234.5678"))
+        self.assertEqual(LocalSql.convert_value("contato@cliente.com.br"), "contato@cliente.com.br")
+        self.assertEqual(LocalSql.adapt_param(datetime(2025, 3, 9)), "2025-03-09")
+
+
+class TestLocalDatabase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmpdir.name, "livework.sqlite3")
+        cls.counts = SyntheticData(documents=3000, seed=11, years=2).generate(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def setUp(self):
+        self.env = patch.dict(os.environ, {
+            "DB_ENGINE": "sqlite",
+            "DB_LOCAL_PATH": self.path,
+            "SNAPSHOT_DB_PATH": os.path.join(self.tmpdir.name, f"snapshots-{self._testMethodName}.sqlite3"),
+            "OPERATIONS_ROLLUP_ENABLED": "false",
+        })
+        self.env.start()
+        ConnectionPool.reset_instance()
+        BusinessCalendar._instance = None
+        ResultCache._instance = ResultCache(MemoryCacheBackend(), enabled=False)
+
+    def tearDown(self):
+        ResultCache._instance = None
+        BusinessCalendar._instance = None
+        ConnectionPool.reset_instance()
+        self.env.stop()
+
+    def test_generator_scale_and_reproducibility(self):
+        self.assertEqual(self.counts["Documento"], 3000)
+        self.assertEqual(self.counts["Operacao"], 3000 // SyntheticData.DOCUMENTS_PER_OPERATION)
+
+        other = os.path.join(self.tmpdir.name, "again.sqlite3")
+        SyntheticData(documents=3000, seed=11, years=2).generate(other)
+        query = "SELECT COUNT(*), SUM(Valor), MIN(DataEmissao), COUNT(DataBaixa) FROM Documento"
+        with sqlite3.connect(self.path) as first, sqlite3.connect(other) as second:
+            self.assertEqual(first.execute(query).fetchone(), second.execute(query).fetchone())
+
+    def test_daily_default_rate_sql_matches_sweep(self):
+        service = DefaultRateService(snapshot_store=SnapshotStore())
+        end = date.today().replace(day=1)
+        start = date(end.year - (end.month <= 2), (end.month - 3) % 12 + 1, 1)
+        sql = service.get_daily_rate_series(start.isoformat(), end.isoformat(), engine="sql")["data"]
+        sweep = service.get_daily_rate_series(start.isoformat(), end.isoformat(), engine="sweep")["data"]
+
+        self.assertTrue(sql)
+        by_date = {entry["date"]: entry["rate"] for entry in sweep}
+        for entry in sql:
+            self.assertAlmostEqual(entry["rate"], by_date[entry["date"]], places=9)
+
+    def test_volume_sql_matches_rollup(self):
+        service = OperationsService(snapshot_store=SnapshotStore())
+        start, end = "2020-01-01", date.today().isoformat()
+        from_sql = service.get_monthly_volume_data(start, end)["data"]
+
+        service.rebuild_rollup()
+        service.rollup_enabled = True
+        self.assertEqual(service.get_monthly_volume_data(start, end)["data"], from_sql)
+
+    def test_rollup_refresh_sees_local_changes(self):
+        service = OperationsService(snapshot_store=SnapshotStore())
+        service.rebuild_rollup()
+
+        connection = LocalSql.connect(self.path, readonly=False)
+        try:
+            number = connection.execute("SELECT MIN(Numero) FROM Operacao WHERE IsDeleted = 0").fetchone()[0]
+            connection.execute("UPDATE Operacao SET IsDeleted = 1 WHERE Numero = ?", (number,))
+            connection.commit()
+            result = service.refresh_rollup()
+            connection.execute("UPDATE Operacao SET IsDeleted = 0 WHERE Numero = ?", (number,))
+            connection.commit()
+        finally:
+            connection.close()
+
+        self.assertEqual(result["operations"], 1)
+        self.assertEqual(len(result["days"]), 1)
+
+    def test_churn_snapshot_from_local_tables(self):
+        store = SnapshotStore()
+        clients = ComercialService.build_churn_snapshot(store)
+
+        self.assertGreater(clients, 0)
+        for row in store.get_all_churn_clients():
+            self.assertFalse(any(email.endswith("@fontefm.com.br") for email in ComercialService._row_to_dict(row)["email_list"]))
+            self.assertEqual(row[6], row[6].capitalize())
@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+from app import create_app
+from app.infra import metrics
+from app.infra.cache import MemoryCacheBackend, ResultCache, cached
+from app.infra.metrics import Metrics
+
+class KpiService:
+    @cached("metrics_test.kpis", ttl=60)
+    def get_kpis(self):
+        Metrics.observe_query(0.2)
+        return {"kpis": 1}
+
+@unittest.skipIf(metrics.prometheus_client is None, "prometheus_client não instalado")
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.env = patch.dict(os.environ, {"SECRET_KEY": "test", "APP_USER": "admin"})
+        self.env.start()
+        os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+        self.client = create_app().test_client()
+        with self.client.session_transaction() as session:
+            session["_user_id"] = "admin"
+
+    def tearDown(self):
+        ResultCache._instance = None
+        self.env.stop()
+
+    def test_exposes_request_latency_per_endpoint(self):
+        self.client.get("/health")
+        response = self.client.get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("text/plain", response.headers["Content-Type"])
+        body = response.get_data(as_text=True)
+        self.assertIn('http_request_duration_seconds_count{endpoint="healthcheck.healthcheck",method="GET",status="200"}', body)
+        self.assertIn("http_requests_in_flight", body)
+
+    def test_requires_login_or_scrape_token(self):
+        anonymous = create_app().test_client()
+        self.assertEqual(anonymous.get("/metrics").status_code, 302)
+
+        with patch.dict(os.environ, {"METRICS_TOKEN": "scrape-secret"}):
+            self.assertEqual(anonymous.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code, 302)
+            self.assertEqual(anonymous.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code, 200)
+
+    def test_query_latency_is_labelled_with_service_method(self):
+        ResultCache._instance = ResultCache(MemoryCacheBackend())
+        KpiService().get_kpis()
+        KpiService().get_kpis()
+        Metrics.observe_query(0.2)
+
+        body = self.client.get("/metrics").get_data(as_text=True)
+        self.assertIn('db_query_duration_seconds_count{caller="test_metrics.get_kpis"} 1.0', body)
+        self.assertIn('db_query_duration_seconds_bucket{caller="other",le="0.25"}', body)
+
+    def test_counts_cache_hits_and_misses(self):
+        cache = ResultCache(MemoryCacheBackend())
+        cache.get_or_compute("metrics_test", {"a": 1}, 60, lambda: 1)
+        cache.get_or_compute("metrics_test", {"a": 1}, 60, lambda: 1)
+
+        body = self.client.get("/metrics").get_data(as_text=True)
+        self.assertIn('cache_requests_total{namespace="metrics_test",result="hits"} 1.0', body)
+        self.assertIn('cache_requests_total{namespace="metrics_test",result="misses"} 1.0', body)
+
+    def test_multiprocess_mode_aggregates_workers(self):
+        worker = "from app.infra.metrics import Metrics; Metrics.count_cache('shared', 'hits')"
+        collect = "from app.infra.metrics import Metrics; print(Metrics.render()[0].decode())"
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=directory, PYTHONPATH=os.pathsep.join(sys.path))
+            for _ in range(2):
+                subprocess.run([sys.executable, "-c", worker], env=env, check=True)
+            output = subprocess.run([sys.executable, "-c", collect], env=env, check=True, capture_output=True, text=True).stdout
+
+        self.assertIn('cache_requests_total{namespace="shared",result="hits"} 2.0', output)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+import os
+import random
+import tempfile
+import threading
+import unittest
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+import numpy as np
+from app.infra.cache import MemoryCacheBackend, ResultCache
+from app.infra.snapshot_store import SnapshotStore
+from app.services.operations_service import OperationsService
+
+class FakeDatabase:
+    operations = {}
+    changed = []
+    watermark = b"\x00\x00\x00\x00\x00\x00\x20\x00"
+    queries = 0
+
+    def execute_query(self, query, params=None):
+        FakeDatabase.queries += 1
+        if "MIN_ACTIVE_ROWVERSION" in query:
+            return [(self.watermark,)]
+        if "TimeStamp" in query:
+            return [(op_id, *self.operations[op_id]) for op_id in self.changed]
+        return [(op_id, day, value) for op_id, (day, value, deleted) in self.operations.items() if not deleted]
+
+    def iter_query(self, query, params=None, batch_size=None):
+        return iter(self.execute_query(query, params))
+
+    def close_connection(self):
+        pass
+
+def expected_volume(operations, start, end, weekdays_only):
+    """Mesmo resultado das queries originais sobre dbo.Operacao."""
+    grouped = defaultdict(list)
+    for day, value, deleted in operations.values():
+        if deleted or not (start <= day <= end) or (weekdays_only and day.weekday() >= 5):
+            continue
+        grouped[day.strftime('%Y-%m-%d') if weekdays_only else day.strftime('%Y-%m')].append(value)
+    return [
+        (period, round(float(sum(values)), 2), round(float((sum(values) / len(values)).quantize(Decimal("0.0001"))), 2))
+        for period, values in sorted(grouped.items())
+    ]
+
+class TestOperationsRollup(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(11)
+        base = date(2025, 1, 1)
+        FakeDatabase.operations = {
+            f"op-{i}": (base + timedelta(days=rng.randint(0, 120)), Decimal(rng.randint(100, 900000)) / 100, False)
+            for i in range(400)
+        }
+        FakeDatabase.changed = []
+        FakeDatabase.queries = 0
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = SnapshotStore(os.path.join(self.tmpdir.name, "snapshots.sqlite3"))
+        self.database = patch("app.services.operations_service.Database", FakeDatabase)
+        self.database.start()
+        ResultCache._instance = ResultCache(MemoryCacheBackend(), enabled=False)
+        self.service = OperationsService(snapshot_store=self.store)
+
+    def tearDown(self):
+        ResultCache._instance = None
+        self.database.stop()
+        self.tmpdir.cleanup()
+
+    def assertMatchesOperations(self):
+        daily = self.service.get_daily_volume_data("2025-01-01", "2025-04-30")["data"]
+        monthly = self.service.get_monthly_volume_data("2025-01-10", "2025-04-10")["data"]
+        ops = FakeDatabase.operations
+        self.assertEqual(
+            [(r["date"].strftime('%Y-%m-%d'), r["total_volume"], r["average_ticket"]) for r in daily],
+            expected_volume(ops, date(2025, 1, 1), date(2025, 4, 30), weekdays_only=True),
+        )
+        self.assertEqual(
+            [(r["date"].strftime('%Y-%m'), r["total_volume"], r["average_ticket"]) for r in monthly],
+            expected_volume(ops, date(2025, 1, 1), date(2025, 4, 30), weekdays_only=False),
+        )
+
+    def test_rollup_matches_operations(self):
+        self.service.rebuild_rollup()
+        queries = FakeDatabase.queries
+
+        self.assertMatchesOperations()
+        self.assertEqual(FakeDatabase.queries, queries)
+
+    def test_refresh_applies_changed_operations(self):
+        self.service.rebuild_rollup()
+        ops = FakeDatabase.operations
+        day, value, _ = ops["op-1"]
+        ops["op-1"] = (day + timedelta(days=9), value, False)
+        ops["op-2"] = (ops["op-2"][0], Decimal("123.4567"), False)
+        ops["op-3"] = (ops["op-3"][0], ops["op-3"][1], True)
+        ops["op-new"] = (date(2025, 3, 3), Decimal("50.00"), False)
+        FakeDatabase.changed = ["op-1", "op-2", "op-3", "op-new"]
+
+        result = self.service.refresh_rollup()
+        self.assertIn(day.strftime('%Y-%m-%d'), result["days"])
+        self.assertMatchesOperations()
+
+        # Reaplicar as mesmas alterações (mesmo watermark) não muda o agregado
+        self.service.refresh_rollup()
+        self.assertMatchesOperations()
+
+    def test_stale_rollup_is_refreshed_in_background(self):
+        self.service.rebuild_rollup()
+        expected = self.service.get_daily_volume_data("2025-01-01", "2025-04-30")
+        FakeDatabase.operations["op-new"] = (date(2025, 2, 4), Decimal("10.00"), False)
+        FakeDatabase.changed = ["op-new"]
+        release = threading.Event()
+        refresh = self.service.refresh_rollup
+
+        def slow_refresh():
+            release.wait(2)
+            return refresh()
+
+        with patch.dict(os.environ, {"OPERATIONS_ROLLUP_MAX_AGE": "-1"}), \
+                patch.object(self.service, "refresh_rollup", side_effect=slow_refresh):
+            # A requisição não espera a atualização: lê o agregado como está
+            self.assertEqual(self.service.get_daily_volume_data("2025-01-01", "2025-04-30"), expected)
+            release.set()
+            OperationsService._refresh_thread.join(2)
+
+        self.assertMatchesOperations()
+
+    def test_stale_rollup_is_served_when_refresh_fails(self):
+        self.service.rebuild_rollup()
+        expected = self.service.get_daily_volume_data("2025-01-01", "2025-04-30")
+
+        with patch.dict(os.environ, {"OPERATIONS_ROLLUP_MAX_AGE": "-1"}), \
+                patch.object(FakeDatabase, "execute_query", side_effect=ConnectionError("SQL Server fora")), \
+                self.assertLogs("app.services.operations_service", level="ERROR"):
+            self.assertEqual(self.service.get_daily_volume_data("2025-01-01", "2025-04-30"), expected)
+            OperationsService._refresh_thread.join(2)
+        self.assertEqual(self.service.get_daily_volume_data("2025-01-01", "2025-04-30"), expected)
+
+    def test_watermark_is_read_once_per_interval(self):
+        self.service.rebuild_rollup()
+
+        with patch.object(self.store, "get_watermark_state", wraps=self.store.get_watermark_state) as state:
+            versions = {self.service.get_data_version(60) for _ in range(5)}
+            self.assertEqual(state.call_count, 1)
+            with patch.dict(os.environ, {"OPERATIONS_ROLLUP_CHECK_INTERVAL": "-1"}):
+                self.service.get_data_version(60)
+            self.assertEqual(state.call_count, 2)
+
+        self.assertEqual(len(versions), 1)
+        self.assertTrue(versions.pop().startswith(f"rollup:{FakeDatabase.watermark.hex()}:"))
+
+    def test_falls_back_to_sql_without_rollup(self):
+        columns = {
+            "period_date": np.array(["2025-01-02", "2025-01-03"], dtype="datetime64[D]"),
+            "total_volume": np.array([1500.125, 20.0]),
+            "average_ticket": np.array([750.0625, 20.0]),
+        }
+        with patch.object(FakeDatabase, "fetch_columns", return_value=columns, create=True) as fetch:
+            result = self.service.get_daily_volume_data("2025-01-01", "2025-01-31")["data"]
+
+        self.assertIn("dbo.Operacao", fetch.call_args[0][0])
+        self.assertEqual([r["date"].strftime('%Y-%m-%d') for r in result], ["2025-01-02", "2025-01-03"])
+        self.assertEqual([(r["total_volume"], r["average_ticket"]) for r in result], [(1500.12, 750.06), (20.0, 20.0)])
+
+if __name__ == "__main__":
+    unittest.main()
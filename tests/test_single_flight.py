@@ -0,0 +1,70 @@
+import tempfile
+import threading
+import time
+import unittest
+from app.infra.single_flight import SingleFlight
+
+class TestSingleFlight(unittest.TestCase):
+    def run_concurrently(self, flight, fn, threads=8, key="daily:2025-01-01:2025-12-31"):
+        results = []
+        errors = []
+
+        def worker():
+            try:
+                results.append(flight.do(key, fn))
+            except Exception as e:
+                errors.append(e)
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join(2)
+        return results, errors
+
+    def slow_computation(self):
+        self.calls += 1
+        time.sleep(0.1)
+        return {"data": [1, 2, 3]}
+
+    def setUp(self):
+        self.calls = 0
+
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+
+        results, errors = self.run_concurrently(flight, self.slow_computation)
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(errors, [])
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(r is results[0] for r in results))
+        self.assertEqual(flight.get_stats()["coalesced"], 7)
+
+    def test_errors_propagate_to_waiters(self):
+        def failing():
+            time.sleep(0.05)
+            raise RuntimeError("timeout no SQL Server")
+
+        results, errors = self.run_concurrently(SingleFlight(), failing, threads=4)
+
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 4)
+
+    def test_sequential_calls_execute_again(self):
+        flight = SingleFlight()
+        flight.do("key", self.slow_computation)
+        flight.do("key", self.slow_computation)
+
+        self.assertEqual(self.calls, 2)
+
+    def test_file_lock_rechecks_shared_result(self):
+        with tempfile.TemporaryDirectory() as lock_dir:
+            flight = SingleFlight(lock_dir=lock_dir)
+            value = flight.do("key", self.slow_computation, recheck=lambda: (True, "cached"))
+
+        self.assertEqual(value, "cached")
+        self.assertEqual(self.calls, 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+import unittest
+from datetime import date
+from decimal import Decimal
+import numpy as np
+import pyodbc
+from unittest.mock import patch
+from app.infra.connection_pool import ConnectionPool
+from app.infra.db_connection import Database
+from app.infra.sort_whitelist import SortWhitelist
+from app.infra.statements import QueryStats, StatementCache
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.prepared = None
+        self.closed = False
+        self.messages = []
+
+    def execute(self, query, params=None):
+        if "missing_table" in query:
+            raise pyodbc.ProgrammingError("Invalid object name 'missing_table'")
+        if self.prepared != query:
+            self.connection.prepares += 1
+            self.prepared = query
+        self.messages = [("[01000] (3612)", "SQL Server parse and compile time: \n   CPU time = 1 ms, elapsed time = 4 ms."),
+                         ("[01000] (3612)", "SQL Server Execution Times:\n   CPU time = 0 ms,  elapsed time = 2 ms.")]
+        self.params = params
+        self.description = self.connection.description
+
+    def fetchall(self):
+        return [self.params or ()]
+
+    def fetchmany(self, size):
+        self.connection.batches.append(size)
+        remaining = self.connection.stream_rows
+        batch, self.connection.stream_rows = remaining[:size], remaining[size:]
+        return batch
+
+    def close(self):
+        self.closed = True
+
+class FakeConnection:
+    def __init__(self):
+        self.prepares = 0
+        self.cursors = []
+        self.stream_rows = []
+        self.batches = []
+        self.description = None
+
+    def cursor(self):
+        cursor = FakeCursor(self)
+        self.cursors.append(cursor)
+        return cursor
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+class TestStatements(unittest.TestCase):
+    def setUp(self):
+        self.connection = FakeConnection()
+        pool = ConnectionPool(lambda: self.connection, min_size=0, max_size=1, health_check_query=None)
+        self.pool = patch.object(Database, "_get_pool", return_value=pool)
+        self.pool.start()
+        Database.query_stats.reset()
+
+    def tearDown(self):
+        self.pool.stop()
+
+    def test_statement_is_prepared_once_per_connection(self):
+        sql = "SELECT * FROM dbo.Operacao WHERE Data >= ? AND Data <= ?"
+        for start, end in (("2025-01-01", "2025-01-31"), ("2025-02-01", "2025-02-28"), ("2025-03-01", "2025-03-31")):
+            db = Database()
+            self.assertEqual(db.execute_query(sql, (start, end)), [(start, end)])
+            db.close_connection()
+
+        self.assertEqual(self.connection.prepares, 1)
+        self.assertEqual(len(self.connection.cursors), 1)
+        stats = Database.get_query_stats()[QueryStats.statement_id(sql)]
+        self.assertEqual((stats["executions"], stats["prepares"]), (3, 1))
+
+    def test_lru_evicts_and_closes_cursors(self):
+        cache = StatementCache(max_size=2)
+        first, _ = cache.checkout(self.connection, "SELECT 1")
+        cache.checkout(self.connection, "SELECT 2")
+        cache.checkout(self.connection, "SELECT 1")
+        cache.checkout(self.connection, "SELECT 3")
+
+        self.assertFalse(first.closed)
+        self.assertTrue(self.connection.cursors[1].closed)
+        self.assertEqual(len(cache), 2)
+
+    def test_server_times_are_parsed(self):
+        with patch.dict("os.environ", {"DB_STATISTICS_TIME": "true"}):
+            db = Database()
+        db.execute_query("SELECT 1")
+        db.close_connection()
+
+        self.assertEqual(db.last_timing["compile_ms"], 4)
+        self.assertEqual(db.last_timing["server_execute_ms"], 2)
+
+    def test_fingerprint_strips_literals(self):
+        first = QueryStats.fingerprint("SELECT * FROM dbo.Operacao  WHERE Data >= '2025-01-01' AND Status = 1 AND Id IN (1, 2, 3)")
+        second = QueryStats.fingerprint("SELECT * FROM dbo.Operacao WHERE Data >= '2025-02-01'\n AND Status = 2 AND Id IN (4) -- comentário")
+
+        self.assertEqual(first, "SELECT * FROM dbo.Operacao WHERE Data >= ? AND Status = ? AND Id IN (?)")
+        self.assertEqual(first, second)
+        self.assertEqual(QueryStats.fingerprint("SELECT t1.Col2 FROM dbo.T1 t1"), "SELECT t1.Col2 FROM dbo.T1 t1")
+
+    def test_records_rows_bytes_and_slow_queries(self):
+        sql = "SELECT Nome, Valor FROM dbo.Cliente WHERE Data >= ?"
+        with patch.dict("os.environ", {"DB_SLOW_QUERY_MS": "0"}), self.assertLogs("app.infra.statements", "WARNING") as logs:
+            db = Database()
+            db.execute_query(sql, ("abcd", 10))
+            db.close_connection()
+
+        self.assertEqual((db.last_timing["rows"], db.last_timing["bytes"]), (1, 12))
+        self.assertGreaterEqual(db.last_timing["connect_ms"], 0)
+        stats = Database.get_query_stats()[QueryStats.statement_id(sql)]
+        self.assertEqual((stats["rows"], stats["bytes"], stats["slow"]), (1, 12, 1))
+        self.assertIn("dbo.Cliente WHERE Data >= ?", logs.output[0])
+        self.assertIn("params=('abcd', 10)", logs.output[0])
+
+    def test_failed_queries_are_logged(self):
+        sql = "SELECT * FROM missing_table WHERE Id = ?"
+        db = Database()
+        with self.assertLogs("app.infra.statements", "ERROR") as logs, self.assertRaises(RuntimeError):
+            db.execute_query(sql, (7,))
+        db.close_connection()
+
+        self.assertIn("Invalid object name", logs.output[0])
+        self.assertEqual(Database.get_query_stats()[QueryStats.statement_id(sql)]["errors"], 1)
+
+    def test_iter_query_streams_in_batches(self):
+        self.connection.stream_rows = [(i,) for i in range(25)]
+        db = Database()
+        rows = db.iter_query("SELECT Id FROM dbo.Operacao", batch_size=10)
+
+        self.assertEqual(next(rows), (0,))
+        self.assertEqual(self.connection.batches, [10])
+        self.assertEqual(len(list(rows)), 24)
+        self.assertEqual(self.connection.batches, [10, 10, 10, 10])
+        self.assertEqual(self.connection.cursors[-1].arraysize, 10)
+        self.assertTrue(self.connection.cursors[-1].closed)
+        db.close_connection()
+
+    def test_fetch_columns_converts_in_bulk(self):
+        self.connection.description = [("Data", date), ("ValorCompra", Decimal), ("Quantidade", int), ("Nome", str)]
+        self.connection.stream_rows = [
+            (date(2025, 1, 2), Decimal("10.5000"), 3, "A"),
+            (None, None, None, None),
+            (date(2025, 1, 6), Decimal("0.2500"), 1, "C"),
+        ]
+        db = Database()
+        columns = db.fetch_columns("SELECT Data, ValorCompra, Quantidade, Nome FROM x", batch_size=2, dtypes={"Nome": "object"})
+        db.close_connection()
+
+        self.assertEqual(columns["Data"].dtype, np.dtype("datetime64[D]"))
+        self.assertTrue(np.isnat(columns["Data"][1]))
+        np.testing.assert_array_equal(columns["ValorCompra"], [10.5, np.nan, 0.25])
+        np.testing.assert_array_equal(columns["Quantidade"], [3, np.nan, 1])
+        self.assertEqual(columns["Nome"].tolist(), ["A", None, "C"])
+
+    def test_fetch_columns_without_rows(self):
+        self.connection.description = [("Data", date), ("Quantidade", int)]
+        db = Database()
+        columns = db.fetch_columns("SELECT Data, Quantidade FROM x")
+        db.close_connection()
+
+        self.assertEqual(columns["Data"].dtype, np.dtype("datetime64[D]"))
+        self.assertEqual(columns["Quantidade"].dtype, np.dtype("int64"))
+        self.assertEqual(len(columns["Quantidade"]), 0)
+
+    def test_sort_whitelist(self):
+        whitelist = SortWhitelist({"ClientName": "client_name"})
+
+        self.assertEqual(whitelist.resolve("ClientName", "desc"), ("client_name", "DESC"))
+        with self.assertRaises(ValueError):
+            whitelist.resolve("client_name; DROP TABLE x", "ASC")
+        with self.assertRaises(ValueError):
+            whitelist.resolve("ClientName", "ASC; --")
+
+if __name__ == "__main__":
+    unittest.main()